@@ -7,6 +7,7 @@ acceso tipado en el resto de la aplicación.
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Carga variables desde el archivo .env si existe (solo desarrollo local)
@@ -46,6 +47,58 @@ class Settings:
     # Timeout para obtener una conexión del pool (segundos)
     DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
 
+    # --- Generación de PDFs ---
+    # Procesos dedicados a renderizar PDFs fuera del event loop (0 = usar hilos)
+    RENDER_POOL_WORKERS: int = int(os.getenv("RENDER_POOL_WORKERS", "2"))
+
+    # Máximo de PDFs en cola o en proceso por worker antes de responder 503
+    RENDER_QUEUE_LIMIT: int = int(os.getenv("RENDER_QUEUE_LIMIT", "16"))
+
+    # Segundos sugeridos al cliente (Retry-After) cuando la cola está llena
+    RENDER_RETRY_AFTER: int = int(os.getenv("RENDER_RETRY_AFTER", "5"))
+
+    # Caché de PDFs generados: memoria por worker (MB)
+    PDF_CACHE_MEMORY_MB: int = int(os.getenv("PDF_CACHE_MEMORY_MB", "64"))
+
+    # Directorio de la caché en disco compartida entre workers (vacío = deshabilitada)
+    PDF_CACHE_DIR: str = os.getenv("PDF_CACHE_DIR", "")
+
+    # Tamaño máximo de la caché en disco (MB)
+    PDF_CACHE_DISK_MB: int = int(os.getenv("PDF_CACHE_DISK_MB", "512"))
+
+    # --- Trabajos de larga duración ---
+    # Directorio compartido entre workers donde se guarda el progreso de cada trabajo
+    JOBS_DIR: str = os.getenv(
+        "JOBS_DIR", os.path.join(tempfile.gettempdir(), "tutorias_jobs")
+    )
+
+    # Horas que se conserva el estado de un trabajo terminado
+    JOBS_TTL_HOURS: int = int(os.getenv("JOBS_TTL_HOURS", "24"))
+
+    # Filas por lote (y por commit) en las cargas masivas en segundo plano
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "2000"))
+
+    # Segundos que se reutiliza el total de un listado paginado para el mismo filtro (0 = sin caché)
+    PAGINATION_COUNT_TTL_SECONDS: int = int(os.getenv("PAGINATION_COUNT_TTL_SECONDS", "30"))
+
+    # Máximo de conteos de listados en caché por worker
+    PAGINATION_COUNT_CACHE_MAX: int = int(os.getenv("PAGINATION_COUNT_CACHE_MAX", "512"))
+
+    # Filas que se leen de la BD por lote al enviar un listado completo en streaming
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+    # Segundos máximos que un worker usa su copia de la configuración del sistema sin releerla de la BD (0 = sin caché)
+    CONFIG_CACHE_TTL_SECONDS: int = int(os.getenv("CONFIG_CACHE_TTL_SECONDS", "10"))
+
+    # Máximo de consultas SQL por petición (0 = sin control). Con ENV=test, excederlo hace fallar la petición
+    QUERY_BUDGET: int = int(os.getenv("QUERY_BUDGET", "0"))
+
+    # Hilos para leer en paralelo los CSV de una carga de asignaciones por lote
+    ASSIGNMENT_PARSE_WORKERS: int = int(os.getenv("ASSIGNMENT_PARSE_WORKERS", "4"))
+
+    # Máximo de bytes descomprimidos aceptados de un ZIP de asignaciones
+    ASSIGNMENT_ZIP_MAX_BYTES: int = int(os.getenv("ASSIGNMENT_ZIP_MAX_BYTES", str(50 * 1024 * 1024)))
+
     # --- Seguridad ---
     # ¡CRÍTICO! En producción, cambia esto por una cadena larga y aleatoria
     # Genera con: openssl rand -hex 32
@@ -57,6 +110,27 @@ class Settings:
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "480")
     )  # 8 horas
 
+    # Segundos que se reutiliza el usuario autenticado sin consultar la BD (0 = deshabilitado)
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+
+    # Máximo de usuarios autenticados en caché por worker
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "2048"))
+
+    # Hilos dedicados a bcrypt (login) por worker, separados del threadpool general
+    HASH_POOL_WORKERS: int = int(os.getenv("HASH_POOL_WORKERS", "4"))
+
+    # Máximo de verificaciones en cola o en proceso por worker antes de responder 429
+    HASH_QUEUE_LIMIT: int = int(os.getenv("HASH_QUEUE_LIMIT", "64"))
+
+    # Segundos sugeridos al cliente (Retry-After) cuando la cola de login está llena
+    HASH_RETRY_AFTER: int = int(os.getenv("HASH_RETRY_AFTER", "2"))
+
+    # Costo bcrypt de las contraseñas temporales de cargas masivas (se reemplazan en el primer acceso)
+    TEMP_PASSWORD_BCRYPT_ROUNDS: int = int(os.getenv("TEMP_PASSWORD_BCRYPT_ROUNDS", "5"))
+
+    # Procesos para hashear contraseñas temporales en cargas masivas (0 = número de CPUs)
+    PASSWORD_IMPORT_WORKERS: int = int(os.getenv("PASSWORD_IMPORT_WORKERS", "0"))
+
     # --- CORS ---
     # Procesa la lista de origins y elimina espacios en blanco
     CORS_ORIGINS: list = [
@@ -9,17 +9,15 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
 from jose import JWTError, jwt
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 
 from app.database import get_session
 from app.models.administrador import Administrador, RolAdministrador # Importamos el Enum de Roles
 from app.models.tutor import Tutor
 from app.models.alumno import Alumno
-from app.schemas.administrador import TokenData
-from app.schemas.tutor import TutorTokenData
-from app.schemas.alumno import AlumnoTokenData
 from app.services import admin_service
 from app.core.config import settings
+from app.core import principal_cache
 
 
 oauth2_scheme_admin = OAuth2PasswordBearer(
@@ -38,6 +36,129 @@ oauth2_scheme_alumno = OAuth2PasswordBearer(
 )
 
 
+# Valores del claim "role" de cada tipo de token
+ROLE_ADMIN = "admin"
+ROLE_TUTOR = "tutor"
+ROLE_ALUMNO = "alumno"
+
+Principal = Union[Administrador, Tutor, Alumno]
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudieron validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_token(token: str) -> Tuple[str, str]:
+    """
+    Decodifica el token una sola vez y obtiene su sujeto y rol.
+
+    Los tokens de administrador emitidos antes de incluir el claim "role" no lo
+    traen; se tratan como tokens de administrador hasta que expiren.
+
+    Returns:
+        Tupla (sub, role).
+
+    Raises:
+        HTTPException: 401 si el token es inválido o no tiene sujeto.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise _credentials_exception()
+
+    sub: Optional[str] = payload.get("sub")
+    if sub is None:
+        raise _credentials_exception()
+
+    role: Optional[str] = payload.get("role")
+    # Compatibilidad: tokens de administrador sin claim "role"
+    return str(sub), role or ROLE_ADMIN
+
+
+def _load_admin(db: Session, usuario: str) -> Administrador:
+    user = principal_cache.get(db, principal_cache.TIPO_ADMIN, usuario, Administrador)
+    if user is not None:
+        return user
+
+    user = admin_service.get_admin_by_usuario(db, usuario=usuario)
+    if user is None:
+        raise _credentials_exception()
+
+    principal_cache.put(principal_cache.TIPO_ADMIN, usuario, user)
+    return user
+
+
+def _load_tutor(db: Session, sub: str) -> Tutor:
+    try:
+        tutor_pk = int(sub)
+    except (ValueError, TypeError):
+        raise _credentials_exception()
+
+    user = principal_cache.get(db, principal_cache.TIPO_TUTOR, tutor_pk, Tutor)
+    if user is not None:
+        return user
+
+    user = db.get(Tutor, tutor_pk)
+    if user is None:
+        raise _credentials_exception()
+
+    principal_cache.put(principal_cache.TIPO_TUTOR, tutor_pk, user)
+    return user
+
+
+def _load_alumno(db: Session, sub: str) -> Alumno:
+    try:
+        alumno_pk = int(sub)
+    except (ValueError, TypeError):
+        raise _credentials_exception()
+
+    user = principal_cache.get(db, principal_cache.TIPO_ALUMNO, alumno_pk, Alumno)
+    if user is not None:
+        return user
+
+    user = db.get(Alumno, alumno_pk)
+    if user is None:
+        raise _credentials_exception()
+
+    principal_cache.put(principal_cache.TIPO_ALUMNO, alumno_pk, user)
+    return user
+
+
+_LOADERS = {
+    ROLE_ADMIN: _load_admin,
+    ROLE_TUTOR: _load_tutor,
+    ROLE_ALUMNO: _load_alumno,
+}
+
+
+def resolve_principal(token: str, db: Session) -> Principal:
+    """
+    Obtiene el usuario autenticado de cualquier tipo a partir del token JWT.
+
+    El token se decodifica una sola vez y su claim "role" indica directamente
+    la tabla donde buscar al usuario.
+
+    Args:
+        token: Token JWT del usuario autenticado.
+        db: Sesión de base de datos.
+
+    Returns:
+        Instancia de Administrador, Tutor o Alumno.
+
+    Raises:
+        HTTPException: 401 si el token es inválido, el rol es desconocido o el usuario no existe.
+    """
+    sub, role = _decode_token(token)
+    loader = _LOADERS.get(role)
+    if loader is None:
+        raise _credentials_exception()
+    return loader(db, sub)
+
+
 def get_admin_cualquier_rol(
     token: str = Depends(oauth2_scheme_admin),
     db: Session = Depends(get_session)
@@ -56,29 +177,12 @@ def get_admin_cualquier_rol(
     Returns:
         Instancia del modelo Administrador correspondiente al usuario autenticado.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        usuario: Optional[str] = payload.get("sub")
-        
-        if usuario is None:
-            raise credentials_exception
-        
-        token_data = TokenData(usuario=usuario)
-    except JWTError:
-        raise credentials_exception
+    sub, role = _decode_token(token)
     
-    user = admin_service.get_admin_by_usuario(db, usuario=token_data.usuario) #type:ignore
+    if role != ROLE_ADMIN:
+        raise _credentials_exception()
     
-    if user is None:
-        raise credentials_exception
-    
-    return user
+    return _load_admin(db, sub)
 
 
 def get_current_admin_user(
@@ -126,42 +230,12 @@ def get_current_tutor_user(
     Raises:
         HTTPException: Si el token es inválido, el rol no es 'tutor' o el usuario no existe.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        role: Optional[str] = payload.get("role")
-        
-        if role is None or role != "tutor":
-            raise credentials_exception
-        
-        tutor_id: Optional[str] = payload.get("sub")
-        
-        if tutor_id is None:
-            raise credentials_exception
-        
-        token_data = TutorTokenData(id=tutor_id, role=role)
-    except JWTError:
-        raise credentials_exception
+    sub, role = _decode_token(token)
     
-    if token_data.id is None:
-        raise credentials_exception
+    if role != ROLE_TUTOR:
+        raise _credentials_exception()
     
-    try:
-        tutor_pk = int(token_data.id)
-    except (ValueError, TypeError):
-        raise credentials_exception
-    
-    user = db.get(Tutor, tutor_pk)
-    
-    if user is None:
-        raise credentials_exception
-    
-    return user
+    return _load_tutor(db, sub)
 
 
 async def get_current_user(
@@ -169,9 +243,12 @@ async def get_current_user(
     db: Session = Depends(get_session)
 ) -> Union[Administrador, Tutor]:
     """
-    Obtiene el usuario autenticado intentando validar como tutor primero y luego como administrador.
+    Obtiene el usuario autenticado (tutor o administrador) para endpoints compartidos.
     
-    Esta función permite endpoints que aceptan múltiples tipos de usuarios autenticados.
+    El token se decodifica una sola vez y se busca directamente en la tabla que
+    indica su rol. Los administradores deben ser SUPER_ADMIN; si un usuario de
+    rol limitado necesita acceder a endpoints compartidos, este es el lugar
+    para ampliar la validación.
     
     Args:
         token: Token JWT del usuario autenticado.
@@ -181,28 +258,18 @@ async def get_current_user(
         Instancia del modelo Tutor o Administrador según el tipo de usuario autenticado.
     
     Raises:
-        HTTPException: Si el token es inválido para ambos roles o el usuario no existe.
+        HTTPException: Si el token es inválido, pertenece a un alumno o a un
+        administrador que no es SUPER_ADMIN, o el usuario no existe.
     """
-    try:
-        tutor = get_current_tutor_user(token=token, db=db)
-        return tutor
-    except HTTPException as tutor_exc:
-        if tutor_exc.status_code == 401:
-            try:
-                # Aquí usamos get_current_admin_user, por lo que requerirá SUPER_ADMIN por defecto.
-                # Si necesitas que un usuario de rol limitado acceda a endpoints compartidos,
-                # deberías cambiar esto a get_admin_cualquier_rol.
-                admin = get_current_admin_user(current_admin=get_admin_cualquier_rol(token, db))
-                return admin
-            except HTTPException:
-                raise tutor_exc
-        else:
-            raise tutor_exc
+    principal = resolve_principal(token, db)
     
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Credenciales inválidas"
-    )
+    if isinstance(principal, Tutor):
+        return principal
+    
+    if isinstance(principal, Administrador) and principal.rol == RolAdministrador.SUPER_ADMIN:
+        return principal
+    
+    raise _credentials_exception()
 
 
 def get_current_alumno_user(
@@ -222,39 +289,9 @@ def get_current_alumno_user(
     Raises:
         HTTPException: Si el token es inválido, el rol no es 'alumno' o el usuario no existe.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        role: Optional[str] = payload.get("role")
-        
-        if role != "alumno":
-            raise credentials_exception
-        
-        alumno_id_str: Optional[str] = payload.get("sub")
-        
-        if alumno_id_str is None:
-            raise credentials_exception
-        
-        token_data = AlumnoTokenData(id=alumno_id_str, role=role)
-    except JWTError:
-        raise credentials_exception
+    sub, role = _decode_token(token)
     
-    try:
-        if token_data.id is None:
-            raise credentials_exception
-        
-        alumno_pk = int(token_data.id)
-    except (ValueError, TypeError):
-        raise credentials_exception
-    
-    user = db.get(Alumno, alumno_pk)
-    
-    if user is None:
-        raise credentials_exception
+    if role != ROLE_ALUMNO:
+        raise _credentials_exception()
     
-    return user
\ No newline at end of file
+    return _load_alumno(db, sub)
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Ejecutor dedicado para hashing y verificación de contraseñas (bcrypt).
+
+bcrypt tarda cientos de milisegundos por operación a propósito. Si los logins
+lo ejecutan en el threadpool por defecto de FastAPI, en picos de acceso (inicio
+de semestre) ocupan todos sus hilos y cualquier otro endpoint síncrono queda
+esperando detrás de ellos.
+
+Este módulo mantiene un `ThreadPoolExecutor` propio por worker de uvicorn
+(bcrypt libera el GIL, por lo que los hilos sí corren en paralelo). Si la cola
+supera `HASH_QUEUE_LIMIT` se responde 429 con `Retry-After` de inmediato, en
+lugar de acumular logins que terminarían por timeout. También registra
+métricas de tiempo en cola vs. tiempo de hashing.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core import security
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_pending = 0
+_lock = threading.Lock()
+
+_metrics: Dict[str, float] = {
+    "completados": 0,
+    "rechazados": 0,
+    "espera_total_ms": 0.0,
+    "espera_max_ms": 0.0,
+    "hash_total_ms": 0.0,
+    "hash_max_ms": 0.0,
+}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Obtiene (o crea de forma perezosa) el pool de hilos de hashing."""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.HASH_POOL_WORKERS),
+                    thread_name_prefix="bcrypt",
+                )
+    return _executor
+
+
+def _acquire_slot() -> None:
+    """Reserva un lugar en la cola o responde 429 si está llena."""
+    global _pending
+
+    with _lock:
+        if _pending >= settings.HASH_QUEUE_LIMIT:
+            _metrics["rechazados"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiados inicios de sesión simultáneos. Intenta de nuevo en unos segundos.",
+                headers={"Retry-After": str(settings.HASH_RETRY_AFTER)},
+            )
+        _pending += 1
+
+
+def _release_slot() -> None:
+    global _pending
+
+    with _lock:
+        _pending -= 1
+
+
+def _timed(fn: Callable[..., T], encolado: float, *args: Any) -> T:
+    """Ejecuta `fn` en el pool registrando el tiempo en cola y el de ejecución."""
+    inicio = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        fin = time.perf_counter()
+        espera_ms = (inicio - encolado) * 1000
+        hash_ms = (fin - inicio) * 1000
+        with _lock:
+            _metrics["completados"] += 1
+            _metrics["espera_total_ms"] += espera_ms
+            _metrics["espera_max_ms"] = max(_metrics["espera_max_ms"], espera_ms)
+            _metrics["hash_total_ms"] += hash_ms
+            _metrics["hash_max_ms"] = max(_metrics["hash_max_ms"], hash_ms)
+
+
+async def run(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Ejecuta una función de hashing en el pool dedicado sin bloquear el event loop.
+
+    Args:
+        fn: Función a ejecutar (ej. `security.verify_password`).
+        *args: Argumentos de la función.
+
+    Returns:
+        El resultado de la función.
+
+    Raises:
+        HTTPException: 429 si la cola de hashing está llena, o la excepción
+            que haya levantado la función.
+    """
+    _acquire_slot()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), _timed, fn, time.perf_counter(), *args)
+    finally:
+        _release_slot()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Versión asíncrona de `security.verify_password` sobre el pool dedicado."""
+    return await run(security.verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    """Versión asíncrona de `security.get_password_hash` sobre el pool dedicado."""
+    return await run(security.get_password_hash, password)
+
+
+def metrics() -> Dict[str, Any]:
+    """
+    Métricas del pool de hashing de este worker.
+
+    Returns:
+        Operaciones completadas y rechazadas, operaciones en curso y tiempos
+        promedio/máximo en cola y de hashing (ms).
+    """
+    with _lock:
+        completados = int(_metrics["completados"])
+        divisor = completados or 1
+        return {
+            "hilos": max(1, settings.HASH_POOL_WORKERS),
+            "en_curso": _pending,
+            "completados": completados,
+            "rechazados": int(_metrics["rechazados"]),
+            "espera_promedio_ms": round(_metrics["espera_total_ms"] / divisor, 2),
+            "espera_max_ms": round(_metrics["espera_max_ms"], 2),
+            "hash_promedio_ms": round(_metrics["hash_total_ms"] / divisor, 2),
+            "hash_max_ms": round(_metrics["hash_max_ms"], 2),
+        }
+
+
+def shutdown() -> None:
+    """Detiene el pool de hilos (se invoca al apagar la aplicación)."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
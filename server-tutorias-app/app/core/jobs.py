@@ -0,0 +1,121 @@
+"""
+Registro de trabajos de larga duración (exportaciones, importaciones, etc.).
+
+El estado de cada trabajo se guarda como un archivo JSON en `JOBS_DIR`, de
+modo que cualquier worker de uvicorn puede responder la consulta de progreso
+aunque el trabajo se esté ejecutando en otro proceso. Las escrituras son
+atómicas (archivo temporal + `os.replace`).
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_EN_PROCESO = "en_proceso"
+ESTADO_COMPLETADO = "completado"
+ESTADO_ERROR = "error"
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _job_path(job_id: str) -> Optional[str]:
+    # Solo aceptamos ids generados por `create_job` (evita rutas arbitrarias)
+    if not _JOB_ID_RE.match(job_id):
+        return None
+    return os.path.join(settings.JOBS_DIR, f"{job_id}.json")
+
+
+def _write(job: Dict[str, Any]) -> None:
+    os.makedirs(settings.JOBS_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=settings.JOBS_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(job, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, _job_path(job["id"]))  # type: ignore
+
+
+def _purge_expired() -> None:
+    """Elimina los trabajos más antiguos que JOBS_TTL_HOURS."""
+    limite = time.time() - settings.JOBS_TTL_HOURS * 3600
+    try:
+        with os.scandir(settings.JOBS_DIR) as entries:
+            for entry in entries:
+                if entry.stat().st_mtime < limite:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+    except FileNotFoundError:
+        pass
+
+
+def create_job(tipo: str, total: Optional[int] = None) -> str:
+    """
+    Registra un nuevo trabajo en estado pendiente.
+
+    Args:
+        tipo: Tipo de trabajo (ej. "exportacion_integral").
+        total: Número total de elementos a procesar, si se conoce.
+
+    Returns:
+        Identificador del trabajo.
+    """
+    _purge_expired()
+
+    ahora = time.time()
+    job = {
+        "id": uuid.uuid4().hex,
+        "tipo": tipo,
+        "estado": ESTADO_PENDIENTE,
+        "total": total,
+        "procesados": 0,
+        "errores": [],
+        "resultado": None,
+        "creado": ahora,
+        "actualizado": ahora,
+    }
+    _write(job)
+    return job["id"]
+
+
+def update_job(job_id: str, **campos: Any) -> None:
+    """
+    Actualiza campos del estado de un trabajo.
+
+    Args:
+        job_id: Identificador del trabajo.
+        **campos: Campos a actualizar (estado, procesados, errores, resultado...).
+    """
+    job = get_job(job_id)
+    if job is None:
+        return
+    job.update(campos)
+    job["actualizado"] = time.time()
+    _write(job)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene el estado actual de un trabajo.
+
+    Args:
+        job_id: Identificador del trabajo.
+
+    Returns:
+        Diccionario con el estado del trabajo o None si no existe.
+    """
+    path = _job_path(job_id)
+    if path is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
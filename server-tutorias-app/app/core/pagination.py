@@ -0,0 +1,161 @@
+"""
+Paginación por cursor (keyset) y caché de conteos para los listados.
+
+Con `offset((page - 1) * size)` la BD recorre y descarta todas las filas
+anteriores, así que cada página profunda es más lenta que la anterior. En
+modo cursor el listado se ordena por la llave primaria y cada página continúa
+desde el último id visto (`WHERE id > :ultimo`), con el mismo costo sin
+importar la profundidad.
+
+Con búsqueda, el orden es por relevancia y luego por id; el cursor guarda
+ambos valores del último registro visto.
+
+El total de registros se calcula con un `COUNT` sobre el conjunto filtrado.
+Se conserva por worker durante PAGINATION_COUNT_TTL_SECONDS para cada filtro,
+de modo que recorrer las páginas de un mismo listado no repite el conteo; el
+cliente también puede omitirlo (`include_total=false`).
+"""
+
+import base64
+import binascii
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlmodel import Session
+
+from app.core.config import settings
+
+
+_counts: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def encode_cursor(last_id: int, last_rank: Optional[int] = None) -> str:
+    """Codifica el último id (y relevancia) visto como cursor opaco."""
+    datos = {"id": last_id} if last_rank is None else {"id": last_id, "rank": last_rank}
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, Optional[int]]:
+    """
+    Obtiene el último id y la última relevancia vistos de un cursor.
+
+    Raises:
+        HTTPException: 400 si el cursor no fue generado por `encode_cursor`.
+    """
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        last_id = datos["id"]
+        last_rank = datos.get("rank")
+        if not isinstance(last_id, int) or not isinstance(last_rank, (int, type(None))):
+            raise ValueError
+        return last_id, last_rank
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido."
+        )
+
+
+def paginate(
+    session: Session,
+    query: Any,
+    id_column: Any,
+    page: int,
+    size: int,
+    cursor: Optional[str] = None,
+    rank: Any = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Obtiene una página ordenada por `id_column` (o por `rank` y `id_column`), por offset o por cursor.
+
+    Args:
+        session: Sesión de base de datos.
+        query: Consulta con los filtros del listado (sin orden ni límite).
+        id_column: Llave primaria que define el orden estable (ej. `Alumno.id_alumno`).
+        page: Número de página (solo se usa sin cursor).
+        size: Registros por página.
+        cursor: Cursor devuelto por la página anterior.
+        rank: Expresión entera de relevancia (ver `app.core.search`); se
+            ordena primero por ella, de mayor a menor.
+
+    Returns:
+        Tupla (registros de la página, cursor de la siguiente página o None
+        si no hay más registros).
+    """
+    if rank is None:
+        if cursor:
+            query = query.where(id_column > decode_cursor(cursor)[0])
+        else:
+            query = query.offset((page - 1) * size)
+
+        # Se pide un registro extra para saber si hay una página siguiente
+        rows = list(session.exec(query.order_by(id_column).limit(size + 1)).all())
+        if len(rows) <= size:
+            return rows, None
+        return rows[:size], encode_cursor(getattr(rows[size - 1], id_column.key))
+
+    if cursor:
+        last_id, last_rank = decode_cursor(cursor)
+        if last_rank is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginación inválido."
+            )
+        query = query.where(or_(rank < last_rank, and_(rank == last_rank, id_column > last_id)))
+    else:
+        query = query.offset((page - 1) * size)
+
+    # `execute` (no `exec`): se necesitan las filas (registro, relevancia) completas
+    filas = session.execute(
+        query.add_columns(rank).order_by(rank.desc(), id_column).limit(size + 1)
+    ).all()
+    rows = [fila[0] for fila in filas[:size]]
+    if len(filas) <= size:
+        return rows, None
+    return rows, encode_cursor(getattr(rows[-1], id_column.key), filas[size - 1][1])
+
+
+def cached_count(session: Session, key: Hashable, count_query: Any) -> int:
+    """
+    Ejecuta un `COUNT` o devuelve el resultado reciente del mismo filtro.
+
+    Args:
+        session: Sesión de base de datos.
+        key: Identifica el listado y sus filtros (ej. `("alumnos", search)`).
+        count_query: Consulta de conteo a ejecutar si no hay valor vigente.
+
+    Returns:
+        Total de registros (con un retraso máximo de PAGINATION_COUNT_TTL_SECONDS).
+    """
+    ahora = time.monotonic()
+
+    if settings.PAGINATION_COUNT_TTL_SECONDS > 0:
+        with _lock:
+            entrada = _counts.get(key)
+            if entrada is not None and entrada[0] > ahora:
+                _counts.move_to_end(key)
+                return entrada[1]
+
+    total = session.exec(count_query).one()
+
+    if settings.PAGINATION_COUNT_TTL_SECONDS > 0:
+        with _lock:
+            _counts[key] = (ahora + settings.PAGINATION_COUNT_TTL_SECONDS, total)
+            _counts.move_to_end(key)
+            while len(_counts) > settings.PAGINATION_COUNT_CACHE_MAX:
+                _counts.popitem(last=False)
+
+    return total
+
+
+def invalidate_counts(listado: str) -> None:
+    """Descarta en este worker los conteos de un listado (ej. tras crear o eliminar registros)."""
+    with _lock:
+        for key in [k for k in _counts if isinstance(k, tuple) and k and k[0] == listado]:
+            del _counts[key]
@@ -0,0 +1,318 @@
+"""
+Caché direccionada por contenido de PDFs generados.
+
+La llave de cada PDF es un hash SHA-256 de los datos que se imprimen
+(las filas ya consultadas de la base de datos) más el hash de la plantilla.
+Si los datos o la plantilla cambian, cambia la llave, por lo que nunca se
+sirve un PDF desactualizado; la misma llave se usa como ETag para que los
+navegadores reciban 304 cuando el PDF no cambió.
+
+Niveles:
+- Memoria: LRU por proceso acotada en bytes (PDF_CACHE_MEMORY_MB).
+- Disco (opcional): directorio compartido entre workers (PDF_CACHE_DIR)
+  acotado en bytes (PDF_CACHE_DISK_MB), desalojando los archivos más antiguos.
+
+Cada entrada en memoria se registra con etiquetas (ej. "reporte1:5") para que
+las escrituras de reportes descarten de inmediato los PDFs que ya no se
+usarán. Al desalojar una entrada de memoria se olvidan también sus etiquetas;
+si su archivo sigue en disco, lo elimina el desalojo del disco (la llave
+cambia con los datos, así que nunca se sirve desactualizado).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from app.core import render_executor, template_cache
+from app.core.config import settings
+
+
+_memory: "OrderedDict[str, bytes]" = OrderedDict()
+_memory_bytes = 0
+_tags: Dict[str, Set[str]] = {}
+# Índice inverso de `_tags` (llave -> etiquetas) para limpiar al desalojar
+_key_tags: Dict[str, Set[str]] = {}
+_lock = threading.Lock()
+
+
+# --- Etiquetas ---
+
+def tag_integral(id_tutor: int, periodo: str) -> str:
+    return f"integral:{id_tutor}:{periodo}"
+
+
+def tag_constancia(id_alumno: int) -> str:
+    return f"constancia:{id_alumno}"
+
+
+def tag_reporte1(reporte_id: int) -> str:
+    return f"reporte1:{reporte_id}"
+
+
+def tag_reporte2(reporte_id: int) -> str:
+    return f"reporte2:{reporte_id}"
+
+
+# --- Llaves y ETag ---
+
+def build_key(kind: str, data: Any, template_path: str) -> str:
+    """
+    Calcula la llave de contenido de un PDF.
+
+    Args:
+        kind: Tipo de documento (ej. "integral", "constancia").
+        data: Datos planos que se imprimirán en el PDF.
+        template_path: Ruta de la plantilla usada para renderizar.
+
+    Returns:
+        Hash hexadecimal que identifica el PDF resultante.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(kind.encode())
+    hasher.update(template_cache.get_template_digest(template_path).encode())
+    hasher.update(json.dumps(data, sort_keys=True, default=str, ensure_ascii=False).encode())
+    return hasher.hexdigest()
+
+
+def etag(key: str) -> str:
+    """Valor del encabezado ETag para una llave."""
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    """
+    Indica si el encabezado If-None-Match del cliente coincide con la llave.
+
+    Args:
+        if_none_match: Valor recibido en If-None-Match (puede ser None).
+        key: Llave de contenido del PDF.
+    """
+    if not if_none_match:
+        return False
+    candidatos = {valor.strip().removeprefix("W/") for valor in if_none_match.split(",")}
+    return "*" in candidatos or etag(key) in candidatos
+
+
+# --- Nivel en disco ---
+
+def _disk_path(key: str) -> Optional[str]:
+    if not settings.PDF_CACHE_DIR:
+        return None
+    return os.path.join(settings.PDF_CACHE_DIR, f"{key}.pdf")
+
+
+def _disk_get(key: str) -> Optional[bytes]:
+    path = _disk_path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+        # Marcamos el acceso para que el desalojo conserve los más usados
+        os.utime(path)
+        return content
+    except OSError:
+        return None
+
+
+def _disk_put(key: str, content: bytes) -> None:
+    path = _disk_path(key)
+    if path is None:
+        return
+    try:
+        os.makedirs(settings.PDF_CACHE_DIR, exist_ok=True)
+        # Escritura atómica: otros workers nunca leen un archivo a medias
+        fd, tmp_path = tempfile.mkstemp(dir=settings.PDF_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        _disk_evict()
+    except OSError as e:
+        print(f"⚠️ No se pudo escribir el PDF en la caché de disco: {e}")
+
+
+def _disk_evict() -> None:
+    """Elimina los archivos menos recientes hasta respetar PDF_CACHE_DISK_MB."""
+    limite = settings.PDF_CACHE_DISK_MB * 1024 * 1024
+    archivos = []
+    total = 0
+    with os.scandir(settings.PDF_CACHE_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".pdf"):
+                continue
+            stat = entry.stat()
+            archivos.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    if total <= limite:
+        return
+
+    archivos.sort()
+    for _, size, path in archivos:
+        if total <= limite:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _disk_remove(key: str) -> None:
+    path = _disk_path(key)
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# --- Nivel en memoria ---
+
+def _forget_tags(key: str) -> None:
+    """Quita la llave de sus etiquetas (requiere `_lock`)."""
+    for tag in _key_tags.pop(key, ()):
+        keys = _tags.get(tag)
+        if keys is None:
+            continue
+        keys.discard(key)
+        if not keys:
+            del _tags[tag]
+
+
+def _memory_put(key: str, content: bytes) -> None:
+    global _memory_bytes
+
+    limite = settings.PDF_CACHE_MEMORY_MB * 1024 * 1024
+    if len(content) > limite:
+        return
+
+    with _lock:
+        anterior = _memory.pop(key, None)
+        if anterior is not None:
+            _memory_bytes -= len(anterior)
+        _memory[key] = content
+        _memory_bytes += len(content)
+
+        while _memory_bytes > limite:
+            desalojada, desalojado = _memory.popitem(last=False)
+            _memory_bytes -= len(desalojado)
+            _forget_tags(desalojada)
+
+
+def _memory_get(key: str) -> Optional[bytes]:
+    with _lock:
+        content = _memory.get(key)
+        if content is not None:
+            _memory.move_to_end(key)
+        return content
+
+
+# --- API pública ---
+
+def get(key: str) -> Optional[bytes]:
+    """
+    Busca un PDF en la caché (memoria y después disco).
+
+    Returns:
+        Contenido del PDF o None si no está cacheado.
+    """
+    content = _memory_get(key)
+    if content is not None:
+        return content
+
+    content = _disk_get(key)
+    if content is not None:
+        _memory_put(key, content)
+    return content
+
+
+def put(key: str, content: bytes, tags: Iterable[str] = ()) -> None:
+    """
+    Guarda un PDF en la caché.
+
+    Args:
+        key: Llave de contenido (ver `build_key`).
+        content: Bytes del PDF.
+        tags: Etiquetas para invalidación explícita.
+    """
+    _memory_put(key, content)
+    _disk_put(key, content)
+    _register_tags(key, tags)
+
+
+def _register_tags(key: str, tags: Iterable[str]) -> None:
+    with _lock:
+        # Solo se indexan las entradas en memoria (pudo desalojarse o no caber)
+        if key not in _memory:
+            return
+        for tag in tags:
+            _tags.setdefault(tag, set()).add(key)
+            _key_tags.setdefault(key, set()).add(tag)
+
+
+def invalidate(tag: str) -> None:
+    """
+    Descarta todos los PDFs registrados con una etiqueta.
+
+    Args:
+        tag: Etiqueta a invalidar (ej. `tag_reporte1(5)`).
+    """
+    global _memory_bytes
+
+    with _lock:
+        keys = _tags.pop(tag, set())
+        for key in keys:
+            content = _memory.pop(key, None)
+            if content is not None:
+                _memory_bytes -= len(content)
+            _forget_tags(key)
+
+    for key in keys:
+        _disk_remove(key)
+
+
+def clear() -> None:
+    """Vacía por completo el nivel en memoria de este proceso."""
+    global _memory_bytes
+
+    with _lock:
+        _memory.clear()
+        _tags.clear()
+        _key_tags.clear()
+        _memory_bytes = 0
+
+
+async def get_or_render(
+    key: str,
+    tags: Iterable[str],
+    render_fn: Callable[..., bytes],
+    *args: Any
+) -> bytes:
+    """
+    Devuelve el PDF cacheado o lo renderiza en el pool y lo guarda.
+
+    Args:
+        key: Llave de contenido del PDF.
+        tags: Etiquetas de invalidación de la entrada.
+        render_fn: Función de renderizado (se ejecuta con `render_executor`).
+        *args: Datos planos para `render_fn`.
+
+    Returns:
+        Bytes del PDF.
+    """
+    content = get(key)
+    if content is not None:
+        # Un acierto en disco pudo venir de otro worker: registramos las
+        # etiquetas también aquí para poder invalidarlo desde este proceso.
+        _register_tags(key, tags)
+        return content
+
+    content = await render_executor.run(render_fn, *args)
+    put(key, content, tags)
+    return content
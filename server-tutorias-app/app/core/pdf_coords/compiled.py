@@ -0,0 +1,77 @@
+"""
+Compilación de los mapas de coordenadas del Reporte Integral.
+
+Convierte las definiciones de `coords_pagina1` y `coords_pagina2` (diccionarios
+anidados en unidades de referencia) en arreglos planos de slots ya escalados
+al tamaño real de la página de la plantilla. El resultado se cachea por
+(layout, ancho, alto), de modo que cada página del reporte solo recorre tuplas
+y emite operaciones de texto, sin recalcular escalas ni consultar diccionarios.
+"""
+
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple, Any
+
+from app.core.pdf_coords.coords_pagina1 import coords as coords_p1, REF_W as P1_REF_W, REF_H as P1_REF_H
+from app.core.pdf_coords.coords_pagina2 import coords as coords_p2, REF_W as P2_REF_W, REF_H as P2_REF_H
+
+# Campos que se dibujan como marca (✔/✘) en lugar de su valor
+CHECK_FIELDS = frozenset({"jefatura", "ciencias", "psicologia"})
+
+LAYOUT_INTEGRAL_P1 = "integral_p1"
+LAYOUT_INTEGRAL_P2 = "integral_p2"
+
+_DEFINITIONS: Dict[str, Tuple[Dict[str, Any], float, float]] = {
+    LAYOUT_INTEGRAL_P1: (coords_p1, P1_REF_W, P1_REF_H),
+    LAYOUT_INTEGRAL_P2: (coords_p2, P2_REF_W, P2_REF_H),
+}
+
+# (campo, x, y)
+ExtraSlot = Tuple[str, float, float]
+# (campo, x, y, es_marca)
+FieldSlot = Tuple[str, float, float, bool]
+
+
+class CompiledLayout(NamedTuple):
+    """
+    Layout de overlay precompilado para un tamaño de página específico.
+
+    Attributes:
+        extra: Campos de encabezado (tutor, periodo, etc.) ya escalados.
+        slots: Un arreglo de campos escalados por cada fila de alumno.
+    """
+
+    extra: Tuple[ExtraSlot, ...]
+    slots: Tuple[Tuple[FieldSlot, ...], ...]
+
+
+@lru_cache(maxsize=None)
+def get_layout(name: str, page_width: float, page_height: float) -> CompiledLayout:
+    """
+    Obtiene el layout compilado para una plantilla y tamaño de página.
+
+    Args:
+        name: Nombre del layout (LAYOUT_INTEGRAL_P1 o LAYOUT_INTEGRAL_P2).
+        page_width: Ancho real de la página de la plantilla.
+        page_height: Alto real de la página de la plantilla.
+
+    Returns:
+        Layout con coordenadas ya escaladas al tamaño indicado.
+    """
+    definition, ref_width, ref_height = _DEFINITIONS[name]
+    scale_x = page_width / ref_width
+    scale_y = page_height / ref_height
+
+    extra = tuple(
+        (field_key, x * scale_x, y * scale_y)
+        for field_key, (x, y) in definition.get("extra", {}).items()
+    )
+
+    slots = tuple(
+        tuple(
+            (field_key, x * scale_x, y * scale_y, field_key in CHECK_FIELDS)
+            for field_key, (x, y) in alumno_coords.items()
+        )
+        for alumno_coords in definition.get("alumnos", [])
+    )
+
+    return CompiledLayout(extra=extra, slots=slots)
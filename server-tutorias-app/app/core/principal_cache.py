@@ -0,0 +1,126 @@
+"""
+Caché de usuarios autenticados (administradores, tutores y alumnos).
+
+Las dependencias de autenticación consultan la BD en cada petición para
+obtener al usuario del token. Esta caché conserva, por worker y durante
+AUTH_CACHE_TTL_SECONDS, una copia desconectada de cada usuario; en cada
+petición se une a la sesión actual con `Session.merge(load=False)`, que no
+ejecuta consultas, de modo que el endpoint recibe una instancia persistente
+como si la hubiera leído de la BD.
+
+Los servicios que modifican o eliminan usuarios invalidan su entrada. Como la
+caché es por proceso, los demás workers pueden ver el cambio con un retraso
+máximo de AUTH_CACHE_TTL_SECONDS.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple, Type, TypeVar
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session, SQLModel
+
+from app.core.config import settings
+
+
+TIPO_ADMIN = "admin"
+TIPO_TUTOR = "tutor"
+TIPO_ALUMNO = "alumno"
+
+T = TypeVar("T", bound=SQLModel)
+
+_entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _snapshot(instance: SQLModel) -> SQLModel:
+    """Copia desconectada (con identidad) de las columnas de una instancia."""
+    model: Type[SQLModel] = type(instance)
+    valores = {
+        attr.key: getattr(instance, attr.key)
+        for attr in sa_inspect(model).column_attrs
+    }
+    copia = model(**valores)
+    make_transient_to_detached(copia)
+    return copia
+
+
+def get(db: Session, tipo: str, clave: Any, model: Type[T]) -> Optional[T]:
+    """
+    Obtiene un usuario cacheado unido a la sesión actual.
+
+    Args:
+        db: Sesión de la petición.
+        tipo: Tipo de usuario (TIPO_ADMIN, TIPO_TUTOR o TIPO_ALUMNO).
+        clave: Identificador del usuario en el token (`sub`).
+        model: Modelo esperado.
+
+    Returns:
+        Instancia persistente en `db` o None si no está en caché o expiró.
+    """
+    if settings.AUTH_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    cache_key = (tipo, str(clave))
+    with _lock:
+        entrada = _entries.get(cache_key)
+        if entrada is None:
+            return None
+        expira, snapshot = entrada
+        if expira < time.monotonic():
+            del _entries[cache_key]
+            return None
+        _entries.move_to_end(cache_key)
+
+    if not isinstance(snapshot, model):
+        return None
+    return db.merge(snapshot, load=False)
+
+
+def put(tipo: str, clave: Any, instance: SQLModel) -> None:
+    """
+    Guarda un usuario recién consultado.
+
+    Args:
+        tipo: Tipo de usuario.
+        clave: Identificador del usuario en el token (`sub`).
+        instance: Instancia leída de la BD.
+    """
+    if settings.AUTH_CACHE_TTL_SECONDS <= 0:
+        return
+
+    snapshot = _snapshot(instance)
+    expira = time.monotonic() + settings.AUTH_CACHE_TTL_SECONDS
+
+    with _lock:
+        _entries[(tipo, str(clave))] = (expira, snapshot)
+        _entries.move_to_end((tipo, str(clave)))
+        while len(_entries) > settings.AUTH_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def invalidate(tipo: str, clave: Any) -> None:
+    """
+    Descarta un usuario de la caché (tras actualizarlo, eliminarlo o cambiar su contraseña).
+
+    Args:
+        tipo: Tipo de usuario.
+        clave: Identificador del usuario en el token (`sub`).
+    """
+    with _lock:
+        _entries.pop((tipo, str(clave)), None)
+
+
+def invalidate_tipo(tipo: str) -> None:
+    """Descarta todos los usuarios de un tipo (ej. tras una carga masiva)."""
+    with _lock:
+        for cache_key in [k for k in _entries if k[0] == tipo]:
+            del _entries[cache_key]
+
+
+def clear() -> None:
+    """Vacía la caché de este proceso."""
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,127 @@
+"""
+Conteo de consultas SQL por petición y presupuesto máximo por petición.
+
+Sirve para detectar consultas N+1 (por ejemplo, relaciones cargadas de forma
+perezosa una por fila al serializar la respuesta). Con QUERY_BUDGET > 0 cada
+respuesta (salvo las enviadas en streaming) incluye el encabezado
+`X-Query-Count`; si una petición excede el presupuesto se registra una
+advertencia y, con ENV=test, se levanta `QueryBudgetExceeded` para que la
+prueba falle.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Una petición ejecutó más consultas que QUERY_BUDGET."""
+
+
+class QueryCounter:
+    """Consultas ejecutadas dentro de un bloque `track()`."""
+
+    __slots__ = ("consultas",)
+
+    def __init__(self):
+        self.consultas = 0
+
+
+_actual: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+def _contar(conn, cursor, statement, parameters, context, executemany) -> None:
+    contador = _actual.get()
+    if contador is not None:
+        contador.consultas += 1
+
+
+def install(engine: Engine) -> None:
+    """Registra el contador de consultas en el engine (una sola vez)."""
+    if not event.contains(engine, "before_cursor_execute", _contar):
+        event.listen(engine, "before_cursor_execute", _contar)
+
+
+@contextmanager
+def track() -> Iterator[QueryCounter]:
+    """
+    Cuenta las consultas ejecutadas dentro del bloque (incluye los hilos que
+    heredan el contexto, como el threadpool de los endpoints síncronos).
+    """
+    contador = QueryCounter()
+    token = _actual.set(contador)
+    try:
+        yield contador
+    finally:
+        _actual.reset(token)
+
+
+class QueryBudgetMiddleware:
+    """
+    Aplica QUERY_BUDGET a cada petición HTTP.
+
+    Es un middleware ASGI puro para contar también las consultas que se
+    ejecutan mientras se envía el cuerpo (respuestas en streaming, ver
+    `app.core.streaming`). El presupuesto se revisa al enviar el último
+    fragmento del cuerpo.
+
+    En una respuesta de un solo fragmento, `X-Query-Count` lleva el total de
+    la petición. En una respuesta en streaming los encabezados salen antes
+    de que termine el cuerpo, así que no se incluye el encabezado; el
+    presupuesto se aplica igual al final.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track() as contador:
+            inicio: Optional[Message] = None
+
+            async def enviar(message: Message) -> None:
+                nonlocal inicio
+
+                if message["type"] == "http.response.start":
+                    # Se retiene hasta saber si el cuerpo viene en un solo fragmento
+                    inicio = message
+                    return
+
+                if message["type"] == "http.response.body":
+                    ultimo = not message.get("more_body", False)
+                    if inicio is not None:
+                        if ultimo:
+                            MutableHeaders(scope=inicio)["X-Query-Count"] = str(contador.consultas)
+                        await send(inicio)
+                        inicio = None
+                    await send(message)
+                    if ultimo:
+                        _verificar(scope, contador.consultas)
+                    return
+
+                await send(message)
+
+            await self.app(scope, receive, enviar)
+
+
+def _verificar(scope: Scope, consultas: int) -> None:
+    if consultas <= settings.QUERY_BUDGET:
+        return
+
+    mensaje = (
+        f"{scope['method']} {scope['path']} ejecutó {consultas} consultas "
+        f"(presupuesto: {settings.QUERY_BUDGET})."
+    )
+    if settings.ENV == "test":
+        raise QueryBudgetExceeded(mensaje)
+    print(f"⚠️ {mensaje}")
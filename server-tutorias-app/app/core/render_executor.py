@@ -0,0 +1,144 @@
+"""
+Ejecutor de renderizado de PDFs fuera del event loop.
+
+La generación de PDFs (reportlab + pypdf) es intensiva en CPU. Si se ejecuta
+directamente dentro de un endpoint `async def`, bloquea el event loop del
+worker de uvicorn y retrasa cualquier otra petición (login, /health, etc.).
+
+Este módulo mantiene un `ProcessPoolExecutor` acotado por worker de uvicorn.
+Los endpoints consultan la base de datos en la petición y envían únicamente
+diccionarios planos al proceso de renderizado. Si la cola supera
+`RENDER_QUEUE_LIMIT`, se responde 503 con `Retry-After` en lugar de acumular
+trabajo indefinidamente.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _get_executor() -> Optional[Executor]:
+    """
+    Obtiene (o crea de forma perezosa) el pool de procesos de renderizado.
+
+    Returns:
+        El pool de procesos, o None si RENDER_POOL_WORKERS es 0 (se usarán
+        los hilos por defecto del event loop).
+    """
+    global _executor
+
+    if settings.RENDER_POOL_WORKERS <= 0:
+        return None
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # 'spawn' evita heredar el estado del proceso padre
+                # (conexiones del pool de BD, hilos del event loop, etc.)
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.RENDER_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+class _RenderError(Exception):
+    """
+    Error de renderizado serializable entre procesos.
+
+    `HTTPException` no puede reconstruirse con pickle, por lo que dentro del
+    proceso de renderizado se traduce a esta excepción y en el proceso
+    principal se vuelve a levantar como `HTTPException`.
+    """
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _invoke(fn: Callable[..., T], *args: Any) -> T:
+    """Ejecuta `fn` dentro del proceso de renderizado."""
+    try:
+        return fn(*args)
+    except HTTPException as e:
+        raise _RenderError(e.status_code, e.detail)
+
+
+def _acquire_slot() -> None:
+    """Reserva un lugar en la cola o responde 503 si está llena."""
+    global _pending
+
+    with _pending_lock:
+        if _pending >= settings.RENDER_QUEUE_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El servidor está generando demasiados reportes. Intenta de nuevo en unos segundos.",
+                headers={"Retry-After": str(settings.RENDER_RETRY_AFTER)},
+            )
+        _pending += 1
+
+
+def _release_slot() -> None:
+    global _pending
+
+    with _pending_lock:
+        _pending -= 1
+
+
+def pending_jobs() -> int:
+    """Número de renderizados en cola o en proceso en este worker."""
+    return _pending
+
+
+async def run(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Ejecuta una función de renderizado en el pool sin bloquear el event loop.
+
+    La función y sus argumentos deben poder serializarse con pickle: funciones
+    a nivel de módulo y datos planos (dict, list, str, int), nunca objetos ORM
+    ni sesiones de base de datos.
+
+    Args:
+        fn: Función de renderizado a ejecutar.
+        *args: Argumentos de la función.
+
+    Returns:
+        El resultado de la función (normalmente los bytes del PDF).
+
+    Raises:
+        HTTPException: 503 si la cola de renderizado está llena, o la excepción
+            que haya levantado la función de renderizado.
+    """
+    _acquire_slot()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), _invoke, fn, *args)
+    except _RenderError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    finally:
+        _release_slot()
+
+
+def shutdown() -> None:
+    """Detiene el pool de procesos (se invoca al apagar la aplicación)."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,177 @@
+"""
+Búsqueda de alumnos y tutores por nombre, número de control o correo.
+
+Cada tabla buscable guarda en la columna `busqueda` sus campos de texto
+normalizados (minúsculas, sin acentos ni espacios repetidos), mantenida por
+los modelos al insertar/actualizar y por las cargas masivas. Sobre esa
+columna se crea un índice de subcadenas:
+
+- PostgreSQL: índice GIN con `pg_trgm`, que atiende `LIKE '%texto%'` sin
+  recorrer la tabla completa.
+- SQLite (desarrollo): tabla virtual FTS5 con tokenizador `trigram`,
+  sincronizada con triggers. Si la tabla FTS no existe (por ejemplo, SQLite
+  compilado sin FTS5), la búsqueda usa `LIKE` sobre `busqueda`.
+
+Cada palabra del término debe aparecer en el texto (en cualquier campo y
+orden). Los resultados se ordenan por relevancia: primero los que empiezan
+con el término, luego los que tienen una palabra que empieza con él y al
+final el resto.
+"""
+
+import unicodedata
+from typing import Any, List, Optional, Set, Tuple, Type
+
+from sqlalchemy import and_, case, column, select, table, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel
+
+
+# Tablas con columna `busqueda` indexada: nombre de tabla -> llave primaria
+SEARCH_TABLES = {
+    "alumno": "id_alumno",
+    "tutor": "id_tutor",
+}
+
+# FTS5 con tokenizador trigram solo indexa términos de al menos 3 caracteres
+_MIN_TRIGRAM = 3
+
+_LIKE_ESCAPE = "/"
+
+# (URL de la BD, tabla) cuyas tablas FTS de SQLite ya se comprobó que existen
+_fts_disponibles: Set[Tuple[str, str]] = set()
+
+
+def normalize(texto: str) -> str:
+    """
+    Normaliza un texto para búsqueda ("Núñez  Pérez" -> "nunez perez").
+    """
+    sin_acentos = "".join(
+        caracter for caracter in unicodedata.normalize("NFKD", texto)
+        if not unicodedata.combining(caracter)
+    )
+    return " ".join(sin_acentos.lower().split())
+
+
+def search_text(*partes: Optional[str]) -> str:
+    """Valor de la columna `busqueda` a partir de los campos buscables de un registro."""
+    return normalize(" ".join(str(parte) for parte in partes if parte))
+
+
+def _escape_like(valor: str) -> str:
+    return (
+        valor.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", _LIKE_ESCAPE + "%")
+        .replace("_", _LIKE_ESCAPE + "_")
+    )
+
+
+def _fts_phrase(valor: str) -> str:
+    return '"' + valor.replace('"', '""') + '"'
+
+
+def _existe_fts(conn, tabla: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nombre"),
+        {"nombre": f"{tabla}_fts"}
+    ).first() is not None
+
+
+def _fts_disponible(session: Session, tabla: str) -> bool:
+    """Indica si existe la tabla FTS de `tabla` (se recuerda solo si existe)."""
+    llave = (str(session.get_bind().url), tabla)
+    if llave not in _fts_disponibles and _existe_fts(session.connection(), tabla):
+        _fts_disponibles.add(llave)
+    return llave in _fts_disponibles
+
+
+def build_search(session: Session, model: Type[SQLModel], term: str) -> Tuple[Any, Any]:
+    """
+    Construye el filtro y la relevancia de una búsqueda sobre `model`.
+
+    Args:
+        session: Sesión (define el dialecto de la BD).
+        model: Modelo con columna `busqueda` (Alumno o Tutor).
+        term: Texto buscado por el usuario.
+
+    Returns:
+        Tupla (condición para `where`, expresión entera de relevancia; mayor
+        es más relevante).
+    """
+    columna = model.busqueda  # type: ignore[attr-defined]
+    tabla = model.__tablename__
+    termino = normalize(term)
+    palabras = termino.split() or [""]
+    usar_fts = (
+        session.get_bind().dialect.name == "sqlite"
+        and any(len(palabra) >= _MIN_TRIGRAM for palabra in palabras)
+        and _fts_disponible(session, tabla)
+    )
+
+    condiciones: List[Any] = []
+    for palabra in palabras:
+        if usar_fts and len(palabra) >= _MIN_TRIGRAM:
+            fts = table(f"{tabla}_fts", column("rowid"), column("busqueda"))
+            condiciones.append(
+                getattr(model, SEARCH_TABLES[tabla]).in_(
+                    select(fts.c.rowid).where(fts.c.busqueda.op("MATCH")(_fts_phrase(palabra)))
+                )
+            )
+        else:
+            condiciones.append(columna.like(f"%{_escape_like(palabra)}%", escape=_LIKE_ESCAPE))
+
+    patron = _escape_like(termino)
+    relevancia = case(
+        (columna.like(f"{patron}%", escape=_LIKE_ESCAPE), 2),
+        (columna.like(f"% {patron}%", escape=_LIKE_ESCAPE), 1),
+        else_=0
+    )
+    return and_(*condiciones), relevancia
+
+
+def ensure_indexes(engine: Engine, rebuild: bool = False) -> None:
+    """
+    Crea (si no existen) los índices de búsqueda del dialecto activo.
+
+    Args:
+        engine: Engine de la aplicación.
+        rebuild: En SQLite, reconstruye las tablas FTS a partir de la columna
+            `busqueda` (necesario tras llenarla con UPDATE fuera de los triggers).
+    """
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for tabla in SEARCH_TABLES:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{tabla}_busqueda_trgm "
+                    f"ON {tabla} USING gin (busqueda gin_trgm_ops)"
+                ))
+            return
+
+        if engine.dialect.name != "sqlite":
+            return
+
+        for tabla, llave in SEARCH_TABLES.items():
+            existe = _existe_fts(conn, tabla)
+
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabla}_fts USING fts5("
+                f"busqueda, content='{tabla}', content_rowid='{llave}', tokenize='trigram')"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {tabla}_fts_ai AFTER INSERT ON {tabla} BEGIN "
+                f"INSERT INTO {tabla}_fts(rowid, busqueda) VALUES (new.{llave}, new.busqueda); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {tabla}_fts_ad AFTER DELETE ON {tabla} BEGIN "
+                f"INSERT INTO {tabla}_fts({tabla}_fts, rowid, busqueda) "
+                f"VALUES ('delete', old.{llave}, old.busqueda); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {tabla}_fts_au AFTER UPDATE OF busqueda ON {tabla} BEGIN "
+                f"INSERT INTO {tabla}_fts({tabla}_fts, rowid, busqueda) "
+                f"VALUES ('delete', old.{llave}, old.busqueda); "
+                f"INSERT INTO {tabla}_fts(rowid, busqueda) VALUES (new.{llave}, new.busqueda); END"
+            ))
+
+            if rebuild or not existe:
+                conn.execute(text(f"INSERT INTO {tabla}_fts({tabla}_fts) VALUES ('rebuild')"))
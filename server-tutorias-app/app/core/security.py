@@ -5,8 +5,11 @@ Proporciona funciones para el hashing de contraseñas y generación
 de tokens JWT para autenticación de usuarios.
 """
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import List, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -15,6 +18,16 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Contraseñas temporales de cargas masivas: se derivan de datos conocidos
+# (ej. número de control) y se reemplazan en el primer acceso, por lo que
+# un costo alto solo encarece la importación sin aportar seguridad real.
+temp_pwd_context = CryptContext(
+    schemes=["bcrypt"], bcrypt__rounds=settings.TEMP_PASSWORD_BCRYPT_ROUNDS
+)
+
+# Por debajo de este número no compensa arrancar procesos
+_MIN_HASHES_PARALELO = 256
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -25,9 +38,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         hashed_password: Hash bcrypt de la contraseña almacenada.
     
     Returns:
-        True si la contraseña es válida, False en caso contrario.
+        True si la contraseña es válida, False en caso contrario (incluido
+        cuando el valor almacenado no es un hash reconocible).
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except ValueError:
+        return False
 
 
 def get_password_hash(password: str) -> str:
@@ -43,6 +60,45 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def get_temp_password_hash(password: str) -> str:
+    """
+    Genera el hash bcrypt (de menor costo) de una contraseña temporal.
+    
+    Args:
+        password: Contraseña temporal en texto plano.
+    
+    Returns:
+        Hash bcrypt verificable con `verify_password`.
+    """
+    return temp_pwd_context.hash(password)
+
+
+def hash_temp_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hashea en paralelo las contraseñas temporales de una carga masiva.
+    
+    Reparte el trabajo en un pool de procesos (PASSWORD_IMPORT_WORKERS) y
+    conserva el orden de entrada.
+    
+    Args:
+        passwords: Contraseñas temporales en texto plano.
+    
+    Returns:
+        Hashes en el mismo orden que `passwords`.
+    """
+    workers = settings.PASSWORD_IMPORT_WORKERS or os.cpu_count() or 1
+    
+    if workers <= 1 or len(passwords) < _MIN_HASHES_PARALELO:
+        return [get_temp_password_hash(p) for p in passwords]
+    
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        return list(executor.map(get_temp_password_hash, passwords, chunksize=chunksize))
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Crea un token JWT firmado con los datos proporcionados.
@@ -0,0 +1,72 @@
+"""
+Respuestas en streaming para listados completos (JSON y NDJSON).
+
+`session.exec(query).all()` convierte todas las filas en objetos ORM y FastAPI
+arma después un solo arreglo JSON con todos ellos, así que la memoria de la
+petición crece con cada semestre de datos acumulados.
+
+Estas respuestas recorren la consulta con `yield_per` (cursor del lado del
+servidor en PostgreSQL) y serializan registro por registro con el esquema de
+lectura, enviando cada fragmento en cuanto está listo. La memoria por petición
+queda acotada por STREAM_BATCH_SIZE sin importar el total de filas.
+
+La consulta se ejecuta en una sesión propia, abierta y cerrada por el propio
+generador, porque el cuerpo se envía después de que termina el endpoint.
+"""
+
+from typing import Any, Iterator, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.database import engine
+
+
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+
+
+def _iter_json(query: Any, schema: Type[BaseModel]) -> Iterator[str]:
+    """Ejecuta la consulta por lotes y serializa cada registro con `schema`."""
+    with Session(engine) as session:
+        resultado = session.exec(
+            query.execution_options(yield_per=max(1, settings.STREAM_BATCH_SIZE))
+        )
+        for registro in resultado:
+            yield schema.model_validate(registro).model_dump_json()
+
+
+def _iter_ndjson(query: Any, schema: Type[BaseModel]) -> Iterator[bytes]:
+    for linea in _iter_json(query, schema):
+        yield (linea + "\n").encode()
+
+
+def _iter_array(query: Any, schema: Type[BaseModel]) -> Iterator[bytes]:
+    yield b"["
+    separador = b""
+    for registro in _iter_json(query, schema):
+        yield separador + registro.encode()
+        separador = b","
+    yield b"]"
+
+
+def ndjson_response(query: Any, schema: Type[BaseModel]) -> StreamingResponse:
+    """
+    Envía el resultado de una consulta como NDJSON (un objeto JSON por línea).
+
+    Args:
+        query: Consulta de SQLModel (con sus opciones de carga y orden).
+        schema: Esquema de lectura con `from_attributes=True`.
+    """
+    return StreamingResponse(_iter_ndjson(query, schema), media_type=MEDIA_TYPE_NDJSON)
+
+
+def json_array_response(query: Any, schema: Type[BaseModel]) -> StreamingResponse:
+    """
+    Envía el resultado de una consulta como un arreglo JSON, generado en streaming.
+
+    El cuerpo es equivalente al de devolver la lista completa con
+    `response_model=List[schema]`.
+    """
+    return StreamingResponse(_iter_array(query, schema), media_type="application/json")
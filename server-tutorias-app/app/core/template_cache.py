@@ -0,0 +1,184 @@
+"""
+Caché de plantillas PDF parseadas a nivel de proceso.
+
+Las plantillas (formato.pdf, formato_constancia.pdf, etc.) se leen y parsean
+una sola vez por proceso. Cada generación de PDF agrega un clon ligero de la
+página base a su documento de salida, en lugar de volver a abrir y parsear
+el archivo desde disco.
+
+La caché se invalida automáticamente cuando cambia el archivo en disco
+(mtime/ctime/tamaño), y además expone `invalidate()` para que los endpoints
+de carga o restauración de plantillas apliquen el cambio de inmediato.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PdfReader, PdfWriter, PageObject
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject
+
+
+# Firma del archivo en disco: (mtime_ns, ctime_ns, tamaño)
+_FileSignature = Tuple[int, int, int]
+
+_CONTENTS = NameObject("/Contents")
+
+
+class CachedPdfTemplate:
+    """
+    Plantilla PDF parseada y lista para clonar páginas.
+
+    Attributes:
+        path: Ruta absoluta del archivo de plantilla.
+        signature: Firma del archivo (mtime, ctime, tamaño) al momento de cargarlo.
+        digest: Hash SHA-256 del contenido de la plantilla.
+        page_sizes: Lista de (ancho, alto) de cada página.
+    """
+
+    def __init__(self, path: str, signature: _FileSignature, content: bytes):
+        self.path = path
+        self.signature = signature
+        self.digest = hashlib.sha256(content).hexdigest()
+        self._reader = PdfReader(io.BytesIO(content))
+        self._lock = threading.Lock()
+
+        # Resolvemos todos los objetos una sola vez para que los clones
+        # posteriores no vuelvan a leer ni parsear el stream compartido.
+        for page in self._reader.pages:
+            _resolve_tree(page, set())
+
+        self.page_sizes: List[Tuple[float, float]] = [
+            (float(page.mediabox.width), float(page.mediabox.height))
+            for page in self._reader.pages
+        ]
+
+    @property
+    def num_pages(self) -> int:
+        """Número de páginas de la plantilla."""
+        return len(self.page_sizes)
+
+    def add_page_to(self, writer: PdfWriter, index: int) -> PageObject:
+        """
+        Agrega una copia de una página de la plantilla al `writer` indicado.
+
+        pypdf clona la página dentro del writer (diccionario propio y objetos
+        copiados al documento de salida), por lo que `merge_page` sobre la
+        página devuelta no altera la plantilla cacheada. Agregar la misma
+        página varias veces comparte fuentes e imágenes en el PDF de salida,
+        pero cada copia recibe su propio stream de contenido: `merge_page`
+        reescribe ese stream, y si fuera compartido cada overlay aparecería
+        en todas las copias.
+
+        Args:
+            writer: Documento de salida que recibirá la página.
+            index: Índice de la página de la plantilla (0 = primera página).
+
+        Returns:
+            Página ya agregada al writer, lista para recibir un overlay.
+        """
+        with self._lock:
+            source = self._reader.pages[index]
+            page = writer.add_page(source)
+
+            # Si la página ya estaba en este writer, pypdf reutiliza su stream
+            # (quizá ya combinado con otro overlay): se copia el de la plantilla.
+            contents = page.get(_CONTENTS)
+            if contents is not None and any(
+                other.get(_CONTENTS) == contents
+                for other in writer.pages
+                if other.indirect_reference != page.indirect_reference
+            ):
+                duplicate = source[_CONTENTS].get_object().clone(writer, force_duplicate=True)
+                page[_CONTENTS] = duplicate.indirect_reference or duplicate
+            return page
+
+
+_cache: Dict[str, CachedPdfTemplate] = {}
+_cache_lock = threading.Lock()
+
+
+def _resolve_tree(obj, visited: set) -> None:
+    """Resuelve recursivamente todos los objetos indirectos alcanzables."""
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key in visited:
+            return
+        visited.add(key)
+        obj = obj.get_object()
+
+    if isinstance(obj, DictionaryObject):
+        for key, value in obj.items():
+            if key == "/Parent":
+                continue
+            _resolve_tree(value, visited)
+    elif isinstance(obj, ArrayObject):
+        for value in obj:
+            _resolve_tree(value, visited)
+
+
+def _file_signature(path: str) -> _FileSignature:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+
+
+def get_template(path: str) -> CachedPdfTemplate:
+    """
+    Obtiene la plantilla cacheada, cargándola o recargándola si es necesario.
+
+    Args:
+        path: Ruta del archivo PDF de plantilla.
+
+    Returns:
+        Plantilla parseada y vigente respecto al archivo en disco.
+
+    Raises:
+        FileNotFoundError: Si la plantilla no existe.
+    """
+    abs_path = os.path.abspath(path)
+    signature = _file_signature(abs_path)
+
+    template = _cache.get(abs_path)
+    if template is not None and template.signature == signature:
+        return template
+
+    with _cache_lock:
+        template = _cache.get(abs_path)
+        if template is not None and template.signature == signature:
+            return template
+
+        with open(abs_path, "rb") as f:
+            content = f.read()
+
+        template = CachedPdfTemplate(abs_path, _file_signature(abs_path), content)
+        _cache[abs_path] = template
+        return template
+
+
+def get_template_digest(path: str) -> str:
+    """
+    Obtiene el hash SHA-256 del contenido vigente de una plantilla.
+
+    Args:
+        path: Ruta del archivo PDF de plantilla.
+
+    Returns:
+        Hash hexadecimal del contenido de la plantilla.
+    """
+    return get_template(path).digest
+
+
+def invalidate(path: Optional[str] = None) -> None:
+    """
+    Descarta una plantilla de la caché (o todas si no se indica ruta).
+
+    Args:
+        path: Ruta de la plantilla a descartar. Si es None, limpia toda la caché.
+    """
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
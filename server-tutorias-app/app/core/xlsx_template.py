@@ -0,0 +1,356 @@
+"""
+Plantillas de Excel para generación en modo streaming (write-only).
+
+`openpyxl.load_workbook` sobre una plantilla con miles de filas con formato
+cuesta más que el propio llenado de datos, y el libro resultante vive
+completo en memoria hasta guardarse. Este módulo carga cada plantilla una sola
+vez por proceso y conserva una "instantánea" de sus hojas (celdas, estilos,
+dimensiones, celdas combinadas y configuración de página).
+
+Cada generación crea un libro `write_only` y escribe las filas en orden:
+las filas de la plantilla se copian tal cual y las filas con datos combinan
+los valores nuevos con el estilo de la plantilla. El resultado, al abrirse,
+es equivalente al de cargar la plantilla y modificar sus celdas.
+"""
+
+import os
+import threading
+from copy import copy
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.workbook import Workbook
+from openpyxl.worksheet.cell_range import CellRange
+
+
+# (font, border, fill, number_format, protection, alignment)
+StyleKey = Tuple[Any, Any, Any, str, Any, Any]
+
+# Estilo de las celdas de la plantilla que no tienen formato propio
+_NO_STYLE = -1
+
+# (columna, valor, id de estilo en XlsxTemplate.styles)
+_TemplateCell = Tuple[int, Any, int]
+
+# Atributos de hoja que se copian de la plantilla al libro de salida
+_SHEET_ATTRIBUTES = (
+    "sheet_properties", "sheet_format", "views", "page_setup", "page_margins",
+    "print_options", "protection", "HeaderFooter", "row_breaks", "col_breaks",
+    "auto_filter", "data_validations", "conditional_formatting",
+)
+
+
+def _style_key(cell) -> StyleKey:
+    """
+    Obtiene los objetos de estilo reales de una celda.
+
+    Se leen de las tablas del libro (no de `cell.font`, que devuelve proxies
+    no hashables) para poder identificar estilos repetidos.
+    """
+    workbook = cell.parent.parent
+    style = cell._style
+    return (
+        workbook._fonts[style.fontId],
+        workbook._borders[style.borderId],
+        workbook._fills[style.fillId],
+        cell.number_format,
+        workbook._protections[style.protectionId],
+        workbook._alignments[style.alignmentId],
+    )
+
+
+class _SheetSnapshot:
+    """Contenido de una hoja de la plantilla, indexado por fila."""
+
+    def __init__(self, worksheet, intern_style):
+        self.title: str = worksheet.title
+        self.source = worksheet
+        self.max_row: int = worksheet.max_row
+        self.rows: Dict[int, List[_TemplateCell]] = {}
+
+        for row in worksheet.iter_rows():
+            cells = [
+                (cell.column, cell.value, intern_style(cell) if cell.has_style else _NO_STYLE)
+                for cell in row
+                if cell.value is not None or cell.has_style
+            ]
+            if cells:
+                self.rows[row[0].row] = cells
+
+
+class XlsxTemplate:
+    """
+    Plantilla de Excel cargada una vez y reutilizable para escritura en streaming.
+
+    Los estilos distintos de la plantilla se numeran al cargarla, de modo que
+    cada generación solo registra en el libro de salida unos cuantos estilos
+    en lugar de comparar objetos de estilo celda por celda.
+
+    Attributes:
+        path: Ruta absoluta de la plantilla.
+        signature: Firma del archivo (mtime, tamaño) al momento de cargarla.
+        sheet_names: Nombres de las hojas en orden.
+        styles: Estilos distintos usados por la plantilla (el 0 es el estilo por defecto).
+        sheets: Instantánea de cada hoja, por nombre.
+    """
+
+    def __init__(self, path: str, signature: Tuple[int, int]):
+        self.path = path
+        self.signature = signature
+        self._workbook = openpyxl.load_workbook(path)
+        self.sheet_names: List[str] = self._workbook.sheetnames
+
+        default_key = (
+            self._workbook._fonts[0], self._workbook._borders[0], self._workbook._fills[0],
+            "General", self._workbook._protections[0], self._workbook._alignments[0],
+        )
+        self.styles: List[StyleKey] = [default_key]
+        style_ids: Dict[StyleKey, int] = {default_key: 0}
+
+        def intern_style(cell) -> int:
+            key = _style_key(cell)
+            style_id = style_ids.get(key)
+            if style_id is None:
+                style_id = style_ids[key] = len(self.styles)
+                self.styles.append(key)
+            return style_id
+
+        self.sheets: Dict[str, _SheetSnapshot] = {
+            ws.title: _SheetSnapshot(ws, intern_style) for ws in self._workbook.worksheets
+        }
+
+    def new_workbook(self) -> Tuple[Workbook, Dict[str, "TemplateSheetWriter"]]:
+        """
+        Crea un libro write-only con la misma estructura que la plantilla.
+
+        Returns:
+            El libro nuevo y un escritor por cada hoja (por nombre). Las hojas
+            deben escribirse con su escritor y cerrarse con `finish()` antes de
+            guardar el libro.
+        """
+        workbook = Workbook(write_only=True)
+        workbook.loaded_theme = self._workbook.loaded_theme
+        workbook.calculation = copy(self._workbook.calculation)
+
+        registry = _StyleRegistry(self.styles)
+        writers: Dict[str, TemplateSheetWriter] = {}
+
+        for name in self.sheet_names:
+            ws = workbook.create_sheet(title=name)
+            registry.bind(ws)
+            writers[name] = TemplateSheetWriter(self.sheets[name], ws, registry)
+
+        return workbook, writers
+
+
+class _StyleRegistry:
+    """
+    Traduce los estilos de la plantilla (y sus variantes) a estilos del libro de salida.
+
+    Cada combinación se registra una sola vez por libro; las variantes se
+    identifican por el id del estilo base y la identidad de los objetos
+    de borde/fuente/alineación que las modifican.
+    """
+
+    def __init__(self, styles: List[StyleKey]):
+        self._styles = styles
+        self._ws = None
+        self._base: Dict[int, StyleArray] = {}
+        self._derived: Dict[Tuple[int, int, int, int], Tuple[StyleArray, Tuple[Any, ...]]] = {}
+
+    def bind(self, worksheet) -> None:
+        if self._ws is None:
+            self._ws = worksheet
+
+    def _register(self, key: StyleKey) -> StyleArray:
+        cell = WriteOnlyCell(self._ws)
+        cell.font, cell.border, cell.fill, cell.number_format, cell.protection, cell.alignment = key
+        return cell._style
+
+    def base(self, style_id: int) -> StyleArray:
+        style = self._base.get(style_id)
+        if style is None:
+            style = self._base[style_id] = self._register(self._styles[style_id])
+        return style
+
+    def derived(
+        self,
+        style_id: int,
+        border: Optional[Border],
+        font: Optional[Font],
+        alignment: Optional[Alignment]
+    ) -> StyleArray:
+        cache_key = (style_id, id(border), id(font), id(alignment))
+        entry = self._derived.get(cache_key)
+        if entry is None:
+            font_, border_, fill_, number_format_, protection_, alignment_ = self._styles[style_id]
+            key = (
+                font if font is not None else font_,
+                border if border is not None else border_,
+                fill_,
+                number_format_,
+                protection_,
+                alignment if alignment is not None else alignment_,
+            )
+            # Conservamos las referencias para que sus id() no se reutilicen
+            entry = self._derived[cache_key] = (self._register(key), (border, font, alignment))
+        return entry[0]
+
+
+class TemplateSheetWriter:
+    """
+    Escribe una hoja write-only fila por fila a partir de la plantilla.
+
+    Las filas deben escribirse en orden ascendente; las filas de la plantilla
+    que queden entre medio se copian automáticamente.
+    """
+
+    def __init__(self, snapshot: _SheetSnapshot, worksheet, registry: _StyleRegistry):
+        self._snapshot = snapshot
+        self._ws = worksheet
+        self._registry = registry
+        self._next_row = 1
+        self._copy_sheet_attributes()
+
+    def _copy_sheet_attributes(self) -> None:
+        source = self._snapshot.source
+
+        for attr in _SHEET_ATTRIBUTES:
+            setattr(self._ws, attr, copy(getattr(source, attr)))
+        self._ws.page_setup._parent = self._ws
+        self._ws.merged_cells = copy(source.merged_cells)
+        self._ws.defined_names = copy(source.defined_names)
+
+        for key, dim in source.column_dimensions.items():
+            nuevo = copy(dim)
+            nuevo.parent = self._ws
+            self._ws.column_dimensions[key] = nuevo
+
+        for key, dim in source.row_dimensions.items():
+            nuevo = copy(dim)
+            nuevo.parent = self._ws
+            self._ws.row_dimensions[key] = nuevo
+
+    def _append(self, cells: Iterable[Tuple[int, Any, Optional[StyleArray]]]) -> None:
+        row: List[Any] = []
+        for column, value, style in cells:
+            row.extend([None] * (column - 1 - len(row)))
+            cell = WriteOnlyCell(self._ws, value=value)
+            if style is not None:
+                cell._style = copy(style)
+            row.append(cell)
+        self._ws.append(row)
+        self._next_row += 1
+
+    def _append_template_row(self, row_idx: int) -> None:
+        base = self._registry.base
+        self._append(
+            (column, value, base(style_id) if style_id != _NO_STYLE else None)
+            for column, value, style_id in self._snapshot.rows.get(row_idx, ())
+        )
+
+    def write_until(self, row_idx: int) -> None:
+        """Copia las filas de la plantilla anteriores a `row_idx`."""
+        while self._next_row < row_idx:
+            self._append_template_row(self._next_row)
+
+    def write_row(
+        self,
+        row_idx: int,
+        values: Dict[int, Any],
+        columns: Optional[range] = None,
+        border: Optional[Border] = None,
+        font: Optional[Font] = None,
+        alignment: Optional[Alignment] = None,
+        alignment_by_column: Optional[Dict[int, Alignment]] = None
+    ) -> None:
+        """
+        Escribe una fila combinando la plantilla con valores y estilos nuevos.
+
+        Equivale a asignar `values` y, para cada columna de `columns`, reemplazar
+        el borde, la fuente y la alineación de la celda de la plantilla.
+
+        Args:
+            row_idx: Número de fila (debe ser mayor a la última escrita).
+            values: Valores por número de columna (1 = A).
+            columns: Columnas a las que se aplican `border`, `font` y `alignment`.
+            border: Borde a aplicar en `columns`.
+            font: Fuente a aplicar en `columns`.
+            alignment: Alineación a aplicar en `columns`.
+            alignment_by_column: Alineación específica para columnas puntuales
+                (los objetos deben conservarse entre filas para reutilizar el estilo).
+        """
+        if row_idx < self._next_row:
+            raise ValueError(f"La fila {row_idx} ya fue escrita en la hoja {self._ws.title}.")
+        self.write_until(row_idx)
+
+        cells: Dict[int, List[Any]] = {
+            column: [value, style_id] for column, value, style_id in self._snapshot.rows.get(row_idx, ())
+        }
+        styles: Dict[int, Optional[StyleArray]] = {}
+
+        for column in columns or ():
+            style_id = cells.setdefault(column, [None, _NO_STYLE])[1]
+            alignment_ = alignment
+            if alignment_by_column and column in alignment_by_column:
+                alignment_ = alignment_by_column[column]
+            styles[column] = self._registry.derived(
+                style_id if style_id != _NO_STYLE else 0, border, font, alignment_
+            )
+
+        for column, value in values.items():
+            cells.setdefault(column, [None, _NO_STYLE])[0] = value
+
+        self._append(
+            (
+                column,
+                value,
+                styles[column] if column in styles
+                else (self._registry.base(style_id) if style_id != _NO_STYLE else None)
+            )
+            for column, (value, style_id) in sorted(cells.items())
+        )
+
+    def merge_cells(self, range_string: str) -> None:
+        """Registra un rango combinado (las celdas ocultas quedan vacías)."""
+        self._ws.merged_cells.add(CellRange(range_string))
+
+    def finish(self) -> None:
+        """Copia las filas restantes de la plantilla."""
+        self.write_until(self._snapshot.max_row + 1)
+
+
+_cache: Dict[str, XlsxTemplate] = {}
+_cache_lock = threading.Lock()
+
+
+def get_template(path: str) -> XlsxTemplate:
+    """
+    Obtiene la plantilla cacheada, cargándola o recargándola si cambió en disco.
+
+    Args:
+        path: Ruta del archivo .xlsx de plantilla.
+
+    Returns:
+        Plantilla lista para `new_workbook()`.
+
+    Raises:
+        FileNotFoundError: Si la plantilla no existe.
+    """
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    template = _cache.get(abs_path)
+    if template is not None and template.signature == signature:
+        return template
+
+    with _cache_lock:
+        template = _cache.get(abs_path)
+        if template is None or template.signature != signature:
+            template = XlsxTemplate(abs_path, signature)
+            _cache[abs_path] = template
+        return template
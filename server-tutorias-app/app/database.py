@@ -8,7 +8,9 @@ Soporta entornos híbridos:
 
 from sqlmodel import SQLModel, create_engine, Session
 from sqlalchemy.pool import NullPool
+from sqlalchemy.dialects import postgresql, sqlite
 from app.core.config import settings
+from app.core import search
 
 # 1. Definir argumentos de conexión base
 connect_args = {}
@@ -75,6 +77,24 @@ if poolclass:
 engine = create_engine(database_url, **final_engine_kwargs)
 
 
+def dialect_insert(model):
+    """
+    Construye un INSERT del dialecto activo que soporta `on_conflict_do_update`.
+
+    PostgreSQL y SQLite (>= 3.24) implementan `INSERT ... ON CONFLICT`, pero
+    SQLAlchemy lo expone desde la construcción específica de cada dialecto.
+
+    Args:
+        model: Modelo o tabla destino.
+
+    Returns:
+        Sentencia `Insert` del dialecto de `engine`.
+    """
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 def create_db_and_tables():
     """
     Crea todas las tablas definidas en los modelos SQLModel.
@@ -98,6 +118,12 @@ def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
     print("Tablas listas.")
 
+    try:
+        search.ensure_indexes(engine)
+    except Exception as e:
+        # La búsqueda sigue funcionando con LIKE, pero recorriendo la tabla completa
+        print(f"🔴 ERROR al crear los índices de búsqueda (se usará LIKE sin índice): {e}")
+
 
 def get_session():
     """
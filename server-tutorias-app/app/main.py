@@ -11,7 +11,9 @@ from contextlib import asynccontextmanager
 from sqlalchemy import text
 
 from app.core.config import settings
+from app.core import render_executor, hash_executor, query_budget
 from app.database import create_db_and_tables, engine
+from app.services import pdf_generator_service
 from app.routers import (
     administradores,
     alumnos,
@@ -31,14 +33,23 @@ from app.routers import (
 async def lifespan(app: FastAPI):
     """
     Gestiona el ciclo de vida de la aplicación.
-    Crea las tablas al iniciar si no existen.
+    Crea las tablas al iniciar si no existen y precarga las plantillas PDF.
+    Al apagar, detiene el pool de procesos de renderizado de PDFs y el de hashing.
     """
     try:
         create_db_and_tables()
         print("✅ Base de datos inicializada correctamente")
     except Exception as e:
         print(f"❌ Error durante inicialización: {e}")
+    
+    try:
+        pdf_generator_service.warm_up_templates()
+    except Exception as e:
+        print(f"⚠️ No se pudieron precargar las plantillas PDF: {e}")
     yield
+    
+    render_executor.shutdown()
+    hash_executor.shutdown()
 
 
 app = FastAPI(
@@ -62,6 +73,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Control de consultas por petición (detección de N+1 en pruebas)
+if settings.QUERY_BUDGET > 0:
+    query_budget.install(engine)
+    app.add_middleware(query_budget.QueryBudgetMiddleware)
+
 
 # Registro de Routers
 app.include_router(administradores.router, prefix="/api")
@@ -105,5 +121,6 @@ async def health_check():
         "status": "healthy",
         "service": "tutorias-backend",
         "database": db_status,
-        "environment": settings.ENV
+        "environment": settings.ENV,
+        "password_hashing": hash_executor.metrics()
     }
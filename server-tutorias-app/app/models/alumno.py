@@ -6,10 +6,12 @@ incluyendo información académica y de contacto.
 """
 
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, event
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, timezone
 
+from app.core.search import search_text
+
 if TYPE_CHECKING:
     from .tutoria import Tutoria
 
@@ -36,6 +38,8 @@ class Alumno(SQLModel, table=True):
         telefono: Número telefónico de contacto (opcional).
         correo: Dirección de correo electrónico.
         requires_password_change: Indica si el alumno debe cambiar su contraseña.
+        busqueda: Nombre completo y número de control normalizados para la
+            búsqueda indexada (se mantiene automáticamente, ver `app.core.search`).
         created_at: Fecha y hora de creación del registro.
         updated_at: Fecha y hora de última actualización del registro.
         tutorias: Relación con las tutorías asignadas al alumno.
@@ -53,6 +57,7 @@ class Alumno(SQLModel, table=True):
     telefono: Optional[str] = Field(default=None, max_length=100)
     correo: str = Field(max_length=255, index=True)
     requires_password_change: bool = Field(default=True)
+    busqueda: Optional[str] = Field(default=None, max_length=400)
     
     created_at: datetime = Field(
         sa_type=DateTime(timezone=True), # type: ignore
@@ -66,3 +71,9 @@ class Alumno(SQLModel, table=True):
     )
     
     tutorias: List["Tutoria"] = Relationship(back_populates="alumno")
+
+
+@event.listens_for(Alumno, "before_insert")
+@event.listens_for(Alumno, "before_update")
+def _actualizar_busqueda(mapper, connection, target: Alumno) -> None:
+    target.busqueda = search_text(target.nombre, target.apellido_p, target.apellido_m, target.num_control)
@@ -24,7 +24,10 @@ class ConfiguracionSistema(SQLModel, table=True):
     Attributes:
         id: Identificador fijo (siempre 1) para garantizar registro único.
         reporte_integral_etapa: Etapa actual del proceso de reporte integral (1, 2 o 3).
+        version: Contador que aumenta con cada cambio; permite a cada worker
+            detectar si su copia en caché está desactualizada.
     """
     
     id: Optional[int] = Field(default=1, primary_key=True)
     reporte_integral_etapa: int = Field(default=1, nullable=False)
+    version: int = Field(default=1, nullable=False)
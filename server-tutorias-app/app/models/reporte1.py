@@ -7,7 +7,7 @@ de iniciativas grupales de tutoría.
 """
 
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import DateTime, Text, Float, Column
+from sqlalchemy import DateTime, Text, Float, Column, Index
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime, timezone
 
@@ -47,8 +47,13 @@ class Reporte1(SQLModel, table=True):
         tutor: Relación con el modelo Tutor.
     """
     
+    __table_args__ = (
+        # Reportes de un tutor del más reciente al más antiguo (cubre también id_tutor solo)
+        Index("ix_reporte1_tutor_created", "id_tutor", "created_at"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
-    id_tutor: int = Field(foreign_key="tutor.id_tutor", index=True)
+    id_tutor: int = Field(foreign_key="tutor.id_tutor")
     
     nombre_tutor: str = Field(max_length=300)
     periodo: str = Field(max_length=100, index=True)
@@ -6,7 +6,7 @@ de tutoría grupal, enfocado en resultados obtenidos y conclusiones.
 """
 
 from sqlmodel import SQLModel, Field
-from sqlalchemy import DateTime, Text, Float, Column
+from sqlalchemy import DateTime, Text, Float, Column, Index
 from typing import Optional
 from datetime import datetime, timezone
 
@@ -42,8 +42,13 @@ class Reporte2(SQLModel, table=True):
         updated_at: Fecha de última edición.
     """
     
+    __table_args__ = (
+        # Reportes de un tutor del más reciente al más antiguo (cubre también id_tutor solo)
+        Index("ix_reporte2_tutor_created", "id_tutor", "created_at"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
-    id_tutor: int = Field(foreign_key="tutor.id_tutor", index=True)
+    id_tutor: int = Field(foreign_key="tutor.id_tutor")
     
     nombre_tutor: str = Field(max_length=300)
     periodo: str = Field(max_length=100, index=True)
@@ -7,7 +7,7 @@ asistencias, canalizaciones y materias del alumno.
 """
 
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index, text
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime, timezone
 
@@ -46,8 +46,26 @@ class ReporteIntegral(SQLModel, table=True):
         tutoria: Relación con el modelo Tutoria.
     """
     
+    __table_args__ = (
+        # Una tutoría tiene un solo reporte integral (sirve también como índice de id_tutoria)
+        Index("uq_reporteintegral_id_tutoria", "id_tutoria", unique=True),
+        # Índices parciales para los reportes de canalización (pocas filas con bandera)
+        Index(
+            "ix_reporteintegral_psicologia", "id_tutoria",
+            postgresql_where=text("psicologia > 0"), sqlite_where=text("psicologia > 0")
+        ),
+        Index(
+            "ix_reporteintegral_ciencias_basicas", "id_tutoria",
+            postgresql_where=text("ciencias_basicas > 0"), sqlite_where=text("ciencias_basicas > 0")
+        ),
+        Index(
+            "ix_reporteintegral_jefatura_academica", "id_tutoria",
+            postgresql_where=text("jefatura_academica > 0"), sqlite_where=text("jefatura_academica > 0")
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
-    id_tutoria: int = Field(foreign_key="tutoria.id_tutoria", index=True)
+    id_tutoria: int = Field(foreign_key="tutoria.id_tutoria")
     
     tutoria_grupal: int = Field(default=0)
     tutoria_individual: int = Field(default=0)
@@ -5,11 +5,14 @@ Define la estructura de la tabla de tutores en el sistema de gestión de tutorí
 incluyendo información personal y de autenticación.
 """
 
+import unicodedata
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, event
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, timezone
 
+from app.core.search import search_text
+
 if TYPE_CHECKING:
     from app.models.tutoria import Tutoria
 
@@ -19,6 +22,26 @@ def get_utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def normalize_full_name(full_name: str) -> str:
+    """
+    Normaliza un nombre completo para compararlo sin importar mayúsculas,
+    acentos ni espacios repetidos (ej. "Núñez  Pérez" -> "NUNEZ PEREZ").
+    
+    También repara nombres en UTF-8 leídos como latin1 ("NUÃ\x91EZ" -> "NUNEZ"),
+    como ocurre con los CSV de asignación exportados desde otros sistemas.
+    """
+    try:
+        full_name = full_name.encode("latin1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        pass
+    
+    sin_acentos = "".join(
+        caracter for caracter in unicodedata.normalize("NFKD", full_name)
+        if not unicodedata.combining(caracter)
+    )
+    return " ".join(sin_acentos.upper().split())
+
+
 class Tutor(SQLModel, table=True):
     """
     Representa a un tutor registrado en el sistema de tutorías.
@@ -28,9 +51,13 @@ class Tutor(SQLModel, table=True):
         nombre: Nombre(s) del tutor.
         apellido_p: Apellido paterno.
         apellido_m: Apellido materno (opcional).
+        nombre_normalizado: Nombre completo normalizado e indexado para búsquedas
+            (se mantiene automáticamente, ver `normalize_full_name`).
         correo: Dirección de correo electrónico única.
         contraseña: Hash de la contraseña del tutor.
         requires_password_change: Indica si el tutor debe cambiar su contraseña.
+        busqueda: Nombre completo y correo normalizados para la búsqueda
+            indexada (se mantiene automáticamente, ver `app.core.search`).
         created_at: Fecha y hora de creación del registro.
         updated_at: Fecha y hora de última actualización del registro.
         tutorias: Relación con las tutorías asignadas al tutor.
@@ -40,9 +67,11 @@ class Tutor(SQLModel, table=True):
     nombre: str = Field(max_length=100)
     apellido_p: str = Field(max_length=100)
     apellido_m: Optional[str] = Field(default=None, max_length=100)
+    nombre_normalizado: Optional[str] = Field(default=None, index=True, max_length=310)
     correo: str = Field(index=True, unique=True, max_length=255)
     contraseña: str
     requires_password_change: bool = Field(default=True)
+    busqueda: Optional[str] = Field(default=None, max_length=600)
     
     created_at: datetime = Field(
         sa_type=DateTime(timezone=True), #type: ignore
@@ -56,3 +85,15 @@ class Tutor(SQLModel, table=True):
     )
     
     tutorias: List["Tutoria"] = Relationship(back_populates="tutor")
+
+    @property
+    def nombre_completo(self) -> str:
+        """Nombre completo en el orden de los archivos de asignación (nombre y apellidos)."""
+        return " ".join(part for part in (self.nombre, self.apellido_p, self.apellido_m) if part)
+
+
+@event.listens_for(Tutor, "before_insert")
+@event.listens_for(Tutor, "before_update")
+def _actualizar_columnas_derivadas(mapper, connection, target: Tutor) -> None:
+    target.nombre_normalizado = normalize_full_name(target.nombre_completo)
+    target.busqueda = search_text(target.nombre_completo, target.correo)
@@ -7,7 +7,7 @@ relaciones con alumnos y tutores, estados de progreso y campos de seguimiento.
 
 from typing import Optional, TYPE_CHECKING
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import DateTime, Text, ForeignKey, Column
+from sqlalchemy import DateTime, Text, ForeignKey, Column, Index
 from datetime import datetime, timezone
 from enum import Enum
 
@@ -53,15 +53,24 @@ class Tutoria(SQLModel, table=True):
         tutor: Relación con el modelo Tutor.
     """
     
+    __table_args__ = (
+        # Tutorías de un tutor por periodo (listado del tutor, PDF integral).
+        # Este índice y el siguiente también sirven para buscar solo por
+        # tutor_id o alumno_id, por eso esas columnas no tienen índice propio.
+        Index("ix_tutoria_tutor_periodo", "tutor_id", "periodo"),
+        # Un alumno tiene a lo más una tutoría por periodo
+        Index("uq_tutoria_alumno_periodo", "alumno_id", "periodo", unique=True),
+    )
+    
     id_tutoria: Optional[int] = Field(default=None, primary_key=True)
     
     alumno_id: int = Field(
-        sa_column=Column("alumno_id", ForeignKey("alumno.id_alumno", ondelete="CASCADE"), index=True)
+        sa_column=Column("alumno_id", ForeignKey("alumno.id_alumno", ondelete="CASCADE"))
     )
     
     tutor_id: Optional[int] = Field(
         default=None,
-        sa_column=Column("tutor_id", ForeignKey("tutor.id_tutor", ondelete="SET NULL"), index=True)
+        sa_column=Column("tutor_id", ForeignKey("tutor.id_tutor", ondelete="SET NULL"))
     )
     
     periodo: Optional[str] = Field(default=None, max_length=100, index=True)
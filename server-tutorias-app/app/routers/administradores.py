@@ -6,10 +6,10 @@ Todos los endpoints (excepto login) requieren autenticación de administrador
 con rol SUPER_ADMIN.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session, select
-from typing import List
+from sqlmodel import Session, select, func
+from typing import List, Optional, Union
 from datetime import timedelta
 
 from app.database import get_session
@@ -17,11 +17,12 @@ from app.models.administrador import Administrador
 from app.schemas.administrador import (
     AdministradorCreate,
     AdministradorRead,
+    AdministradoresPage,
     AdministradorUpdate,
     Token
 )
 from app.services import admin_service
-from app.core import security
+from app.core import security, principal_cache, pagination, streaming
 from app.core.config import settings
 from app.core.dependencies import get_current_admin_user
 
@@ -29,7 +30,7 @@ router = APIRouter(prefix="/administradores", tags=["Administradores"])
 
 
 @router.post("/login", response_model=Token, summary="Login para Administradores")
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_session)
 ):
@@ -39,7 +40,7 @@ def login_for_access_token(
     Cualquier rol de administrador (Super Admin, Psicología, etc.) puede
     hacer login por aquí.
     """
-    admin = admin_service.authenticate_admin(db, form_data.username, form_data.password)
+    admin = await admin_service.authenticate_admin(db, form_data.username, form_data.password)
     
     if not admin:
         raise HTTPException(
@@ -51,7 +52,7 @@ def login_for_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     access_token = security.create_access_token(
-        data={"sub": admin.usuario},
+        data={"sub": admin.usuario, "role": "admin"},
         expires_delta=access_token_expires
     )
     
@@ -67,20 +68,54 @@ def login_for_access_token(
 
 @router.get(
     "/", 
-    response_model=List[AdministradorRead], 
+    response_model=Union[AdministradoresPage, List[AdministradorRead]], 
     summary="Obtener todos los Administradores",
-    description="Devuelve la lista de administradores.\n\n**Requiere Rol:** SUPER_ADMIN.",
-    responses={403: {"description": "Permisos insuficientes (Requiere Super Admin)"}}
+    description=(
+        "Devuelve la lista de administradores. Con `page` o `cursor` responde una página; "
+        "sin ellos envía la lista completa en streaming (JSON o NDJSON con `formato=ndjson`)."
+        "\n\n**Requiere Rol:** SUPER_ADMIN."
+    ),
+    responses={
+        200: {"content": {streaming.MEDIA_TYPE_NDJSON: {}}},
+        403: {"description": "Permisos insuficientes (Requiere Super Admin)"}
+    }
 )
 def get_all_admins(
     current_admin: Administrador = Depends(get_current_admin_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    page: Optional[int] = Query(None, gt=0, description="Número de página (activa la respuesta paginada)"),
+    size: int = Query(100, gt=0, le=500, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor `next_cursor` de la página anterior (activa la respuesta paginada)"),
+    include_total: bool = Query(True, description="Calcula el total de registros (solo en la respuesta paginada)"),
+    formato: str = Query("json", pattern="^(json|ndjson)$", description="`ndjson` envía un objeto JSON por línea")
 ):
     """
-    Obtiene una lista completa de todos los administradores registrados.
+    Obtiene los administradores registrados, paginados o completos en streaming.
     Solo accesible por SUPER_ADMIN.
     """
-    return session.exec(select(Administrador)).all()
+    query = select(Administrador)
+
+    if page is None and cursor is None:
+        query = query.order_by(Administrador.id_admin) # type: ignore
+        if formato == "ndjson":
+            return streaming.ndjson_response(query, AdministradorRead)
+        return streaming.json_array_response(query, AdministradorRead)
+
+    total_administradores = None
+    if include_total:
+        total_administradores = pagination.cached_count(
+            session, ("administradores",), select(func.count(Administrador.id_admin)) # type: ignore
+        )
+
+    administradores, next_cursor = pagination.paginate(
+        session, query, Administrador.id_admin, page or 1, size, cursor
+    )
+
+    return AdministradoresPage(
+        total_administradores=total_administradores,
+        administradores=administradores, # type: ignore
+        next_cursor=next_cursor
+    )
 
 
 @router.get(
@@ -129,7 +164,10 @@ def create_admin(
     """
     Crea un nuevo administrador en el sistema.
     """
-    return admin_service.create_admin(db=session, data=data)
+    admin = admin_service.create_admin(db=session, data=data)
+    pagination.invalidate_counts("administradores")
+    
+    return admin
 
 
 @router.put(
@@ -184,7 +222,10 @@ def delete_admin(
     if not admin_to_delete:
         raise HTTPException(status_code=404, detail="Administrador no encontrado")
     
+    usuario = admin_to_delete.usuario
     session.delete(admin_to_delete)
     session.commit()
+    principal_cache.invalidate(principal_cache.TIPO_ADMIN, usuario)
+    pagination.invalidate_counts("administradores")
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -5,13 +5,12 @@ Proporciona endpoints para autenticación, operaciones CRUD, gestión de contras
 carga masiva desde Excel y generación de constancias de tutorías.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Response, UploadFile, File, Query, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session, select, or_, func
+from sqlmodel import Session, select, func
 from typing import Optional, Union
 from datetime import timedelta
-import io
 
 from app.database import get_session
 from app.models.alumno import Alumno
@@ -29,7 +28,8 @@ from app.schemas.alumno import (
 from app.schemas.administrador import Token
 from app.services import alumno_service
 from app.services import pdf_generator_service
-from app.core import security
+from app.core import security, pdf_cache, principal_cache, hash_executor, jobs, pagination
+from app.core import search as search_index
 from app.core.config import settings
 from app.core.dependencies import (
     get_current_admin_user,
@@ -43,18 +43,20 @@ router = APIRouter(prefix="/alumnos", tags=["Alumnos"])
 
 
 @router.post("/login", response_model=Token, summary="Login para Alumnos")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(get_session)
 ):
     """
     Autentica a un alumno y genera un token JWT.
     
-    Soporta Login Híbrido:
-    1. Intenta validar contraseña como Hash (seguro).
-    2. Si falla y el alumno requiere cambio, intenta validar como texto plano (temporal).
+    bcrypt se ejecuta en el pool dedicado de `hash_executor` (429 si está saturado),
+    no en el threadpool compartido por el resto de los endpoints. La consulta
+    a la BD sí va al threadpool para no bloquear el event loop.
     """
-    alumno = alumno_service.get_alumno_by_num_control(session, form_data.username)
+    alumno = await run_in_threadpool(
+        alumno_service.get_alumno_by_num_control, session, form_data.username
+    )
     
     if not alumno:
         raise HTTPException(
@@ -62,24 +64,8 @@ def login(
             detail="Número de control o contraseña incorrectos"
         )
     
-    is_password_correct = False
-    
-    # --- VALIDACIÓN ROBUSTA ---
-    
-    # 1. Intento Prioritario: Verificar Hash (Lo estándar y seguro)
-    # Esto cubre: Alumnos activos y Alumnos cuya contraseña reseteó el Admin
-    try:
-        if security.verify_password(form_data.password, alumno.contraseña):
-            is_password_correct = True
-    except Exception:
-        # verify_password puede fallar si la BD tiene texto plano que no parece hash (caso Excel)
-        pass 
-        
-    # 2. Intento Secundario: Texto Plano (Solo si tiene la bandera activa)
-    # Esto cubre: Alumnos recién importados de Excel
-    if not is_password_correct and alumno.requires_password_change:
-        if form_data.password == alumno.contraseña:
-            is_password_correct = True
+    # Todas las contraseñas (incluidas las temporales de cargas masivas) están hasheadas
+    is_password_correct = await hash_executor.verify_password(form_data.password, alumno.contraseña)
     
     if not is_password_correct:
         raise HTTPException(
@@ -120,25 +106,44 @@ def change_password(
 @router.get(
     "/me/constancia-pdf",
     summary="Descargar Constancia de Tutorías",
-    response_class=StreamingResponse
+    response_class=Response
 )
 async def handle_generate_constancia_pdf(
     current_alumno: Alumno = Depends(get_current_alumno_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    if_none_match: Optional[str] = Header(None)
 ):
     try:
-        pdf_stream: io.BytesIO = pdf_generator_service.generate_constancia_pdf(
+        data_to_draw = pdf_generator_service.get_constancia_data(
             db=session,
             id_alumno=current_alumno.id_alumno # type: ignore
         )
+        cache_key = pdf_cache.build_key(
+            "constancia", data_to_draw, pdf_generator_service.TEMPLATE_CONSTANCIA_PATH
+        )
+        
+        if pdf_cache.etag_matches(if_none_match, cache_key):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": pdf_cache.etag(cache_key)}
+            )
+        
+        pdf_bytes = await pdf_cache.get_or_render(
+            cache_key,
+            [pdf_cache.tag_constancia(current_alumno.id_alumno)], # type: ignore
+            pdf_generator_service.render_constancia_pdf,
+            data_to_draw
+        )
         
         filename = f"Constancia_Tutorias_{current_alumno.num_control}.pdf"
         
-        return StreamingResponse(
-            content=pdf_stream,
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "ETag": pdf_cache.etag(cache_key),
+                "Cache-Control": "private, no-cache"
             }
         )
     
@@ -163,28 +168,32 @@ def get_alumnos(
     current_user: Union[Administrador, Tutor] = Depends(get_current_user),
     page: int = Query(1, gt=0),
     size: int = Query(10, gt=0, le=100),
-    search: Optional[str] = Query(None, min_length=3)
+    search: Optional[str] = Query(None, min_length=3),
+    cursor: Optional[str] = Query(None, description="Cursor `next_cursor` de la página anterior (ignora `page`)"),
+    include_total: bool = Query(True, description="Calcula el total de registros del filtro")
 ):
+    """
+    Obtiene una lista paginada de alumnos ordenada por id, con búsqueda opcional
+    (por relevancia) en nombre, apellidos y número de control.
+    
+    Para recorrer listados grandes conviene usar `cursor` con el
+    `next_cursor` de la respuesta anterior en lugar de `page`.
+    """
     query = select(Alumno)
+    rank = None
     
     if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            or_( 
-                Alumno.nombre.ilike(search_term), # type: ignore
-                Alumno.apellido_p.ilike(search_term), # type: ignore
-                Alumno.apellido_m.ilike(search_term), # type: ignore
-                Alumno.num_control.ilike(search_term) # type: ignore
-            )
-        )
+        search_filter, rank = search_index.build_search(session, Alumno, search)
+        query = query.where(search_filter)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total_alumnos = session.exec(count_query).one()
+    total_alumnos = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total_alumnos = pagination.cached_count(session, ("alumnos", search), count_query)
     
-    offset = (page - 1) * size
-    alumnos = session.exec(query.offset(offset).limit(size)).all()
+    alumnos, next_cursor = pagination.paginate(session, query, Alumno.id_alumno, page, size, cursor, rank)
     
-    return AlumnosPage(total_alumnos=total_alumnos, alumnos=alumnos) # type: ignore
+    return AlumnosPage(total_alumnos=total_alumnos, alumnos=alumnos, next_cursor=next_cursor) # type: ignore
 
 
 @router.get("/me", response_model=AlumnoRead, summary="Obtener datos del Alumno autenticado")
@@ -209,18 +218,67 @@ def get_tutoria_status(
 
 @router.post("/upload-excel", summary="Cargar alumnos desde Excel (Admin)")
 def upload_alumnos_from_excel(
+    response: Response,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    eliminar_ausentes: bool = Query(
+        False,
+        description="Elimina a los alumnos que no vienen en el archivo (sus tutorías se eliminan en cascada)."
+    ),
+    en_segundo_plano: bool = Query(
+        False,
+        description="Procesa el archivo (.xlsx o .csv) por lotes en segundo plano y responde 202 con el id del trabajo."
+    ),
     session: Session = Depends(get_session),
     current_admin: Administrador = Depends(get_current_admin_user)
 ):
-    alumnos_cargados = alumno_service.process_and_load_excel(db=session, file=file)
+    """
+    Carga incremental de alumnos: inserta los nuevos, actualiza los que
+    cambiaron y deja intactos a los demás (y sus tutorías).
+    
+    Con `en_segundo_plano=true` el archivo se lee por lotes sin cargarlo
+    completo en memoria; las filas con errores se omiten y el avance se
+    consulta en `/alumnos/upload-excel/{job_id}`.
+    """
+    if en_segundo_plano:
+        path, formato = alumno_service.guardar_archivo_importacion(file)
+        job_id = jobs.create_job("importacion_alumnos")
+        background_tasks.add_task(
+            alumno_service.importar_alumnos_en_lotes, job_id, path, formato, eliminar_ausentes
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Carga de alumnos en proceso.", "job_id": job_id}
+    
+    resumen = alumno_service.process_and_load_excel(
+        db=session, file=file, eliminar_ausentes=eliminar_ausentes
+    )
+    pagination.invalidate_counts("alumnos")
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
     
     return {
         "message": "Alumnos cargados exitosamente.",
-        "alumnos_cargados": alumnos_cargados
+        "alumnos_cargados": resumen["insertados"] + resumen["actualizados"] + resumen["sin_cambios"],
+        **resumen
     }
 
 
+@router.get("/upload-excel/{job_id}", summary="Consultar el avance de una carga de alumnos (Admin)")
+def get_upload_progress(
+    job_id: str,
+    current_admin: Administrador = Depends(get_current_admin_user)
+):
+    job = jobs.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Importación no encontrada."
+        )
+    
+    return job
+
+
 @router.get("/{id_alumno}", response_model=AlumnoRead, summary="Obtener un Alumno por ID (Admin)")
 def get_alumno(
     id_alumno: int,
@@ -246,7 +304,10 @@ def create_alumno(
     session: Session = Depends(get_session),
     current_admin: Administrador = Depends(get_current_admin_user)
 ):
-    return alumno_service.create_alumno(db=session, data=data)
+    alumno = alumno_service.create_alumno(db=session, data=data)
+    pagination.invalidate_counts("alumnos")
+    
+    return alumno
 
 
 @router.put("/{id_alumno}", response_model=AlumnoRead, summary="Actualizar un Alumno (Admin)")
@@ -283,5 +344,9 @@ def delete_alumno(
     
     session.delete(alumno)
     session.commit()
+    principal_cache.invalidate(principal_cache.TIPO_ALUMNO, id_alumno)
+    pagination.invalidate_counts("alumnos")
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
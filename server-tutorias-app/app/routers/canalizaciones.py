@@ -12,7 +12,9 @@ from app.models.administrador import Administrador, RolAdministrador
 from app.services.canalizacion_service import (
     generate_reporte_psicologia,
     generate_reporte_ciencias_basicas,
-    generate_reporte_jefatura_academica
+    generate_reporte_jefatura_academica,
+    generate_reporte_canalizacion,
+    DEPARTAMENTOS
 )
 
 router = APIRouter(
@@ -136,4 +138,41 @@ def descargar_reporte_jefatura(
         excel_file, 
         headers=headers, 
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
\ No newline at end of file
+    )
+
+# --- TODOS LOS DEPARTAMENTOS (UN SOLO LIBRO) ---
+@router.get(
+    "/periodo/{periodo}",
+    response_class=StreamingResponse,
+    summary="Descargar Reporte de Canalizaciones por Departamento",
+    description=(
+        "Genera un solo libro con una hoja por departamento (Psicología, Ciencias Básicas "
+        "y Jefatura Académica) a partir de una única consulta del periodo.\n\n"
+        "SUPER_ADMIN recibe las tres hojas; los demás roles reciben solo la hoja de su departamento."
+    ),
+)
+def descargar_reporte_canalizaciones(
+    periodo: str,
+    current_admin: Administrador = Depends(get_admin_cualquier_rol),
+    db: Session = Depends(get_session)
+) -> Any:
+    # Cada rol de departamento coincide con la clave de su departamento
+    if current_admin.rol == RolAdministrador.SUPER_ADMIN:
+        departamentos = list(DEPARTAMENTOS)
+    elif current_admin.rol.value in DEPARTAMENTOS:
+        departamentos = [current_admin.rol.value]
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para acceder a los reportes de canalización."
+        )
+
+    excel_file = generate_reporte_canalizacion(db, periodo, departamentos)
+    filename = f"Canalizaciones_{periodo}.xlsx"
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+
+    return StreamingResponse(
+        excel_file,
+        headers=headers,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
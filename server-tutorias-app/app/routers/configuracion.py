@@ -9,12 +9,13 @@ que controla las etapas habilitadas del reporte integral de tutorías.
 import shutil
 import os
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Request, Response
 from sqlmodel import Session
 from typing import Union
 
 from app.database import get_session
 from app.services import configuracion_service
+from app.core import template_cache
 from app.schemas.configuracion import ConfiguracionRead, ConfiguracionUpdate
 from app.core.dependencies import get_current_admin_user, get_current_user
 from app.models.administrador import Administrador
@@ -30,6 +31,8 @@ router = APIRouter(prefix="/configuracion", tags=["Configuración"])
 
 @router.get("/", response_model=ConfiguracionRead, summary="Obtener etapa actual del reporte")
 def get_reporte_config(
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: Union[Administrador, Tutor] = Depends(get_current_user)
 ):
@@ -41,12 +44,22 @@ def get_reporte_config(
     - Etapa 2: Seguimiento 1 y 2
     - Etapa 3: Reporte completo (todas las secciones)
     
-    Accesible por administradores y tutores autenticados.
+    Accesible por administradores y tutores autenticados. La respuesta
+    incluye un ETag con la versión de la configuración; si el navegador
+    envía el mismo valor en `If-None-Match` se responde 304 sin cuerpo.
     
     Returns:
         Configuración actual con la etapa activa.
     """
     config = configuracion_service.get_configuracion(db=session)
+    
+    etag = f'W/"configuracion-{config.version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
     return config
 
 
@@ -97,6 +110,9 @@ async def update_integral_template(
         # Sobrescribir el archivo con el nuevo
         with open(TEMPLATE_INTEGRAL_PATH, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
+        
+        # Descartar la versión cacheada para que el cambio aplique de inmediato
+        template_cache.invalidate(TEMPLATE_INTEGRAL_PATH)
             
         return {"message": "Plantilla actualizada exitosamente. El sistema ahora usará el nuevo formato."}
 
@@ -130,6 +146,7 @@ async def reset_integral_template(
     try:
         # Copiar el original sobre el activo, sobrescribiéndolo
         shutil.copy2(TEMPLATE_INTEGRAL_ORIGINAL_PATH, TEMPLATE_INTEGRAL_PATH)
+        template_cache.invalidate(TEMPLATE_INTEGRAL_PATH)
         return {"message": "Plantilla restaurada a su versión original por defecto exitosamente."}
 
     except Exception as e:
@@ -4,7 +4,8 @@ from sqlmodel import Session
 import io
 
 from app.database import get_session
-from app.services import excel_generator_service
+from app.services import excel_generator_service, agregados_service
+from app.schemas.anexo3 import Anexo3Resumen
 from app.core.dependencies import get_current_admin_user
 from app.models.administrador import Administrador
 
@@ -52,4 +53,33 @@ async def handle_generate_anexo3_excel(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Ocurrió un error inesperado al generar el reporte Excel."
-        )
\ No newline at end of file
+        )
+
+
+@router.get(
+    "/resumen/{periodo}",
+    response_model=Anexo3Resumen,
+    summary="Resumen del Anexo 3 por Periodo en JSON (Admin)"
+)
+def handle_get_anexo3_resumen(
+    periodo: str,
+    session: Session = Depends(get_session),
+    current_admin: Administrador = Depends(get_current_admin_user)
+):
+    """
+    Devuelve los totales de la Hoja 1 del Anexo 3 (por carrera y semestre)
+    calculados en la base de datos, sin generar el archivo Excel.
+    """
+    filas = agregados_service.get_resumen_por_carrera_semestre(db=session, periodo=periodo)
+    
+    if not filas:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No se encontraron tutorías asignadas para el periodo {periodo}."
+        )
+    
+    return Anexo3Resumen(
+        periodo=periodo,
+        filas=filas, # type: ignore
+        totales=agregados_service.sumar_totales(filas) # type: ignore
+    )
@@ -1,13 +1,12 @@
-from fastapi import APIRouter, Depends, status, HTTPException, Response
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, status, HTTPException, Response, Header
 from sqlmodel import Session
-from typing import List, Union
-import io
+from typing import List, Optional, Union
 
 from app.database import get_session
 from app.models.reporte1 import Reporte1
 from app.schemas.reporte1 import Reporte1Create, Reporte1Read, Reporte1Update
 from app.services import reporte1_service, pdf_generator_service
+from app.core import pdf_cache
 from app.core.dependencies import get_current_user, get_current_tutor_user, oauth2_scheme_tutor
 from app.models.administrador import Administrador
 from app.models.tutor import Tutor
@@ -116,13 +115,14 @@ def handle_delete_reporte1(
 
 @router.get(
     "/{reporte_id}/pdf",
-    response_class=StreamingResponse,
+    response_class=Response,
     summary="Descargar Reporte 1 en PDF"
 )
 async def handle_generate_reporte1_pdf(
     reporte_id: int,
     session: Session = Depends(get_session),
-    current_user: Union[Administrador, Tutor] = Depends(get_current_user)
+    current_user: Union[Administrador, Tutor] = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
     reporte = reporte1_service.get_reporte1_por_id(db=session, reporte_id=reporte_id)
     
@@ -133,18 +133,34 @@ async def handle_generate_reporte1_pdf(
         )
     
     try:
-        pdf_stream: io.BytesIO = pdf_generator_service.generate_reporte1_pdf(
-            db=session, reporte_id=reporte_id
+        datos_pdf = pdf_generator_service.get_reporte1_data(db=session, reporte_id=reporte_id)
+        cache_key = pdf_cache.build_key(
+            "reporte1", datos_pdf, pdf_generator_service.TEMPLATE_REPORTE1_PATH
+        )
+        
+        if pdf_cache.etag_matches(if_none_match, cache_key):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": pdf_cache.etag(cache_key)}
+            )
+        
+        pdf_bytes = await pdf_cache.get_or_render(
+            cache_key,
+            [pdf_cache.tag_reporte1(reporte_id)],
+            pdf_generator_service.render_reporte1_pdf,
+            datos_pdf
         )
         
         proyecto_name = reporte.nombre_proyecto[:20] if len(reporte.nombre_proyecto) > 20 else reporte.nombre_proyecto
         filename = f"Reporte_Avance_{proyecto_name}_{reporte.periodo}.pdf"
         
-        return StreamingResponse(
-            content=pdf_stream,
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "ETag": pdf_cache.etag(cache_key),
+                "Cache-Control": "private, no-cache"
             }
         )
     except HTTPException as http_exc:
@@ -1,13 +1,12 @@
-from fastapi import APIRouter, Depends, status, HTTPException, Response
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, status, HTTPException, Response, Header
 from sqlmodel import Session
-from typing import List, Union
-import io
+from typing import List, Optional, Union
 
 from app.database import get_session
 from app.models.reporte2 import Reporte2
 from app.schemas.reporte2 import Reporte2Create, Reporte2Read, Reporte2Update
 from app.services import reporte2_service, pdf_generator_service # <--- Importamos el generador de PDF
+from app.core import pdf_cache
 from app.core.dependencies import get_current_user, get_current_tutor_user, oauth2_scheme_tutor
 from app.models.administrador import Administrador
 from app.models.tutor import Tutor
@@ -119,13 +118,14 @@ def handle_delete_reporte2(
 # --- NUEVO ENDPOINT PDF ---
 @router.get(
     "/{reporte_id}/pdf",
-    response_class=StreamingResponse,
+    response_class=Response,
     summary="Descargar Reporte 2 en PDF"
 )
 async def handle_generate_reporte2_pdf(
     reporte_id: int,
     session: Session = Depends(get_session),
-    current_user: Union[Administrador, Tutor] = Depends(get_current_user)
+    current_user: Union[Administrador, Tutor] = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Genera y descarga el PDF del Reporte General 2 (Final).
@@ -140,20 +140,36 @@ async def handle_generate_reporte2_pdf(
         )
     
     try:
-        # Llamamos al nuevo servicio que creamos
-        pdf_stream: io.BytesIO = pdf_generator_service.generate_reporte2_pdf(
-            db=session, reporte_id=reporte_id
+        # La consulta se hace aquí; el renderizado corre en el pool de procesos
+        datos_pdf = pdf_generator_service.get_reporte2_data(db=session, reporte_id=reporte_id)
+        cache_key = pdf_cache.build_key(
+            "reporte2", datos_pdf, pdf_generator_service.TEMPLATE_REPORTE2_PATH
+        )
+        
+        if pdf_cache.etag_matches(if_none_match, cache_key):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": pdf_cache.etag(cache_key)}
+            )
+        
+        pdf_bytes = await pdf_cache.get_or_render(
+            cache_key,
+            [pdf_cache.tag_reporte2(reporte_id)],
+            pdf_generator_service.render_reporte2_pdf,
+            datos_pdf
         )
         
         # Nombre del archivo limpio
         proyecto_name = reporte.nombre_proyecto[:20] if len(reporte.nombre_proyecto) > 20 else reporte.nombre_proyecto
         filename = f"Reporte_Final_{proyecto_name}_{reporte.periodo}.pdf"
         
-        return StreamingResponse(
-            content=pdf_stream,
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "ETag": pdf_cache.etag(cache_key),
+                "Cache-Control": "private, no-cache"
             }
         )
     except HTTPException as http_exc:
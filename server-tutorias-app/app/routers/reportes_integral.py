@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Header, Response
 from fastapi.responses import StreamingResponse
 from sqlmodel import Session
-from typing import Union
-import io
+from typing import Optional, Union
 
 from app.database import get_session
 from app.models.reporte_integral import ReporteIntegral
 from app.schemas.reporte_integral import ReporteIntegralCreate, ReporteIntegralRead, ReporteIntegralUpdate
-from app.services import reporte_integral_service, pdf_generator_service
-from app.core.dependencies import get_current_user
+from app.services import reporte_integral_service, pdf_generator_service, exportacion_service
+from app.core import pdf_cache, jobs
+from app.core.dependencies import get_current_user, get_current_admin_user
 from app.models.administrador import Administrador
 from app.models.tutor import Tutor
 from app.models.tutoria import Tutoria
@@ -158,13 +158,14 @@ def handle_delete_reporte(
 @router.get(
     "/pdf/tutor/{id_tutor}/periodo/{periodo}",
     summary="Generar PDF del Reporte Integral por Tutor y Periodo",
-    response_class=StreamingResponse
+    response_class=Response
 )
 async def handle_generate_integral_pdf(
     id_tutor: int,
     periodo: str,
     session: Session = Depends(get_session),
-    current_user: Union[Administrador, Tutor] = Depends(get_current_user)
+    current_user: Union[Administrador, Tutor] = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
     if isinstance(current_user, Tutor) and current_user.id_tutor != id_tutor:
         raise HTTPException(
@@ -173,17 +174,35 @@ async def handle_generate_integral_pdf(
         )
     
     try:
-        pdf_stream: io.BytesIO = pdf_generator_service.generate_integral_report_pdf(
+        alumnos_data = pdf_generator_service.get_integral_report_data(
             db=session, id_tutor=id_tutor, periodo=periodo
         )
+        cache_key = pdf_cache.build_key(
+            "integral", alumnos_data, pdf_generator_service.TEMPLATE_PDF_PATH
+        )
+        
+        if pdf_cache.etag_matches(if_none_match, cache_key):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": pdf_cache.etag(cache_key)}
+            )
+        
+        pdf_bytes = await pdf_cache.get_or_render(
+            cache_key,
+            [pdf_cache.tag_integral(id_tutor, periodo)],
+            pdf_generator_service.render_integral_report_pdf,
+            alumnos_data
+        )
         
         filename = f"Reporte_Integral_Tutor_{id_tutor}_{periodo}.pdf"
         
-        return StreamingResponse(
-            content=pdf_stream,
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "ETag": pdf_cache.etag(cache_key),
+                "Cache-Control": "private, no-cache"
             }
         )
     except HTTPException as http_exc:
@@ -192,4 +211,55 @@ async def handle_generate_integral_pdf(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Ocurrió un error inesperado al generar el PDF."
-        )
\ No newline at end of file
+        )
+
+
+@router.get(
+    "/pdf/periodo/{periodo}/zip",
+    summary="Exportar en ZIP los Reportes Integrales de todos los tutores de un periodo",
+    response_class=StreamingResponse
+)
+def handle_export_integral_zip(
+    periodo: str,
+    session: Session = Depends(get_session),
+    current_admin: Administrador = Depends(get_current_admin_user)
+):
+    """
+    Genera un ZIP con un PDF de Reporte Integral por tutor del periodo.
+    
+    Las filas se obtienen con una sola consulta y los PDFs se renderizan en
+    paralelo; el ZIP se envía conforme se va construyendo. El encabezado
+    `X-Job-Id` permite consultar el avance en `/pdf/exportaciones/{job_id}`.
+    """
+    grupos = pdf_generator_service.get_integral_report_data_by_periodo(db=session, periodo=periodo)
+    
+    job_id = jobs.create_job("exportacion_integral", total=len(grupos))
+    filename = f"Reportes_Integrales_{periodo}.zip"
+    
+    return StreamingResponse(
+        content=exportacion_service.stream_integral_zip(grupos, periodo, job_id),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Job-Id": job_id
+        }
+    )
+
+
+@router.get(
+    "/pdf/exportaciones/{job_id}",
+    summary="Consultar el avance de una exportación de Reportes Integrales"
+)
+def handle_get_export_progress(
+    job_id: str,
+    current_admin: Administrador = Depends(get_current_admin_user)
+):
+    job = jobs.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exportación no encontrada."
+        )
+    
+    return job
@@ -6,8 +6,9 @@ y consulta de tutores con paginación y búsqueda.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session, select, or_, func
+from sqlmodel import Session, select, func
 from typing import Optional
 from datetime import timedelta
 
@@ -24,7 +25,8 @@ from app.schemas.tutor import (
 )
 from app.schemas.administrador import Token
 from app.services import tutor_service
-from app.core import security
+from app.core import security, principal_cache, hash_executor, pagination
+from app.core import search as search_index
 from app.core.dependencies import get_current_admin_user, get_current_tutor_user
 from app.core.config import settings
 from app.models.administrador import Administrador
@@ -33,18 +35,18 @@ router = APIRouter(prefix="/tutores", tags=["Tutores"])
 
 
 @router.post("/login", response_model=Token, summary="Login para Tutores")
-def login_tutor(
+async def login_tutor(
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(get_session)
 ):
     """
     Autentica a un tutor y genera un token JWT.
     
-    Soporta Login Híbrido:
-    1. Intenta validar contraseña como Hash (seguro).
-    2. Si falla y el tutor requiere cambio, intenta validar como texto plano (temporal).
+    bcrypt se ejecuta en el pool dedicado de `hash_executor` (429 si está saturado),
+    no en el threadpool compartido por el resto de los endpoints. La consulta
+    a la BD sí va al threadpool para no bloquear el event loop.
     """
-    tutor = tutor_service.get_tutor_by_email(session, form_data.username)
+    tutor = await run_in_threadpool(tutor_service.get_tutor_by_email, session, form_data.username)
     
     if not tutor:
         raise HTTPException(
@@ -53,24 +55,8 @@ def login_tutor(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    is_password_correct = False
-    
-    # --- VALIDACIÓN ROBUSTA (Idéntica a la corrección de Alumnos) ---
-    
-    # 1. Intento Prioritario: Verificar Hash
-    # Esto cubre tutores normales y aquellos a los que el Admin reseteó la contraseña
-    try:
-        if security.verify_password(form_data.password, tutor.contraseña):
-            is_password_correct = True
-    except Exception:
-        # Si la contraseña en BD es texto plano que no parece hash, verify podría fallar
-        pass
-    
-    # 2. Intento Secundario: Texto Plano (Solo si tiene la bandera activa)
-    # Esto cubre tutores recién creados por carga masiva o manual sin hash
-    if not is_password_correct and tutor.requires_password_change:
-        if form_data.password == tutor.contraseña:
-            is_password_correct = True
+    # Todas las contraseñas (incluidas las temporales de cargas masivas) están hasheadas
+    is_password_correct = await hash_executor.verify_password(form_data.password, tutor.contraseña)
     
     if not is_password_correct:
         raise HTTPException(
@@ -122,31 +108,29 @@ def get_tutores(
     current_admin: Administrador = Depends(get_current_admin_user),
     page: int = Query(1, gt=0, description="Número de página a solicitar"),
     size: int = Query(10, gt=0, le=100, description="Tamaño de la página (máximo 100)"),
-    search: Optional[str] = Query(None, min_length=3, description="Término de búsqueda por nombre, apellido o correo")
+    search: Optional[str] = Query(None, min_length=3, description="Término de búsqueda por nombre, apellido o correo"),
+    cursor: Optional[str] = Query(None, description="Cursor `next_cursor` de la página anterior (ignora `page`)"),
+    include_total: bool = Query(True, description="Calcula el total de registros del filtro")
 ):
     """
-    Obtiene una lista paginada de tutores con búsqueda opcional.
+    Obtiene una lista paginada de tutores ordenada por id, con búsqueda opcional
+    (por relevancia) en nombre, apellidos y correo.
     """
     query = select(Tutor)
+    rank = None
     
     if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            or_(
-                Tutor.nombre.ilike(search_term), #type:ignore
-                Tutor.apellido_p.ilike(search_term), #type:ignore
-                Tutor.apellido_m.ilike(search_term), #type:ignore
-                Tutor.correo.ilike(search_term) #type:ignore
-            )
-        )
+        search_filter, rank = search_index.build_search(session, Tutor, search)
+        query = query.where(search_filter)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total_tutores = session.exec(count_query).one()
+    total_tutores = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total_tutores = pagination.cached_count(session, ("tutores", search), count_query)
     
-    offset = (page - 1) * size
-    tutores = session.exec(query.offset(offset).limit(size)).all()
+    tutores, next_cursor = pagination.paginate(session, query, Tutor.id_tutor, page, size, cursor, rank)
     
-    return TutoresPage(total_tutores=total_tutores, tutores=tutores)  #type:ignore
+    return TutoresPage(total_tutores=total_tutores, tutores=tutores, next_cursor=next_cursor)  #type:ignore
 
 
 @router.get("/{id_tutor}", response_model=TutorRead, summary="Obtener un Tutor por ID (Admin)")
@@ -180,7 +164,10 @@ def create_tutor(
     """
     Crea un nuevo tutor manualmente.
     """
-    return tutor_service.create_tutor(db=session, data=data)
+    tutor = tutor_service.create_tutor(db=session, data=data)
+    pagination.invalidate_counts("tutores")
+    
+    return tutor
 
 
 @router.put("/{id_tutor}", response_model=TutorRead, summary="Actualizar un Tutor (Admin)")
@@ -220,5 +207,9 @@ def delete_tutor(
     
     session.delete(tutor)
     session.commit()
+    principal_cache.invalidate(principal_cache.TIPO_TUTOR, id_tutor)
+    pagination.invalidate_counts("tutores")
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -6,7 +6,7 @@ Proporciona endpoints para operaciones CRUD con control de acceso dual
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File, Query
-from sqlmodel import Session, select, or_, func
+from sqlmodel import Session, select, func
 from typing import List, Optional, Union
 
 from app.database import get_session
@@ -23,6 +23,8 @@ from app.core.dependencies import (
     oauth2_scheme_tutor
 )
 from app.models.administrador import Administrador
+from app.core import pagination, streaming
+from app.core import search as search_index
 
 router = APIRouter(prefix="/tutorias", tags=["Tutorias"])
 
@@ -41,7 +43,7 @@ def get_tutoria_or_404(id_tutoria: int, session: Session = Depends(get_session))
     Raises:
         HTTPException: Si la tutoría no existe.
     """
-    tutoria = session.get(Tutoria, id_tutoria)
+    tutoria = tutoria_service.get_tutoria_detalle(session, id_tutoria)
     
     if not tutoria:
         raise HTTPException(
@@ -54,22 +56,52 @@ def get_tutoria_or_404(id_tutoria: int, session: Session = Depends(get_session))
 
 @router.get(
     "/",
-    response_model=List[TutoriaReadWithDetails],
-    summary="Obtener todas las Tutorías (Solo Admin)"
+    response_model=Union[TutoriasPage, List[TutoriaReadWithDetails]],
+    summary="Obtener todas las Tutorías (Solo Admin)",
+    responses={200: {"content": {streaming.MEDIA_TYPE_NDJSON: {}}}}
 )
 def get_all_tutorias(
     session: Session = Depends(get_session),
-    current_admin: Administrador = Depends(get_current_admin_user)
+    current_admin: Administrador = Depends(get_current_admin_user),
+    page: Optional[int] = Query(None, gt=0, description="Número de página (activa la respuesta paginada)"),
+    size: int = Query(100, gt=0, le=500, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor `next_cursor` de la página anterior (activa la respuesta paginada)"),
+    include_total: bool = Query(True, description="Calcula el total de registros (solo en la respuesta paginada)"),
+    formato: str = Query("json", pattern="^(json|ndjson)$", description="`ndjson` envía un objeto JSON por línea")
 ):
     """
-    Obtiene una lista completa de todos los registros de tutoría.
-    
-    Solo accesible por administradores. No incluye paginación.
-    
+    Obtiene los registros de tutoría, paginados o completos en streaming.
+
+    Solo accesible por administradores.
+
+    - Con `page` o `cursor` se devuelve una página (`TutoriasPage`).
+    - Sin ellos se envía el listado completo en streaming, como arreglo JSON
+      (`formato=json`, compatible con la respuesta anterior) o como NDJSON
+      (`formato=ndjson`). Las filas se leen de la BD por lotes, así que la
+      memoria no crece con el número de tutorías.
+
     Returns:
-        Lista de todas las tutorías con detalles de alumno y tutor.
+        Página o lista de tutorías (ordenadas por id) con detalles de alumno y tutor.
     """
-    return session.exec(select(Tutoria)).all()
+    query = select(Tutoria).options(*tutoria_service.opciones_detalle())
+
+    if page is None and cursor is None:
+        query = query.order_by(Tutoria.id_tutoria) # type: ignore
+        if formato == "ndjson":
+            return streaming.ndjson_response(query, TutoriaReadWithDetails)
+        return streaming.json_array_response(query, TutoriaReadWithDetails)
+
+    total_tutorias = None
+    if include_total:
+        total_tutorias = pagination.cached_count(
+            session, ("tutorias",), select(func.count(Tutoria.id_tutoria)) # type: ignore
+        )
+
+    tutorias, next_cursor = pagination.paginate(
+        session, query, Tutoria.id_tutoria, page or 1, size, cursor
+    )
+
+    return TutoriasPage(total_tutorias=total_tutorias, tutorias=tutorias, next_cursor=next_cursor) #type:ignore
 
 
 @router.get(
@@ -127,7 +159,11 @@ def create_tutoria(
             detail="No tienes permiso para asignar esta tutoría a otro tutor."
         )
     
-    return tutoria_service.create_tutoria(db=session, data=data)
+    tutoria = tutoria_service.create_tutoria(db=session, data=data)
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
+    
+    return tutoria_service.get_tutoria_detalle(session, tutoria.id_tutoria) # type: ignore
 
 
 @router.put(
@@ -156,7 +192,12 @@ def update_tutoria(
             detail="No tienes permiso para modificar esta tutoría."
         )
     
-    return tutoria_service.update_tutoria(db=session, tutoria=tutoria, data=data)
+    # El refresh de la actualización reutiliza las opciones de carga de get_tutoria_or_404
+    tutoria = tutoria_service.update_tutoria(db=session, tutoria=tutoria, data=data)
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
+    
+    return tutoria
 
 
 @router.delete(
@@ -187,6 +228,8 @@ def delete_tutoria(
     
     session.delete(tutoria)
     session.commit()
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -207,7 +250,9 @@ def get_tutorias_by_alumno(
         Lista de todas las tutorías del alumno con detalles de tutor.
     """
     tutorias = session.exec(
-        select(Tutoria).where(Tutoria.alumno_id == id_alumno)
+        select(Tutoria)
+        .where(Tutoria.alumno_id == id_alumno)
+        .options(*tutoria_service.opciones_detalle())
     ).all()
     
     return tutorias
@@ -225,7 +270,9 @@ def get_tutorias_by_tutor(
     current_user: Union[Administrador, Tutor] = Depends(get_current_user),
     page: int = Query(1, gt=0, description="Número de página"),
     size: int = Query(10, gt=0, le=100, description="Tamaño de página"),
-    search: Optional[str] = Query(None, min_length=3, description="Búsqueda por nombre o número de control")
+    search: Optional[str] = Query(None, min_length=3, description="Búsqueda por nombre o número de control"),
+    cursor: Optional[str] = Query(None, description="Cursor `next_cursor` de la página anterior (ignora `page`)"),
+    include_total: bool = Query(True, description="Calcula el total de registros del filtro")
 ):
     """
     Obtiene las tutorías asignadas a un tutor específico con paginación y búsqueda.
@@ -238,9 +285,11 @@ def get_tutorias_by_tutor(
         page: Número de página (inicia en 1).
         size: Cantidad de registros por página (máximo 100).
         search: Término de búsqueda por nombre, apellido o número de control del alumno.
+        cursor: Cursor de la página anterior; continúa después del último id visto.
+        include_total: Si es False se omite el conteo total.
     
     Returns:
-        Página de tutorías con total de registros.
+        Página de tutorías (ordenadas por id) con total de registros y cursor siguiente.
     
     Raises:
         HTTPException: Si el tutor intenta consultar tutorías de otro tutor.
@@ -258,26 +307,33 @@ def get_tutorias_by_tutor(
             detail="No tienes permiso."
         )
     
-    base_query = select(Tutoria).join(Alumno).where(Tutoria.tutor_id == id_tutor)
+    base_query = (
+        select(Tutoria)
+        .join(Alumno)
+        .where(Tutoria.tutor_id == id_tutor)
+        .options(*tutoria_service.opciones_detalle(alumno_unido=True))
+    )
     count_base_query = select(func.count(Tutoria.id_tutoria)).where(Tutoria.tutor_id == id_tutor) # type: ignore
 
+    rank = None
+    
     if search:
-        search_term = f"%{search}%"
-        search_filter = or_(
-            Alumno.nombre.ilike(search_term), #type:ignore
-            Alumno.apellido_p.ilike(search_term), #type:ignore
-            Alumno.apellido_m.ilike(search_term), #type:ignore
-            Alumno.num_control.ilike(search_term) #type:ignore
-        )
+        search_filter, rank = search_index.build_search(session, Alumno, search)
         
         base_query = base_query.where(search_filter)
         count_base_query = count_base_query.join(Alumno).where(search_filter)
     
-    total_tutorias = session.exec(count_base_query).one()
-    offset = (page - 1) * size
-    tutorias = session.exec(base_query.offset(offset).limit(size)).all()
+    total_tutorias = None
+    if include_total:
+        total_tutorias = pagination.cached_count(
+            session, ("tutorias_tutor", id_tutor, search), count_base_query
+        )
+    
+    tutorias, next_cursor = pagination.paginate(
+        session, base_query, Tutoria.id_tutoria, page, size, cursor, rank
+    )
     
-    return TutoriasPage(total_tutorias=total_tutorias, tutorias=tutorias) #type:ignore
+    return TutoriasPage(total_tutorias=total_tutorias, tutorias=tutorias, next_cursor=next_cursor) #type:ignore
 
 
 @router.post(
@@ -306,5 +362,34 @@ def upload_tutoria_assignment(
         raise HTTPException(status_code=400, detail="Se requiere un archivo CSV.")
     
     result = tutoria_service.process_assignment_csv(db=session, file=file)
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
+    
+    return result
+
+
+@router.post(
+    "/upload-assignment/lote",
+    summary="Cargar Asignaciones desde varios CSV o un ZIP (Admin)",
+    status_code=status.HTTP_200_OK
+)
+def upload_tutoria_assignment_batch(
+    files: List[UploadFile] = File(..., description="Archivos CSV de asignación y/o ZIPs que los contengan"),
+    session: Session = Depends(get_session),
+    current_admin: Administrador = Depends(get_current_admin_user)
+):
+    """
+    Procesa en una sola operación las asignaciones de todos los tutores de un periodo.
+    
+    Solo accesible por administradores. Cada CSV tiene el mismo formato que en
+    `/upload-assignment`; los archivos inválidos o con tutor inexistente se
+    reportan y se omiten, y el resto se aplica en una sola transacción.
+    
+    Returns:
+        Resumen consolidado del lote y el detalle de cada archivo.
+    """
+    result = tutoria_service.process_assignment_batch(db=session, files=files)
+    pagination.invalidate_counts("tutorias")
+    pagination.invalidate_counts("tutorias_tutor")
     
     return result
@@ -6,7 +6,7 @@ y gestión de tokens JWT para administradores.
 """
 
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional
+from typing import List, Optional
 
 # Importamos el Enum de roles
 from app.models.administrador import RolAdministrador
@@ -88,6 +88,19 @@ class AdministradorRead(AdministradorBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AdministradoresPage(BaseModel):
+    """
+    Esquema para respuesta paginada de administradores.
+    
+    Incluye el total de registros (None si no se solicitó), los
+    administradores de la página actual y el cursor de la página siguiente.
+    """
+    
+    total_administradores: Optional[int] = None
+    administradores: List[AdministradorRead]
+    next_cursor: Optional[str] = None
+
+
 class AdministradorLogin(BaseModel):
     """Esquema para autenticación de administrador."""
     
@@ -154,11 +154,13 @@ class AlumnosPage(BaseModel):
     """
     Esquema para respuesta paginada de alumnos.
     
-    Incluye el total de registros y la lista de alumnos de la página actual.
+    Incluye el total de registros (None si no se solicitó), la lista de
+    alumnos de la página actual y el cursor de la página siguiente.
     """
     
-    total_alumnos: int
+    total_alumnos: Optional[int] = None
     alumnos: List[AlumnoRead]
+    next_cursor: Optional[str] = None
 
 
 class AlumnoTokenData(BaseModel):
@@ -0,0 +1,43 @@
+"""
+Esquemas Pydantic para el resumen del Anexo 3.
+
+Define la estructura JSON del resumen institucional por periodo (equivalente
+a la Hoja 1 del Excel del Anexo 3).
+"""
+
+from pydantic import BaseModel
+from typing import List
+
+
+class Anexo3Totales(BaseModel):
+    """
+    Métricas agregadas del resumen.
+    """
+    
+    total_tutores: int
+    total_alumnos: int
+    total_grupal: int
+    total_individual: int
+    total_canalizaciones: int
+    total_psicologia: int
+    total_ciencias: int
+    total_jefatura: int
+
+
+class Anexo3ResumenFila(Anexo3Totales):
+    """
+    Métricas de una combinación carrera/semestre.
+    """
+    
+    carrera: str
+    semestre: int
+
+
+class Anexo3Resumen(BaseModel):
+    """
+    Resumen completo de un periodo: filas por carrera/semestre y totales.
+    """
+    
+    periodo: str
+    filas: List[Anexo3ResumenFila]
+    totales: Anexo3Totales
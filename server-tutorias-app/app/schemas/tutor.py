@@ -158,8 +158,10 @@ class TutoresPage(BaseModel):
     """
     Esquema para respuesta paginada de tutores.
     
-    Incluye el total de registros y la lista de tutores de la página actual.
+    Incluye el total de registros (None si no se solicitó), la lista de
+    tutores de la página actual y el cursor de la página siguiente.
     """
     
-    total_tutores: int
+    total_tutores: Optional[int] = None
     tutores: List[TutorRead]
+    next_cursor: Optional[str] = None
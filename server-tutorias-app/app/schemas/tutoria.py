@@ -88,9 +88,11 @@ class TutoriasPage(BaseModel):
     """
     Esquema para respuesta paginada de tutorías.
     
-    Incluye el total de registros y la lista de tutorías con detalles
-    de la página actual.
+    Incluye el total de registros (None si no se solicitó), la lista de
+    tutorías con detalles de la página actual y el cursor de la página
+    siguiente.
     """
     
-    total_tutorias: int
+    total_tutorias: Optional[int] = None
     tutorias: List[TutoriaReadWithDetails]
+    next_cursor: Optional[str] = None
@@ -6,12 +6,14 @@ de credenciales de administradores del sistema.
 """
 
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 from typing import Optional
 
 from app.models.administrador import Administrador
 from app.schemas.administrador import AdministradorCreate, AdministradorUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash
+from app.core import principal_cache, hash_executor
 
 
 def get_admin_by_usuario(db: Session, usuario: str) -> Administrador | None:
@@ -28,12 +30,14 @@ def get_admin_by_usuario(db: Session, usuario: str) -> Administrador | None:
     return db.exec(select(Administrador).where(Administrador.usuario == usuario)).first()
 
 
-def authenticate_admin(db: Session, usuario: str, contraseña: str) -> Optional[Administrador]:
+async def authenticate_admin(db: Session, usuario: str, contraseña: str) -> Optional[Administrador]:
     """
     Autentica a un administrador validando sus credenciales.
     
     Verifica que el nombre de usuario exista y que la contraseña proporcionada
-    coincida con el hash almacenado.
+    coincida con el hash almacenado. La consulta se ejecuta en el threadpool
+    (no en el event loop) y la verificación bcrypt en el pool dedicado de
+    `hash_executor`.
     
     Args:
         db: Sesión de base de datos.
@@ -43,12 +47,12 @@ def authenticate_admin(db: Session, usuario: str, contraseña: str) -> Optional[
     Returns:
         Instancia de Administrador si la autenticación es exitosa, None en caso contrario.
     """
-    admin = db.exec(select(Administrador).where(Administrador.usuario == usuario)).first()
+    admin = await run_in_threadpool(get_admin_by_usuario, db, usuario)
     
     if not admin:
         return None
     
-    if not verify_password(contraseña, admin.contraseña):
+    if not await hash_executor.verify_password(contraseña, admin.contraseña):
         return None
     
     return admin
@@ -101,6 +105,7 @@ def update_admin(db: Session, admin: Administrador, data: AdministradorUpdate) -
         Instancia del administrador actualizado.
     """
     update_data = data.model_dump(exclude_unset=True)
+    usuario_anterior = admin.usuario
     
     if "contraseña" in update_data and update_data["contraseña"]:
         update_data["contraseña"] = get_password_hash(update_data["contraseña"])
@@ -112,4 +117,7 @@ def update_admin(db: Session, admin: Administrador, data: AdministradorUpdate) -
     db.commit()
     db.refresh(admin)
     
+    principal_cache.invalidate(principal_cache.TIPO_ADMIN, usuario_anterior)
+    principal_cache.invalidate(principal_cache.TIPO_ADMIN, admin.usuario)
+    
     return admin
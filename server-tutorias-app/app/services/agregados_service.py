@@ -0,0 +1,115 @@
+"""
+Servicio de consultas de agregación sobre las tutorías de un periodo.
+
+Centraliza las métricas del resumen institucional (Hoja 1 del Anexo 3) como
+expresiones SQL, de modo que la base de datos (PostgreSQL o SQLite) devuelva
+los totales ya calculados. Lo usan tanto la generación del Excel como el
+endpoint JSON de resumen para tableros.
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import case
+from sqlmodel import Session, select, func
+
+from app.models.tutoria import Tutoria
+from app.models.alumno import Alumno
+from app.models.reporte_integral import ReporteIntegral
+
+
+# Métricas que se suman en la fila de totales
+CAMPOS_TOTALES = (
+    "total_tutores",
+    "total_alumnos",
+    "total_grupal",
+    "total_individual",
+    "total_canalizaciones",
+    "total_psicologia",
+    "total_ciencias",
+    "total_jefatura",
+)
+
+
+def _contar_canalizados(columna) -> Any:
+    """SUM(CASE WHEN columna > 0 THEN 1 ELSE 0 END): alumnos canalizados al área."""
+    return func.sum(case((columna > 0, 1), else_=0))
+
+
+def _contar_tutores() -> Any:
+    """
+    Tutores distintos del grupo, contando las tutorías sin tutor asignado
+    como un tutor más (igual que el conjunto de `tutor_id` del cálculo
+    original). COUNT(DISTINCT ...) por sí solo ignora los NULL.
+    """
+    return (
+        func.count(func.distinct(Tutoria.tutor_id))
+        + func.max(case((Tutoria.tutor_id.is_(None), 1), else_=0)) # type: ignore
+    )
+
+
+def metricas_tutorias() -> List[Any]:
+    """
+    Expresiones SQL de las métricas del resumen, etiquetadas por nombre.
+    
+    Las tutorías sin Reporte Integral cuentan como cero en todas las sumas.
+    """
+    return [
+        _contar_tutores().label("total_tutores"),
+        func.count(Tutoria.id_tutoria).label("total_alumnos"),
+        func.sum(func.coalesce(ReporteIntegral.tutoria_grupal, 0)).label("total_grupal"),
+        func.sum(func.coalesce(ReporteIntegral.tutoria_individual, 0)).label("total_individual"),
+        _contar_canalizados(ReporteIntegral.psicologia).label("total_psicologia"),
+        _contar_canalizados(ReporteIntegral.ciencias_basicas).label("total_ciencias"),
+        _contar_canalizados(ReporteIntegral.jefatura_academica).label("total_jefatura"),
+    ]
+
+
+def _fila_resumen(fila) -> Dict[str, Any]:
+    datos = dict(fila._mapping)
+    datos["total_canalizaciones"] = (
+        datos["total_psicologia"] + datos["total_ciencias"] + datos["total_jefatura"]
+    )
+    return datos
+
+
+def get_resumen_por_carrera_semestre(db: Session, periodo: str) -> List[Dict[str, Any]]:
+    """
+    Calcula el resumen del periodo agrupado por carrera y semestre en SQL.
+    
+    Args:
+        db: Sesión de base de datos.
+        periodo: Periodo académico.
+    
+    Returns:
+        Una fila por (carrera, semestre) con las métricas de `metricas_tutorias`
+        más `total_canalizaciones`, ordenadas por carrera y semestre. La lista
+        está vacía si no hay tutorías en el periodo.
+    """
+    query = (
+        select(
+            Alumno.carrera.label("carrera"), # type: ignore
+            Alumno.semestre_actual.label("semestre"), # type: ignore
+            *metricas_tutorias()
+        )
+        .select_from(Tutoria)
+        .join(Alumno, Tutoria.alumno_id == Alumno.id_alumno) # type: ignore
+        .outerjoin(ReporteIntegral, Tutoria.id_tutoria == ReporteIntegral.id_tutoria) # type: ignore
+        .where(Tutoria.periodo == periodo)
+        .group_by(Alumno.carrera, Alumno.semestre_actual)
+    )
+    
+    resumen = [_fila_resumen(fila) for fila in db.exec(query).all()]
+    
+    # Ordenamos en Python para no depender de la collation de la BD
+    resumen.sort(key=lambda fila: (fila["carrera"], fila["semestre"]))
+    return resumen
+
+
+def sumar_totales(resumen: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Suma las filas del resumen igual que la fila TOTAL de la Hoja 1.
+    
+    Nota: `total_tutores` es la suma por grupo, por lo que un tutor con
+    alumnos en varias carreras o semestres se cuenta una vez por grupo.
+    """
+    return {campo: sum(fila[campo] for fila in resumen) for campo in CAMPOS_TOTALES}
@@ -5,9 +5,16 @@ Proporciona funciones para operaciones CRUD, autenticación, gestión de contras
 y procesamiento de carga masiva desde archivos Excel.
 """
 
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
 from fastapi import HTTPException, status, UploadFile
 from sqlmodel import Session, select, delete, func
 import pandas as pd
+import openpyxl
 
 from app.models.alumno import Alumno
 from app.schemas.alumno import (
@@ -18,7 +25,42 @@ from app.schemas.alumno import (
     AlumnoTutoriaStatus
 )
 from app.models.tutoria import Tutoria, EstadoTutoria
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_password, hash_temp_passwords
+from app.core import principal_cache, jobs, pagination
+from app.core.search import search_text
+from app.core.config import settings
+from app.database import engine, dialect_insert
+
+
+# Columnas del Excel que se comparan y actualizan en cada carga de alumnos
+CAMPOS_CARGA_ALUMNO = (
+    "nombre", "apellido_p", "apellido_m", "carrera",
+    "semestre_actual", "estado", "telefono", "correo",
+)
+
+# Encabezados del Excel de alumnos -> columnas de Alumno
+COLUMNAS_EXCEL_ALUMNO = {
+    "numero_control": "num_control",
+    "nombre": "nombre",
+    "apellido_paterno": "apellido_p",
+    "apellido_materno": "apellido_m",
+    "carrera": "carrera",
+    "semestre": "semestre_actual",
+    "estatus": "estado",
+    "email": "correo",
+    "telefono": "telefono",
+}
+
+_COLUMNAS_OBLIGATORIAS = ("num_control", "nombre", "apellido_p", "carrera", "semestre_actual", "correo")
+
+# Longitudes máximas de las columnas de texto (ver modelo Alumno)
+_LONGITUD_MAXIMA = {
+    "num_control": 50, "nombre": 100, "apellido_p": 100, "apellido_m": 100,
+    "carrera": 100, "estado": 50, "telefono": 100, "correo": 255,
+}
+
+# Filas por sentencia en las cargas masivas
+_LOTE_CARGA = 1000
 
 
 def get_alumno_by_num_control(db: Session, num_control: str) -> Alumno | None:
@@ -82,105 +124,299 @@ def update_alumno(db: Session, alumno: Alumno, data: AlumnoUpdate) -> Alumno:
     db.commit()
     db.refresh(alumno)
     
+    principal_cache.invalidate(principal_cache.TIPO_ALUMNO, alumno.id_alumno)
+    
     return alumno
 
 
-def process_and_load_excel(db: Session, file: UploadFile) -> int:
+def normalizar_alumnos_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza en bloque (sin recorrer filas) un DataFrame de alumnos ya renombrado.
+    
+    - Nombres y apellidos en formato título; carrera con " en " en minúscula.
+    - Correo en minúsculas; teléfono como texto sin espacios (vacío = nulo).
+    - `estatus` se acepta como alias de `estado`; estado vacío = "A".
+    - Semestre convertido a entero (los valores no numéricos quedan nulos y
+      se reportan en la validación).
+    
+    Args:
+        df: DataFrame con columnas de Alumno (ver `COLUMNAS_EXCEL_ALUMNO`).
+    
+    Returns:
+        DataFrame con las columnas de `CAMPOS_CARGA_ALUMNO` y `num_control`.
+    """
+    df = df.rename(columns=COLUMNAS_EXCEL_ALUMNO)
+    if "estado" not in df.columns and "estatus" in df.columns:
+        df = df.rename(columns={"estatus": "estado"})
+    
+    resultado = pd.DataFrame(index=df.index)
+    
+    for col in ("num_control",) + CAMPOS_CARGA_ALUMNO:
+        if col not in df.columns:
+            resultado[col] = pd.Series(pd.NA, index=df.index, dtype="string")
+            continue
+        if col == "semestre_actual":
+            continue
+        texto = df[col].astype("string").str.strip()
+        resultado[col] = texto.mask(texto == "")
+    
+    for col in ("nombre", "apellido_p", "apellido_m"):
+        resultado[col] = resultado[col].str.title()
+    
+    resultado["carrera"] = resultado["carrera"].str.title().str.replace(" En ", " en ", regex=False)
+    resultado["correo"] = resultado["correo"].str.lower()
+    resultado["estado"] = resultado["estado"].fillna("A")
+    
+    if "semestre_actual" in df.columns:
+        semestre = pd.to_numeric(df["semestre_actual"], errors="coerce")
+        # Solo enteros: 3.5 o texto quedan nulos y se reportan como inválidos
+        resultado["semestre_actual"] = semestre.where(semestre % 1 == 0).astype("Int64")
+        resultado["_semestre_original"] = df["semestre_actual"]
+    else:
+        resultado["semestre_actual"] = pd.Series(pd.NA, index=df.index, dtype="Int64")
+        resultado["_semestre_original"] = pd.NA
+    
+    return resultado
+
+
+def validar_alumnos_df(df: pd.DataFrame, fila_inicial: int = 2) -> List[Dict[str, Any]]:
+    """
+    Valida en una sola pasada un DataFrame normalizado y reporta todos los errores.
+    
+    Args:
+        df: Resultado de `normalizar_alumnos_df`.
+        fila_inicial: Número de fila del archivo que corresponde a la primera
+            fila del DataFrame (2 = después del encabezado).
+    
+    Returns:
+        Lista de errores por fila: {"fila", "num_control", "errores": [...]}.
+        Vacía si todo es válido.
+    """
+    errores = pd.Series([[] for _ in range(len(df))], index=df.index, dtype=object)
+    
+    def marcar(mascara: pd.Series, mensaje: str) -> None:
+        for idx in mascara[mascara.fillna(False)].index:
+            errores[idx].append(mensaje)
+    
+    for col in _COLUMNAS_OBLIGATORIAS:
+        if col == "semestre_actual":
+            continue
+        marcar(df[col].isna(), f"Falta el valor obligatorio '{col}'.")
+    
+    semestre_vacio = df["_semestre_original"].isna()
+    marcar(semestre_vacio, "Falta el valor obligatorio 'semestre_actual'.")
+    marcar(~semestre_vacio & df["semestre_actual"].isna(), "El semestre debe ser un número entero.")
+    marcar((df["semestre_actual"] < 1) | (df["semestre_actual"] > 14), "El semestre debe estar entre 1 y 14.")
+    
+    marcar(df["correo"].notna() & ~df["correo"].str.contains("@", regex=False), "El correo no es válido.")
+    
+    for col, longitud in _LONGITUD_MAXIMA.items():
+        marcar(df[col].str.len() > longitud, f"'{col}' excede {longitud} caracteres.")
+    
+    marcar(
+        df["num_control"].notna() & df["num_control"].duplicated(keep=False),
+        "Número de control duplicado en el archivo."
+    )
+    
+    con_error = errores[errores.str.len() > 0]
+    return [
+        {
+            "fila": int(idx) + fila_inicial,
+            "num_control": None if pd.isna(df.at[idx, "num_control"]) else df.at[idx, "num_control"],
+            "errores": lista,
+        }
+        for idx, lista in con_error.items()
+    ]
+
+
+def _a_registros(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convierte columnas a registros con tipos nativos (None en lugar de NA)."""
+    columnas = df.astype(object)
+    return columnas.where(df.notna(), None).to_dict("records")
+
+
+def _upsert_lote(db: Session, df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Aplica un lote de alumnos como diferencia contra la tabla actual (sin commit).
+    
+    Lee en una sola consulta los alumnos existentes del lote, detecta con
+    operaciones por columna qué filas son nuevas o cambiaron, y solo esas se
+    envían a la BD mediante `INSERT ... ON CONFLICT (num_control) DO UPDATE`.
+    Las filas sin cambios no se tocan, y la contraseña de los alumnos
+    existentes nunca se modifica.
+    
+    Args:
+        db: Sesión de base de datos.
+        df: Alumnos normalizados y validados (ver `normalizar_alumnos_df`).
+    
+    Returns:
+        Conteos de insertados, actualizados y sin_cambios.
+    """
+    df = df[["num_control", *CAMPOS_CARGA_ALUMNO]]
+    claves = df["num_control"].tolist()
+    columnas = [getattr(Alumno, campo) for campo in CAMPOS_CARGA_ALUMNO]
+    
+    filas_existentes: List[Any] = []
+    for inicio in range(0, len(claves), _LOTE_CARGA):
+        filas_existentes.extend(db.exec(
+            select(Alumno.num_control, Alumno.contraseña, *columnas)
+            .where(Alumno.num_control.in_(claves[inicio:inicio + _LOTE_CARGA])) # type: ignore
+        ).all())
+    existentes = pd.DataFrame(
+        filas_existentes, columns=["num_control", "contraseña", *CAMPOS_CARGA_ALUMNO]
+    )
+    
+    combinado = df.merge(
+        existentes, on="num_control", how="left", suffixes=("", "_bd"), indicator=True
+    )
+    es_nuevo = combinado["_merge"] == "left_only"
+    
+    cambio = pd.Series(False, index=combinado.index)
+    for campo in CAMPOS_CARGA_ALUMNO:
+        nuevo = combinado[campo].astype(object)
+        actual = combinado[f"{campo}_bd"].astype(object)
+        iguales = (nuevo == actual) | (nuevo.isna() & actual.isna())
+        cambio |= ~iguales.astype(bool)
+    es_modificado = ~es_nuevo & cambio
+    
+    pendientes = combinado.loc[es_nuevo | es_modificado, ["num_control", *CAMPOS_CARGA_ALUMNO, "contraseña"]].copy()
+    nuevos = es_nuevo[es_nuevo | es_modificado].to_numpy()
+    
+    # Contraseña temporal hasheada en paralelo (solo para alumnos nuevos). En los
+    # modificados la contraseña actual solo completa la fila candidata del INSERT;
+    # el DO UPDATE no la modifica.
+    pendientes.loc[nuevos, "contraseña"] = hash_temp_passwords(
+        (pendientes.loc[nuevos, "num_control"] + "itsf").tolist()
+    )
+    ahora = datetime.now(timezone.utc)
+    pendientes["requires_password_change"] = True
+    pendientes["busqueda"] = [
+        search_text(*(None if pd.isna(valor) else valor for valor in fila))
+        for fila in pendientes[["nombre", "apellido_p", "apellido_m", "num_control"]].itertuples(index=False)
+    ]
+    pendientes["created_at"] = ahora
+    pendientes["updated_at"] = ahora
+    
+    stmt = dialect_insert(Alumno)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Alumno.num_control],
+        set_={campo: stmt.excluded[campo] for campo in CAMPOS_CARGA_ALUMNO + ("busqueda", "updated_at")}
+    )
+    registros = _a_registros(pendientes)
+    for inicio in range(0, len(registros), _LOTE_CARGA):
+        db.execute(stmt, registros[inicio:inicio + _LOTE_CARGA])
+    
+    insertados = int(es_nuevo.sum())
+    actualizados = int(es_modificado.sum())
+    return {
+        "insertados": insertados,
+        "actualizados": actualizados,
+        "sin_cambios": len(df) - insertados - actualizados,
+    }
+
+
+def _procesar_ausentes(db: Session, claves_archivo: Set[str], eliminar_ausentes: bool) -> Dict[str, int]:
+    """
+    Cuenta (y opcionalmente elimina) a los alumnos que no vienen en el archivo (sin commit).
+    
+    Args:
+        db: Sesión de base de datos.
+        claves_archivo: Números de control presentes en el archivo.
+        eliminar_ausentes: Si es True, los elimina (¡sus tutorías se eliminan en cascada!).
+    
+    Returns:
+        Conteos de ausentes y eliminados.
+    """
+    ausentes = [
+        num_control for num_control in db.exec(select(Alumno.num_control)).all()
+        if num_control not in claves_archivo
+    ]
+    eliminados = 0
+    if eliminar_ausentes:
+        for inicio in range(0, len(ausentes), _LOTE_CARGA):
+            resultado = db.execute(
+                delete(Alumno).where(Alumno.num_control.in_(ausentes[inicio:inicio + _LOTE_CARGA])) # type: ignore
+            )
+            eliminados += resultado.rowcount
+    return {"ausentes": len(ausentes), "eliminados": eliminados}
+
+
+def _upsert_alumnos(db: Session, df: pd.DataFrame, eliminar_ausentes: bool) -> Dict[str, int]:
+    """
+    Aplica una carga completa de alumnos en una sola transacción.
+    
+    Args:
+        db: Sesión de base de datos.
+        df: Alumnos normalizados y validados (ver `normalizar_alumnos_df`).
+        eliminar_ausentes: Si es True, elimina a los alumnos que no vienen en el archivo.
+    
+    Returns:
+        Conteos de insertados, actualizados, sin_cambios, ausentes y eliminados.
+    """
+    resumen = _upsert_lote(db, df)
+    resumen.update(_procesar_ausentes(db, set(df["num_control"]), eliminar_ausentes))
+    db.commit()
+    
+    if resumen["actualizados"] or resumen["eliminados"]:
+        principal_cache.invalidate_tipo(principal_cache.TIPO_ALUMNO)
+    
+    return resumen
+
+
+def process_and_load_excel(db: Session, file: UploadFile, eliminar_ausentes: bool = False) -> Dict[str, int]:
     """
     Procesa y carga alumnos desde un archivo Excel.
+    
+    La normalización y la validación se hacen por columna; si hay errores se
+    responde con el reporte completo por fila y no se guarda nada. La carga es
+    incremental (ver `_upsert_alumnos`): inserta alumnos nuevos, actualiza los
+    que cambiaron y conserva a los demás junto con sus tutorías.
+    
+    Args:
+        db: Sesión de base de datos.
+        file: Archivo Excel subido.
+        eliminar_ausentes: Elimina a los alumnos que no vienen en el archivo.
+    
+    Returns:
+        Resumen de la carga (insertados, actualizados, sin_cambios, ausentes, eliminados).
+    
+    Raises:
+        HTTPException: 400 con el detalle de errores por fila si el archivo no es válido.
     """
     try:
-        column_map = {
-            "numero_control": "num_control",
-            "nombre": "nombre",
-            "apellido_paterno": "apellido_p",
-            "apellido_materno": "apellido_m",
-            "carrera": "carrera",
-            "semestre": "semestre_actual",
-            "estatus": "estado",
-            "email": "correo",
-            "telefono": "telefono"  # ✅ AGREGADO - Mapeo explícito
-        }
-        
-        # ✅ FORZAR telefono como string al leer
+        # ✅ FORZAR telefono y número de control como string al leer
         df = pd.read_excel(
             file.file, 
             dtype={
                 'numero_control': str,
-                'telefono': str  # ✅ AGREGADO - Forzar como string
+                'telefono': str
             }
         )
         
-        df.rename(columns=column_map, inplace=True)
-        df = df.astype(object).where(pd.notnull(df), None) #type: ignore
-        
-        # Normalizar nombres
-        name_columns = ['nombre', 'apellido_p', 'apellido_m']
-        for col in name_columns:
-            if col in df.columns:
-                df[col] = df[col].str.title()
-        
-        # Normalizar carrera
-        if 'carrera' in df.columns:
-            df['carrera'] = df['carrera'].str.title().str.replace(" En ", " en ")
-        
-        # Normalizar correo
-        if 'correo' in df.columns:
-            df['correo'] = df['correo'].str.lower()
-        
-        # ✅ AGREGADO - Normalizar teléfono
-        if 'telefono' in df.columns:
-            # Convertir cualquier valor a string, manejar NaN
-            df['telefono'] = df['telefono'].apply(
-                lambda x: str(x).strip() if pd.notna(x) and str(x).strip() != '' else None
+        faltantes = _columnas_faltantes(df.columns)
+        if faltantes:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Columnas esperadas no encontradas en Excel: {', '.join(faltantes)}."
             )
         
-        # Validar columnas requeridas
-        required_columns = ['num_control', 'nombre', 'apellido_p', 'carrera', 'semestre_actual', 'correo']
-        null_check = df[required_columns].isnull()
+        df = normalizar_alumnos_df(df)
+        errores = validar_alumnos_df(df)
         
-        if null_check.any().any():
-            first_error_row = df[null_check.any(axis=1)].iloc[0]
+        if errores:
             raise HTTPException(
                 status_code=400,
-                detail=f"Error de datos: Faltan valores obligatorios. Revise al alumno '{first_error_row['num_control']}'."
+                detail={
+                    "mensaje": f"Error de datos: {len(errores)} fila(s) con errores. No se guardó ningún cambio.",
+                    "errores": errores,
+                }
             )
         
-        alumnos_a_crear = []
-        
-        for _, row in df.iterrows():
-            row_data = row.to_dict()
-            
-            # Manejar estado/estatus
-            if 'estado' not in row_data and 'estatus' in row_data:
-                row_data['estado'] = row_data.pop('estatus')
-            
-            # Contraseña temporal
-            row_data["contraseña"] = f'{row_data["num_control"]}itsf'
-            
-            # ✅ AGREGADO - Asegurar que telefono sea string o None
-            if 'telefono' in row_data:
-                telefono_val = row_data['telefono']
-                if telefono_val is not None and telefono_val != '' and telefono_val != 'nan':
-                    row_data['telefono'] = str(telefono_val)
-                else:
-                    row_data['telefono'] = None
-            
-            alumnos_a_crear.append(Alumno(**row_data))
-        
-        # Limpiar tabla y cargar nuevos datos
-        db.execute(delete(Alumno))
-        db.add_all(alumnos_a_crear)
-        db.commit()
-        
-        return len(alumnos_a_crear)
+        return _upsert_alumnos(db, df, eliminar_ausentes)
     
-    except KeyError as e:
+    except HTTPException:
         db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail=f"Columna '{e}' esperada no encontrada en Excel o en el mapeo."
-        )
+        raise
     
     except Exception as e:
         db.rollback()
@@ -190,6 +426,196 @@ def process_and_load_excel(db: Session, file: UploadFile) -> int:
         )
 
 
+# --- CARGA EN SEGUNDO PLANO (ARCHIVOS GRANDES) ---
+
+FORMATO_XLSX = "xlsx"
+FORMATO_CSV = "csv"
+
+_EXTENSIONES_IMPORTACION = {".xlsx": FORMATO_XLSX, ".xlsm": FORMATO_XLSX, ".csv": FORMATO_CSV}
+
+# Máximo de errores por fila que se guardan en el estado del trabajo
+_MAX_ERRORES_TRABAJO = 1000
+
+
+def guardar_archivo_importacion(file: UploadFile) -> Tuple[str, str]:
+    """
+    Guarda el archivo subido en disco para procesarlo en segundo plano.
+    
+    Args:
+        file: Archivo subido (.xlsx o .csv).
+    
+    Returns:
+        Tupla (ruta del archivo, formato).
+    
+    Raises:
+        HTTPException: 400 si la extensión no es soportada.
+    """
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    formato = _EXTENSIONES_IMPORTACION.get(extension)
+    if formato is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Formato no soportado. Suba un archivo .xlsx o .csv."
+        )
+    
+    os.makedirs(settings.JOBS_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=settings.JOBS_DIR, suffix=f".upload{extension}")
+    with os.fdopen(fd, "wb") as destino:
+        shutil.copyfileobj(file.file, destino, length=1024 * 1024)
+    return path, formato
+
+
+def _contar_filas(path: str, formato: str) -> Optional[int]:
+    """Filas de datos según la dimensión declarada del Excel (None si se desconoce)."""
+    if formato != FORMATO_XLSX:
+        return None
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        max_row = workbook.worksheets[0].max_row
+        return max_row - 1 if max_row else None
+    finally:
+        workbook.close()
+
+
+def _leer_lotes(path: str, formato: str, tamaño: int) -> Iterator[pd.DataFrame]:
+    """
+    Lee el archivo en lotes de `tamaño` filas sin cargarlo completo en memoria.
+    
+    El índice de cada lote es el número de fila del archivo menos 2 (encabezado
+    en la fila 1), de modo que `validar_alumnos_df` reporte la fila real. Las
+    filas vacías se omiten en ambos formatos.
+    """
+    if formato == FORMATO_CSV:
+        # skip_blank_lines=False conserva la numeración; las filas vacías
+        # (o solo con comas) se descartan después, igual que en el Excel
+        for lote in pd.read_csv(
+            path, dtype=str, chunksize=tamaño, encoding="utf-8-sig", skip_blank_lines=False
+        ):
+            lote = lote.dropna(how="all")
+            if not lote.empty:
+                yield lote
+        return
+    
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        filas = workbook.worksheets[0].iter_rows(values_only=True)
+        encabezados = [str(valor).strip() if valor is not None else "" for valor in next(filas, ())]
+        
+        valores: List[Any] = []
+        indices: List[int] = []
+        for numero, fila in enumerate(filas):
+            if all(valor is None for valor in fila):
+                continue
+            valores.append(fila[:len(encabezados)])
+            indices.append(numero)
+            if len(valores) >= tamaño:
+                yield pd.DataFrame(valores, columns=encabezados, index=indices)
+                valores, indices = [], []
+        
+        if valores:
+            yield pd.DataFrame(valores, columns=encabezados, index=indices)
+    finally:
+        workbook.close()
+
+
+def _columnas_faltantes(columnas: Iterable[str]) -> List[str]:
+    columnas = set(columnas)
+    return [
+        origen for origen, destino in COLUMNAS_EXCEL_ALUMNO.items()
+        if destino in _COLUMNAS_OBLIGATORIAS and origen not in columnas and destino not in columnas
+    ]
+
+
+def importar_alumnos_en_lotes(job_id: str, path: str, formato: str, eliminar_ausentes: bool = False) -> None:
+    """
+    Carga incremental de alumnos en segundo plano, por lotes de IMPORT_BATCH_SIZE filas.
+    
+    Cada lote se normaliza, valida y aplica con `_upsert_lote`, y se confirma
+    (commit) al terminar, de modo que la memoria usada no depende del tamaño
+    del archivo y un error a la mitad conserva los lotes ya aplicados. Las filas
+    con errores se omiten y se reportan en el trabajo. El avance se registra en
+    `app.core.jobs`.
+    
+    Args:
+        job_id: Trabajo de `app.core.jobs` creado para esta carga.
+        path: Archivo guardado con `guardar_archivo_importacion` (se elimina al terminar).
+        formato: FORMATO_XLSX o FORMATO_CSV.
+        eliminar_ausentes: Elimina al final a los alumnos que no vienen en el archivo.
+    """
+    resumen = {"insertados": 0, "actualizados": 0, "sin_cambios": 0, "omitidos": 0, "ausentes": 0, "eliminados": 0}
+    errores: List[Dict[str, Any]] = []
+    total_errores = 0
+    claves_archivo: Set[str] = set()
+    procesados = 0
+    
+    def registrar_avance(**campos: Any) -> None:
+        jobs.update_job(
+            job_id,
+            procesados=procesados,
+            errores=errores,
+            resultado={**resumen, "filas_con_error": total_errores},
+            **campos
+        )
+    
+    try:
+        jobs.update_job(job_id, estado=jobs.ESTADO_EN_PROCESO, total=_contar_filas(path, formato))
+        
+        with Session(engine) as db:
+            for lote in _leer_lotes(path, formato, settings.IMPORT_BATCH_SIZE):
+                faltantes = _columnas_faltantes(lote.columns)
+                if faltantes:
+                    raise ValueError(f"Columnas esperadas no encontradas: {', '.join(faltantes)}.")
+                
+                df = normalizar_alumnos_df(lote)
+                errores_lote = validar_alumnos_df(df)
+                
+                # Duplicados contra lotes anteriores
+                repetidos = df["num_control"].notna() & df["num_control"].isin(claves_archivo)
+                filas_con_error = {error["fila"] - 2 for error in errores_lote}
+                for idx in repetidos[repetidos].index:
+                    errores_lote.append({
+                        "fila": int(idx) + 2,
+                        "num_control": df.at[idx, "num_control"],
+                        "errores": ["Número de control duplicado en el archivo."],
+                    })
+                    filas_con_error.add(idx)
+                
+                claves_archivo.update(df["num_control"].dropna())
+                validos = df.drop(index=list(filas_con_error))
+                
+                conteo = _upsert_lote(db, validos)
+                db.commit()
+                
+                for clave, valor in conteo.items():
+                    resumen[clave] += valor
+                resumen["omitidos"] += len(filas_con_error)
+                total_errores += len(errores_lote)
+                errores.extend(errores_lote[:max(0, _MAX_ERRORES_TRABAJO - len(errores))])
+                procesados += len(df)
+                registrar_avance()
+            
+            resumen.update(_procesar_ausentes(db, claves_archivo, eliminar_ausentes))
+            db.commit()
+        
+        principal_cache.invalidate_tipo(principal_cache.TIPO_ALUMNO)
+        pagination.invalidate_counts("alumnos")
+        pagination.invalidate_counts("tutorias")
+        pagination.invalidate_counts("tutorias_tutor")
+        registrar_avance(estado=jobs.ESTADO_COMPLETADO)
+    
+    except Exception as e:
+        print(f"❌ Error en la carga de alumnos {job_id}: {e}")
+        principal_cache.invalidate_tipo(principal_cache.TIPO_ALUMNO)
+        errores.append({"fila": None, "num_control": None, "errores": [f"Carga interrumpida: {e}"]})
+        registrar_avance(estado=jobs.ESTADO_ERROR)
+    
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 def set_permanent_password(db: Session, data: AlumnoSetPassword) -> dict:
     """
     Establece una contraseña permanente para un alumno con contraseña temporal.
@@ -205,23 +631,18 @@ def set_permanent_password(db: Session, data: AlumnoSetPassword) -> dict:
             detail="Este alumno ya tiene contraseña permanente."
         )
     
-    # Validación Robusta: Intentamos comparar texto plano O verificar hash
-    # Esto cubre el caso donde un Admin reseteó la pass pero la flag quedó True (casos viejos)
-    is_valid = False
-    if data.contraseña_actual == alumno.contraseña: # Caso Excel (Texto plano)
-        is_valid = True
-    elif verify_password(data.contraseña_actual, alumno.contraseña): # Caso Admin Reset (Hash)
-        is_valid = True
-        
-    if not is_valid:
+    # La contraseña temporal (carga de Excel o reseteo del Admin) siempre está hasheada
+    if not verify_password(data.contraseña_actual, alumno.contraseña):
         raise HTTPException(status_code=401, detail="La contraseña actual es incorrecta.")
     
     hashed_password = get_password_hash(data.nueva_contraseña)
     alumno.contraseña = hashed_password
     alumno.requires_password_change = False
     
+    alumno_id = alumno.id_alumno
     db.add(alumno)
     db.commit()
+    principal_cache.invalidate(principal_cache.TIPO_ALUMNO, alumno_id)
     
     return {"message": "Contraseña actualizada exitosamente."}
 
@@ -242,8 +663,10 @@ def change_password(db: Session, alumno: Alumno, data: AlumnoUpdatePassword) ->
     hashed_password = get_password_hash(data.nueva_contraseña)
     alumno.contraseña = hashed_password
     
+    alumno_id = alumno.id_alumno
     db.add(alumno)
     db.commit()
+    principal_cache.invalidate(principal_cache.TIPO_ALUMNO, alumno_id)
     
     return {"message": "Su contraseña ha sido actualizada exitosamente."}
 
@@ -1,5 +1,9 @@
 import io
-from typing import List, Tuple
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 # Importamos librería para crear Excel desde cero
 import openpyxl
@@ -7,7 +11,7 @@ from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
 # FastAPI / SQLModel
-from sqlmodel import Session, select
+from sqlmodel import Session, select, or_
 from fastapi import HTTPException, status
 
 # Modelos necesarios
@@ -15,32 +19,51 @@ from app.models.alumno import Alumno
 from app.models.tutoria import Tutoria
 from app.models.reporte_integral import ReporteIntegral
 
+
+# --- DEPARTAMENTOS DE CANALIZACIÓN ---
+# clave -> (columna de ReporteIntegral, nombre para títulos y hojas)
+DEPARTAMENTO_PSICOLOGIA = "psicologia"
+DEPARTAMENTO_CIENCIAS_BASICAS = "ciencias_basicas"
+DEPARTAMENTO_JEFATURA_ACADEMICA = "jefatura_academica"
+
+DEPARTAMENTOS: Dict[str, Tuple[str, str]] = {
+    DEPARTAMENTO_PSICOLOGIA: ("psicologia", "Psicología"),
+    DEPARTAMENTO_CIENCIAS_BASICAS: ("ciencias_basicas", "Ciencias Básicas"),
+    DEPARTAMENTO_JEFATURA_ACADEMICA: ("jefatura_academica", "Jefatura Académica"),
+}
+
+# Fila plana de la consulta: datos del alumno + banderas por departamento
+FilaCanalizacion = Tuple[str, str, str, int, str, str, Dict[str, bool]]
+
+# Libros generados por (periodo, departamentos). Cada entrada guarda el hash de
+# las filas con que se generó: si otro worker modificó los datos, el hash no
+# coincide y el libro se regenera aunque este proceso no haya sido notificado.
+_MAX_LIBROS_CACHEADOS = 32
+_cache_libros: "OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[str, bytes]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
 # --- FUNCIÓN PRIVADA AUXILIAR PARA GENERAR EL EXCEL (DRY Principle) ---
-def _generar_excel_comun(resultados: List[Tuple[Alumno, Tutoria, ReporteIntegral]], titulo_reporte: str) -> io.BytesIO:
+def _escribir_hoja(sheet, filas: Iterable[FilaCanalizacion], titulo_reporte: str) -> None:
     """
-    Función interna que recibe los resultados de la BD y genera el archivo Excel
-    con el formato estandarizado para canalizaciones.
+    Escribe en una hoja el formato estandarizado para canalizaciones
+    (título, encabezados y una fila por alumno).
     """
-    # Crear el libro de Excel
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = "Reporte Canalización" # type: ignore
-
     # --- Estilos ---
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid") # Azul institucional
     center_alignment = Alignment(horizontal="center", vertical="center")
     left_alignment = Alignment(horizontal="left", vertical="center")
-    
+
     thin_side = Side(style="thin", color="000000")
     all_borders = Border(left=thin_side, top=thin_side, right=thin_side, bottom=thin_side)
 
     # --- Encabezados ---
     headers = ["Nombre Completo", "No. Control", "Carrera", "Semestre", "Correo", "Teléfono"]
-    
+
     # Título superior
-    sheet.merge_cells('A1:F1') # type: ignore
-    title_cell = sheet['A1'] # type: ignore
+    sheet.merge_cells('A1:F1')
+    title_cell = sheet['A1']
     title_cell.value = titulo_reporte
     title_cell.font = Font(bold=True, size=14)
     title_cell.alignment = center_alignment
@@ -48,7 +71,7 @@ def _generar_excel_comun(resultados: List[Tuple[Alumno, Tutoria, ReporteIntegral
     # Fila de Encabezados (Fila 3)
     row_header = 3
     for col_idx, header_text in enumerate(headers, start=1):
-        cell = sheet.cell(row=row_header, column=col_idx, value=header_text) # type: ignore
+        cell = sheet.cell(row=row_header, column=col_idx, value=header_text)
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = center_alignment
@@ -56,109 +79,185 @@ def _generar_excel_comun(resultados: List[Tuple[Alumno, Tutoria, ReporteIntegral
 
     # --- Rellenar Datos ---
     row_idx = 4
-    for alumno, tutoria, reporte in resultados:
-        # Construir nombre completo
-        nombre_completo = f"{alumno.apellido_p} {alumno.apellido_m or ''} {alumno.nombre}".strip()
-        
-        datos_alumno = [
-            nombre_completo,
-            alumno.num_control,
-            alumno.carrera,
-            alumno.semestre_actual,
-            alumno.correo or "Sin correo",
-            alumno.telefono or "Sin teléfono"
-        ]
-
-        for col_idx, valor in enumerate(datos_alumno, start=1):
-            cell = sheet.cell(row=row_idx, column=col_idx, value=valor) # type: ignore
+    for fila in filas:
+        for col_idx, valor in enumerate(fila[:6], start=1):
+            cell = sheet.cell(row=row_idx, column=col_idx, value=valor)
             cell.border = all_borders
-            
+
             # Ajuste de alineación: Control, Carrera, Semestre centrados
-            if col_idx in [2, 3, 4]: 
+            if col_idx in [2, 3, 4]:
                 cell.alignment = center_alignment
             else:
                 cell.alignment = left_alignment
-        
+
         row_idx += 1
 
     # --- Ajustar ancho de columnas ---
-    column_widths = [40, 15, 42, 10, 35, 35] 
+    column_widths = [40, 15, 42, 10, 35, 35]
     for i, width in enumerate(column_widths, start=1):
         col_letter = get_column_letter(i)
-        sheet.column_dimensions[col_letter].width = width # type: ignore
+        sheet.column_dimensions[col_letter].width = width
 
-    # --- Guardar ---
-    output_stream = io.BytesIO()
-    workbook.save(output_stream)
-    workbook.close()
-    
-    output_stream.seek(0)
-    return output_stream
 
+def _titulo(departamento: str, periodo: str) -> str:
+    nombre = DEPARTAMENTOS[departamento][1]
+    return f"REPORTE DE CANALIZACIÓN - {nombre.upper()} - PERIODO {periodo}"
 
-# --- SERVICIOS PÚBLICOS ---
 
-def generate_reporte_psicologia(db: Session, periodo: str) -> io.BytesIO:
-    """Genera reporte para PSICOLOGÍA"""
+def _get_filas_canalizacion(
+    db: Session,
+    periodo: str,
+    departamentos: Sequence[str]
+) -> List[FilaCanalizacion]:
+    """
+    Obtiene en una sola consulta a los alumnos canalizados del periodo a
+    cualquiera de los departamentos indicados.
+
+    Cada fila incluye los datos del alumno ya formateados para el Excel y las
+    banderas de canalización de cada departamento solicitado.
+    """
+    columnas_flag = [getattr(ReporteIntegral, DEPARTAMENTOS[d][0]) for d in departamentos]
+
     query = (
-        select(Alumno, Tutoria, ReporteIntegral)
+        select(
+            Alumno.apellido_p,
+            Alumno.apellido_m,
+            Alumno.nombre,
+            Alumno.num_control,
+            Alumno.carrera,
+            Alumno.semestre_actual,
+            Alumno.correo,
+            Alumno.telefono,
+            *columnas_flag,
+        )
+        .select_from(Alumno)
         .join(Tutoria, Alumno.id_alumno == Tutoria.alumno_id) # type: ignore
         .join(ReporteIntegral, Tutoria.id_tutoria == ReporteIntegral.id_tutoria) # type: ignore
         .where(Tutoria.periodo == periodo)
-        .where(ReporteIntegral.psicologia > 0)
+        .where(or_(*[columna > 0 for columna in columnas_flag]))
         .order_by(Alumno.carrera, Alumno.semestre_actual, Alumno.apellido_p) # type: ignore
     )
-    resultados = db.exec(query).all()
 
-    if not resultados:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No se encontraron alumnos canalizados a Psicología en el periodo {periodo}."
+    filas: List[FilaCanalizacion] = []
+    for row in db.exec(query):
+        apellido_p, apellido_m, nombre, num_control, carrera, semestre, correo, telefono = row[:8]
+        # Construir nombre completo
+        nombre_completo = f"{apellido_p} {apellido_m or ''} {nombre}".strip()
+        banderas = {d: (valor or 0) > 0 for d, valor in zip(departamentos, row[8:])}
+        filas.append((
+            nombre_completo,
+            num_control,
+            carrera,
+            semestre,
+            correo or "Sin correo",
+            telefono or "Sin teléfono",
+            banderas,
+        ))
+    return filas
+
+
+def _generar_libro(filas: List[FilaCanalizacion], periodo: str, departamentos: Sequence[str]) -> bytes:
+    """Genera el libro con una hoja por departamento a partir de las filas ya consultadas."""
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active) # type: ignore
+
+    for departamento in departamentos:
+        # Un solo departamento conserva el nombre de hoja del reporte individual
+        titulo_hoja = "Reporte Canalización" if len(departamentos) == 1 else DEPARTAMENTOS[departamento][1]
+        sheet = workbook.create_sheet(title=titulo_hoja)
+        _escribir_hoja(
+            sheet,
+            (fila for fila in filas if fila[6][departamento]),
+            _titulo(departamento, periodo)
         )
 
-    titulo = f"REPORTE DE CANALIZACIÓN - PSICOLOGÍA - PERIODO {periodo}"
-    return _generar_excel_comun(resultados, titulo) #type: ignore
+    # --- Guardar ---
+    output_stream = io.BytesIO()
+    workbook.save(output_stream)
+    workbook.close()
+    return output_stream.getvalue()
 
 
-def generate_reporte_ciencias_basicas(db: Session, periodo: str) -> io.BytesIO:
-    """Genera reporte para CIENCIAS BÁSICAS"""
-    query = (
-        select(Alumno, Tutoria, ReporteIntegral)
-        .join(Tutoria, Alumno.id_alumno == Tutoria.alumno_id) # type: ignore
-        .join(ReporteIntegral, Tutoria.id_tutoria == ReporteIntegral.id_tutoria) # type: ignore
-        .where(Tutoria.periodo == periodo)
-        .where(ReporteIntegral.ciencias_basicas > 0) # Filtro específico
-        .order_by(Alumno.carrera, Alumno.semestre_actual, Alumno.apellido_p) # type: ignore
-    )
-    resultados = db.exec(query).all()
+def _hash_filas(filas: List[FilaCanalizacion]) -> str:
+    return hashlib.sha256(
+        json.dumps(filas, default=str, ensure_ascii=False).encode()
+    ).hexdigest()
 
-    if not resultados:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No se encontraron alumnos canalizados a Ciencias Básicas en el periodo {periodo}."
-        )
 
-    titulo = f"REPORTE DE CANALIZACIÓN - CIENCIAS BÁSICAS - PERIODO {periodo}"
-    return _generar_excel_comun(resultados, titulo) #type: ignore
+def generate_reporte_canalizacion(
+    db: Session,
+    periodo: str,
+    departamentos: Sequence[str] = tuple(DEPARTAMENTOS)
+) -> io.BytesIO:
+    """
+    Genera el reporte de canalización de uno o varios departamentos.
 
+    Se ejecuta una sola consulta con todas las banderas solicitadas y se
+    escribe un libro con una hoja por departamento. El libro generado se
+    conserva en caché por periodo hasta que cambie un Reporte Integral del
+    periodo (ver `invalidar_cache_periodo`) o hasta que cambien los datos
+    consultados.
 
-def generate_reporte_jefatura_academica(db: Session, periodo: str) -> io.BytesIO:
-    """Genera reporte para JEFATURA ACADÉMICA"""
-    query = (
-        select(Alumno, Tutoria, ReporteIntegral)
-        .join(Tutoria, Alumno.id_alumno == Tutoria.alumno_id) # type: ignore
-        .join(ReporteIntegral, Tutoria.id_tutoria == ReporteIntegral.id_tutoria) # type: ignore
-        .where(Tutoria.periodo == periodo)
-        .where(ReporteIntegral.jefatura_academica > 0) # Filtro específico
-        .order_by(Alumno.carrera, Alumno.semestre_actual, Alumno.apellido_p) # type: ignore
-    )
-    resultados = db.exec(query).all()
+    Args:
+        db: Sesión de base de datos.
+        periodo: Periodo académico.
+        departamentos: Claves de `DEPARTAMENTOS` a incluir, en orden de hojas.
+
+    Returns:
+        Archivo Excel en memoria.
+
+    Raises:
+        HTTPException: Si ningún alumno del periodo fue canalizado a los departamentos indicados.
+    """
+    departamentos = tuple(departamentos)
+    filas = _get_filas_canalizacion(db, periodo, departamentos)
 
-    if not resultados:
+    if not filas:
+        nombres = ", ".join(DEPARTAMENTOS[d][1] for d in departamentos)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No se encontraron alumnos canalizados a Jefatura Académica en el periodo {periodo}."
+            detail=f"No se encontraron alumnos canalizados a {nombres} en el periodo {periodo}."
         )
 
-    titulo = f"REPORTE DE CANALIZACIÓN - JEFATURA ACADÉMICA - PERIODO {periodo}"
-    return _generar_excel_comun(resultados, titulo) #type: ignore
\ No newline at end of file
+    cache_key = (periodo, departamentos)
+    huella = _hash_filas(filas)
+
+    with _cache_lock:
+        entrada = _cache_libros.get(cache_key)
+        if entrada is not None and entrada[0] == huella:
+            _cache_libros.move_to_end(cache_key)
+            return io.BytesIO(entrada[1])
+
+    contenido = _generar_libro(filas, periodo, departamentos)
+
+    with _cache_lock:
+        _cache_libros[cache_key] = (huella, contenido)
+        _cache_libros.move_to_end(cache_key)
+        while len(_cache_libros) > _MAX_LIBROS_CACHEADOS:
+            _cache_libros.popitem(last=False)
+
+    return io.BytesIO(contenido)
+
+
+def invalidar_cache_periodo(periodo: str) -> None:
+    """Descarta los libros de canalización cacheados de un periodo."""
+    with _cache_lock:
+        for cache_key in [k for k in _cache_libros if k[0] == periodo]:
+            del _cache_libros[cache_key]
+
+
+# --- SERVICIOS PÚBLICOS ---
+
+def generate_reporte_psicologia(db: Session, periodo: str) -> io.BytesIO:
+    """Genera reporte para PSICOLOGÍA"""
+    return generate_reporte_canalizacion(db, periodo, [DEPARTAMENTO_PSICOLOGIA])
+
+
+def generate_reporte_ciencias_basicas(db: Session, periodo: str) -> io.BytesIO:
+    """Genera reporte para CIENCIAS BÁSICAS"""
+    return generate_reporte_canalizacion(db, periodo, [DEPARTAMENTO_CIENCIAS_BASICAS])
+
+
+def generate_reporte_jefatura_academica(db: Session, periodo: str) -> io.BytesIO:
+    """Genera reporte para JEFATURA ACADÉMICA"""
+    return generate_reporte_canalizacion(db, periodo, [DEPARTAMENTO_JEFATURA_ACADEMICA])
@@ -3,20 +3,67 @@ Servicio de lógica de negocio para la gestión de Configuración del Sistema.
 
 Proporciona funciones para obtener y actualizar la configuración singleton
 que controla las etapas del reporte integral de tutorías.
+
+La configuración solo cambia unas cuantas veces por semestre, así que cada
+worker conserva una copia en memoria junto con su `version`. La copia se usa
+sin consultar la BD durante CONFIG_CACHE_TTL_SECONDS; pasado ese tiempo se
+vuelve a leer el registro (una consulta por llave primaria). Cada
+actualización incrementa `version` en la BD, de modo que los demás workers
+ven la nueva etapa con un retraso máximo de CONFIG_CACHE_TTL_SECONDS y una
+lectura lenta nunca reemplaza a una copia más reciente.
 """
 
+import threading
+import time
+from typing import Optional, Tuple
+
 from sqlmodel import Session
 
+from app.core.config import settings
 from app.models.configuracion import ConfiguracionSistema
 from app.schemas.configuracion import ConfiguracionUpdate
 
 CONFIG_ID = 1
 
+# (momento de la última revisión, copia desconectada de la configuración)
+_cache: Optional[Tuple[float, ConfiguracionSistema]] = None
+_cache_lock = threading.Lock()
+
+
+def _guardar_en_cache(config: ConfiguracionSistema) -> ConfiguracionSistema:
+    """Guarda una copia de la configuración si no es más antigua que la cacheada."""
+    global _cache
+
+    copia = ConfiguracionSistema(
+        id=config.id,
+        reporte_integral_etapa=config.reporte_integral_etapa,
+        version=config.version
+    )
+    with _cache_lock:
+        if _cache is None or _cache[1].version <= copia.version:
+            _cache = (time.monotonic(), copia)
+    return copia
+
+
+def _leer_configuracion(db: Session) -> ConfiguracionSistema:
+    """Lee la configuración de la BD, creándola con valores por defecto si no existe."""
+    config = db.get(ConfiguracionSistema, CONFIG_ID, populate_existing=True)
+    
+    if not config:
+        config = ConfiguracionSistema(id=CONFIG_ID, reporte_integral_etapa=1)
+        db.add(config)
+        db.commit()
+        db.refresh(config)
+    
+    return config
+
 
 def get_configuracion(db: Session) -> ConfiguracionSistema:
     """
     Obtiene la configuración del sistema.
     
+    Usa la copia en caché de este worker mientras no hayan pasado
+    CONFIG_CACHE_TTL_SECONDS desde la última lectura; si no, la lee de la BD.
     Si no existe el registro de configuración, lo crea automáticamente
     con valores por defecto (etapa 1).
     
@@ -24,17 +71,16 @@ def get_configuracion(db: Session) -> ConfiguracionSistema:
         db: Sesión de base de datos.
     
     Returns:
-        Instancia de la configuración del sistema.
+        Configuración del sistema (copia desconectada de la sesión; para
+        modificarla usar `update_configuracion`).
     """
-    config = db.get(ConfiguracionSistema, CONFIG_ID)
-    
-    if not config:
-        config = ConfiguracionSistema(id=CONFIG_ID, reporte_integral_etapa=1)
-        db.add(config)
-        db.commit()
-        db.refresh(config)
+    if settings.CONFIG_CACHE_TTL_SECONDS > 0:
+        with _cache_lock:
+            entrada = _cache
+        if entrada is not None and time.monotonic() - entrada[0] < settings.CONFIG_CACHE_TTL_SECONDS:
+            return entrada[1]
     
-    return config
+    return _guardar_en_cache(_leer_configuracion(db))
 
 
 def update_configuracion(db: Session, data: ConfiguracionUpdate) -> ConfiguracionSistema:
@@ -42,19 +88,24 @@ def update_configuracion(db: Session, data: ConfiguracionUpdate) -> Configuracio
     Actualiza la configuración del sistema.
     
     Si no existe el registro de configuración, lo crea antes de actualizarlo.
+    Incrementa `version` en la misma sentencia para que los demás workers
+    detecten el cambio.
     
     Args:
         db: Sesión de base de datos.
         data: Datos de actualización con la nueva etapa del reporte.
     
     Returns:
-        Instancia de la configuración actualizada.
+        Configuración actualizada.
     """
-    config = get_configuracion(db)
+    config = _leer_configuracion(db)
     config.reporte_integral_etapa = data.reporte_integral_etapa
+    # Incremento en SQL: dos actualizaciones simultáneas no pierden versiones
+    config.version = ConfiguracionSistema.version + 1 # type: ignore
     
     db.add(config)
     db.commit()
     db.refresh(config)
     
-    return config
+    return _guardar_en_cache(config)
+
@@ -0,0 +1,162 @@
+"""
+Servicio de exportaciones masivas de reportes.
+
+Genera un archivo ZIP con el Reporte Integral de todos los tutores de un
+periodo. Los PDFs se renderizan en paralelo en el pool de renderizado y el
+ZIP se construye de forma incremental: cada PDF se escribe en el ZIP y se
+envía al cliente en cuanto termina, sin conservar todos los PDFs en memoria.
+El avance se registra en `app.core.jobs` para poder consultarlo mientras
+la descarga está en curso.
+"""
+
+import asyncio
+import zipfile
+from typing import AsyncIterator, Dict, List, Set, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core import jobs, pdf_cache
+from app.core.config import settings
+from app.services import pdf_generator_service
+
+
+class _ChunkWriter:
+    """
+    Destino de escritura para `zipfile` que acumula bytes hasta drenarlos.
+
+    Al no exponer `seek`/`tell`, `zipfile` escribe el ZIP en modo streaming
+    (descriptores de datos después de cada archivo).
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _render_integral(id_tutor: int, periodo: str, alumnos_data: List[Dict]) -> bytes:
+    """
+    Renderiza (o toma de la caché) el PDF integral de un tutor.
+
+    Si la cola de renderizado está llena (503), espera y reintenta en lugar
+    de abortar la exportación completa.
+    """
+    cache_key = pdf_cache.build_key(
+        "integral", alumnos_data, pdf_generator_service.TEMPLATE_PDF_PATH
+    )
+    while True:
+        try:
+            return await pdf_cache.get_or_render(
+                cache_key,
+                [pdf_cache.tag_integral(id_tutor, periodo)],
+                pdf_generator_service.render_integral_report_pdf,
+                alumnos_data
+            )
+        except HTTPException as e:
+            if e.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                raise
+            await asyncio.sleep(settings.RENDER_RETRY_AFTER)
+
+
+async def stream_integral_zip(
+    grupos: List[Tuple[int, str, List[Dict]]],
+    periodo: str,
+    job_id: str
+) -> AsyncIterator[bytes]:
+    """
+    Genera el ZIP de reportes integrales de un periodo como flujo de bytes.
+
+    Args:
+        grupos: Filas agrupadas por tutor (ver `get_integral_report_data_by_periodo`).
+        periodo: Periodo académico.
+        job_id: Trabajo de `app.core.jobs` donde se registra el avance.
+
+    Yields:
+        Fragmentos consecutivos del archivo ZIP.
+    """
+    paralelo = max(1, settings.RENDER_POOL_WORKERS)
+    pendientes = iter(grupos)
+    en_proceso: Set[asyncio.Task] = set()
+    tutor_por_tarea: Dict[asyncio.Task, int] = {}
+    errores: List[str] = []
+    procesados = 0
+
+    def lanzar_siguiente() -> None:
+        siguiente = next(pendientes, None)
+        if siguiente is None:
+            return
+        id_tutor, _, alumnos_data = siguiente
+        tarea = asyncio.create_task(_render_integral(id_tutor, periodo, alumnos_data))
+        en_proceso.add(tarea)
+        tutor_por_tarea[tarea] = id_tutor
+
+    writer = _ChunkWriter()
+    jobs.update_job(job_id, estado=jobs.ESTADO_EN_PROCESO)
+
+    try:
+        with zipfile.ZipFile(writer, mode="w", compression=zipfile.ZIP_STORED) as archivo_zip:
+            for _ in range(paralelo):
+                lanzar_siguiente()
+
+            while en_proceso:
+                terminadas, _ = await asyncio.wait(en_proceso, return_when=asyncio.FIRST_COMPLETED)
+
+                for tarea in terminadas:
+                    en_proceso.discard(tarea)
+                    id_tutor = tutor_por_tarea.pop(tarea)
+                    procesados += 1
+
+                    try:
+                        pdf_bytes = tarea.result()
+                        # Los PDFs ya vienen comprimidos: se almacenan sin recomprimir
+                        archivo_zip.writestr(
+                            f"Reporte_Integral_Tutor_{id_tutor}_{periodo}.pdf", pdf_bytes
+                        )
+                    except Exception as e:
+                        detalle = e.detail if isinstance(e, HTTPException) else str(e)
+                        errores.append(f"Tutor {id_tutor}: {detalle}")
+
+                    lanzar_siguiente()
+
+                jobs.update_job(job_id, procesados=procesados, errores=errores)
+
+                chunk = writer.drain()
+                if chunk:
+                    yield chunk
+
+            if errores:
+                archivo_zip.writestr("ERRORES.txt", "\n".join(errores))
+
+        yield writer.drain()
+
+        jobs.update_job(
+            job_id,
+            estado=jobs.ESTADO_COMPLETADO,
+            procesados=procesados,
+            errores=errores,
+            resultado={"archivos": procesados - len(errores)}
+        )
+
+    except BaseException as e:
+        # Incluye la cancelación cuando el cliente cierra la descarga
+        jobs.update_job(
+            job_id,
+            estado=jobs.ESTADO_ERROR,
+            procesados=procesados,
+            errores=errores + [f"Exportación interrumpida: {type(e).__name__}"]
+        )
+        raise
+
+    finally:
+        for tarea in en_proceso:
+            tarea.cancel()
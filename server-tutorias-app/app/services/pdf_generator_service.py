@@ -7,8 +7,7 @@ y coordenadas predefinidas para posicionamiento de datos.
 """
 
 import io
-import copy
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
@@ -26,9 +25,14 @@ from app.models.reporte1 import Reporte1
 from app.models.reporte2 import Reporte2
 # Importamos ambos servicios de reportes
 from app.services import reporte1_service, reporte2_service
+from app.core import template_cache
 
-from app.core.pdf_coords.coords_pagina1 import coords as coords_p1, REF_W as P1_REF_W, REF_H as P1_REF_H
-from app.core.pdf_coords.coords_pagina2 import coords as coords_p2, REF_W as P2_REF_W, REF_H as P2_REF_H
+from app.core.pdf_coords.compiled import (
+    CompiledLayout,
+    get_layout,
+    LAYOUT_INTEGRAL_P1,
+    LAYOUT_INTEGRAL_P2
+)
 from app.core.pdf_coords.coords_constancia import coords_constancia, REF_W as CONST_REF_W, REF_H as CONST_REF_H
 from app.core.pdf_coords.coords_reporte_g1 import coords as coords_r1, REF_W as R1_REF_W, REF_H as R1_REF_H
 
@@ -39,57 +43,112 @@ TEMPLATE_REPORTE1_PATH = "app/pdf_templates/formato_reporte_g1_new.pdf"
 TEMPLATE_REPORTE2_PATH = "app/pdf_templates/formato_reporte_g1_new.pdf"
 
 
-def _draw_page_overlay(
+def _draw_integral_overlay(
     data_to_draw: List[Dict[str, Any]],
-    coords_definition: Dict[str, Any],
-    is_first_page: bool,
+    layout: CompiledLayout,
+    include_extra: bool,
     base_page_width: float,
-    base_page_height: float,
-    ref_width: float,
-    ref_height: float
+    base_page_height: float
 ) -> PdfReader:
     """
-    Crea un overlay PDF con datos renderizados en coordenadas específicas.
-    """
-    scale_x = base_page_width / ref_width
-    scale_y = base_page_height / ref_height
+    Crea un overlay PDF del Reporte Integral usando un layout precompilado.
     
+    Todas las cadenas se emiten dentro de un único objeto de texto, recorriendo
+    los slots ya escalados sin recalcular coordenadas por página. Se usa
+    `textLine` (en lugar de `drawString`/`textOut`) porque cada slot fija su
+    propio origen y no hace falta medir el ancho del texto.
+    """
     packet = io.BytesIO()
     can = canvas.Canvas(packet, pagesize=(base_page_width, base_page_height))
-    can.setFont("Helvetica", 8)
+    text = can.beginText()
+    text.setFont("Helvetica", 8)
     
-    if is_first_page and "extra" in coords_definition and data_to_draw:
+    if include_extra and data_to_draw:
         extra_data = data_to_draw[0]
-        for field_key, (x, y) in coords_definition["extra"].items():
-            value = extra_data.get(field_key, '')
-            can.drawString(x * scale_x, y * scale_y, str(value))
+        for field_key, x, y in layout.extra:
+            text.setTextOrigin(x, y)
+            text.textLine(str(extra_data.get(field_key, '')))
     
-    num_alumnos_on_page = len(data_to_draw)
-    max_slots_on_page = len(coords_definition.get("alumnos", []))
-    
-    for i in range(min(num_alumnos_on_page, max_slots_on_page)):
-        alumno_data = data_to_draw[i]
-        alumno_coords = coords_definition["alumnos"][i]
-        
-        for field_key, (x, y) in alumno_coords.items():
+    for alumno_data, slot in zip(data_to_draw, layout.slots):
+        for field_key, x, y, is_check in slot:
             value = alumno_data.get(field_key, '')
             
-            if field_key in ["jefatura", "ciencias", "psicologia"]:
+            if is_check:
                 display_value = "✔" if isinstance(value, int) and value > 0 else "✘"
             else:
                 display_value = str(value)
             
-            can.drawString(x * scale_x, y * scale_y, display_value)
+            text.setTextOrigin(x, y)
+            text.textLine(display_value)
     
+    can.drawText(text)
     can.save()
     packet.seek(0)
     
     return PdfReader(packet)
 
 
-def generate_integral_report_pdf(db: Session, id_tutor: int, periodo: str) -> io.BytesIO:
+def warm_up_templates() -> None:
     """
-    Genera el PDF del Reporte Integral para un tutor y periodo específicos.
+    Precarga la plantilla del Reporte Integral y compila sus layouts.
+    
+    Se invoca al iniciar la aplicación para que la primera descarga
+    no pague el costo de parseo y compilación.
+    """
+    template = template_cache.get_template(TEMPLATE_PDF_PATH)
+    
+    if template.num_pages >= 1:
+        get_layout(LAYOUT_INTEGRAL_P1, *template.page_sizes[0])
+    if template.num_pages >= 2:
+        get_layout(LAYOUT_INTEGRAL_P2, *template.page_sizes[1])
+
+
+def _build_integral_row(
+    tutor_full_name: str,
+    periodo: str,
+    alumno: Alumno,
+    reporte: Optional[ReporteIntegral]
+) -> Dict[str, Any]:
+    """
+    Construye la fila plana de un alumno para el Reporte Integral.
+    """
+    report_data = reporte if reporte else {}
+    return {
+        "tutor": tutor_full_name,
+        "departamento": "N/A",
+        "periodo": periodo,
+        "carrera": alumno.carrera,
+        "nombre": f"{alumno.nombre} {alumno.apellido_p} {alumno.apellido_m or ''}".strip(),
+        "grupal": getattr(report_data, 'tutoria_grupal', 0),
+        "individual": getattr(report_data, 'tutoria_individual', 0),
+        "seguimiento1": getattr(report_data, 'seguimiento_1', ''),
+        "seguimiento2": getattr(report_data, 'seguimiento_2', ''),
+        "seguimiento3": getattr(report_data, 'seguimiento_3', ''),
+        "jefatura": getattr(report_data, 'jefatura_academica', 0),
+        "ciencias": getattr(report_data, 'ciencias_basicas', 0),
+        "psicologia": getattr(report_data, 'psicologia', 0),
+        "aprobadas": getattr(report_data, 'materias_aprobadas', 0),
+        "noaprobadas": getattr(report_data, 'materias_no_aprobadas', ''),
+    }
+
+
+def get_integral_report_data(db: Session, id_tutor: int, periodo: str) -> List[Dict[str, Any]]:
+    """
+    Obtiene las filas del Reporte Integral de un tutor y periodo como diccionarios planos.
+    
+    Las filas no contienen objetos ORM, por lo que pueden enviarse a un
+    proceso de renderizado independiente.
+    
+    Args:
+        db: Sesión de base de datos.
+        id_tutor: ID del tutor.
+        periodo: Periodo académico.
+    
+    Returns:
+        Lista de filas (una por alumno) lista para `render_integral_report_pdf`.
+    
+    Raises:
+        HTTPException: Si el tutor no existe o no tiene tutorías en el periodo.
     """
     tutor = db.get(Tutor, id_tutor)
     if not tutor:
@@ -117,84 +176,120 @@ def generate_integral_report_pdf(db: Session, id_tutor: int, periodo: str) -> io
             detail=f"No se encontraron tutorías para el tutor {id_tutor} en el periodo {periodo}."
         )
     
-    alumnos_data_list: List[Dict[str, Any]] = []
-    
-    for tutoria, alumno, reporte in results:
-        report_data = reporte if reporte else {}
-        alumnos_data_list.append({
-            "tutor": tutor_full_name,
-            "departamento": "N/A",
-            "periodo": periodo,
-            "carrera": alumno.carrera,
-            "nombre": f"{alumno.nombre} {alumno.apellido_p} {alumno.apellido_m or ''}".strip(),
-            "grupal": getattr(report_data, 'tutoria_grupal', 0),
-            "individual": getattr(report_data, 'tutoria_individual', 0),
-            "seguimiento1": getattr(report_data, 'seguimiento_1', ''),
-            "seguimiento2": getattr(report_data, 'seguimiento_2', ''),
-            "seguimiento3": getattr(report_data, 'seguimiento_3', ''),
-            "jefatura": getattr(report_data, 'jefatura_academica', 0),
-            "ciencias": getattr(report_data, 'ciencias_basicas', 0),
-            "psicologia": getattr(report_data, 'psicologia', 0),
-            "aprobadas": getattr(report_data, 'materias_aprobadas', 0),
-            "noaprobadas": getattr(report_data, 'materias_no_aprobadas', ''),
-        })
+    alumnos_data_list: List[Dict[str, Any]] = [
+        _build_integral_row(tutor_full_name, periodo, alumno, reporte)
+        for _, alumno, reporte in results
+    ]
     
+    return alumnos_data_list
+
+
+def get_integral_report_data_by_periodo(
+    db: Session,
+    periodo: str
+) -> List[Tuple[int, str, List[Dict[str, Any]]]]:
+    """
+    Obtiene las filas del Reporte Integral de todos los tutores de un periodo.
+    
+    Ejecuta una sola consulta sobre Tutoria/Tutor/Alumno/ReporteIntegral y
+    agrupa las filas por tutor, en el mismo orden que usa
+    `get_integral_report_data` para cada tutor individual.
+    
+    Args:
+        db: Sesión de base de datos.
+        periodo: Periodo académico.
+    
+    Returns:
+        Lista de tuplas (id_tutor, nombre completo del tutor, filas del reporte).
+    
+    Raises:
+        HTTPException: Si no hay tutorías registradas en el periodo.
+    """
+    query = (
+        select(Tutor, Alumno, ReporteIntegral)
+        .join(Tutoria, Tutoria.tutor_id == Tutor.id_tutor) #type: ignore
+        .join(Alumno, Tutoria.alumno_id == Alumno.id_alumno) #type: ignore
+        .outerjoin(ReporteIntegral, Tutoria.id_tutoria == ReporteIntegral.id_tutoria) #type: ignore
+        .where(Tutoria.periodo == periodo)
+        .order_by(Tutor.id_tutor, Alumno.nombre, Alumno.apellido_p, Alumno.apellido_m) #type: ignore
+    )
+    
+    results = db.exec(query).all()
+    
+    if not results:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No se encontraron tutorías en el periodo {periodo}."
+        )
+    
+    grupos: List[Tuple[int, str, List[Dict[str, Any]]]] = []
+    
+    for tutor, alumno, reporte in results:
+        if not grupos or grupos[-1][0] != tutor.id_tutor:
+            tutor_full_name = f"{tutor.nombre} {tutor.apellido_p} {tutor.apellido_m or ''}".strip()
+            grupos.append((tutor.id_tutor, tutor_full_name, [])) #type: ignore
+        
+        grupos[-1][2].append(_build_integral_row(grupos[-1][1], periodo, alumno, reporte))
+    
+    return grupos
+
+
+def render_integral_report_pdf(alumnos_data_list: List[Dict[str, Any]]) -> bytes:
+    """
+    Renderiza el PDF del Reporte Integral a partir de filas ya consultadas.
+    
+    No accede a la base de datos; es seguro ejecutarla en un proceso aparte.
+    
+    Args:
+        alumnos_data_list: Filas obtenidas con `get_integral_report_data`.
+    
+    Returns:
+        Contenido del PDF generado.
+    """
     try:
         writer = PdfWriter()
         
-        reader_p1 = PdfReader(TEMPLATE_PDF_PATH)
-        if not reader_p1.pages:
+        template = template_cache.get_template(TEMPLATE_PDF_PATH)
+        if not template.num_pages:
             raise ValueError("Plantilla PDF vacía.")
         
-        base_page_1 = copy.deepcopy(reader_p1.pages[0])
-        base_w1 = float(base_page_1.mediabox.width)
-        base_h1 = float(base_page_1.mediabox.height)
+        base_page_1 = template.add_page_to(writer, 0)
+        base_w1, base_h1 = template.page_sizes[0]
         
         alumnos_p1 = alumnos_data_list[:11]
         if alumnos_p1:
-            overlay_reader_p1 = _draw_page_overlay(
-                alumnos_p1, coords_p1, True, base_w1, base_h1, P1_REF_W, P1_REF_H
+            layout_p1 = get_layout(LAYOUT_INTEGRAL_P1, base_w1, base_h1)
+            overlay_reader_p1 = _draw_integral_overlay(
+                alumnos_p1, layout_p1, True, base_w1, base_h1
             )
             base_page_1.merge_page(overlay_reader_p1.pages[0])
         
-        writer.add_page(base_page_1)
-        
         alumnos_restantes = alumnos_data_list[11:]
         
         while alumnos_restantes:
-            try:
-                reader_loop = PdfReader(TEMPLATE_PDF_PATH)
-                if len(reader_loop.pages) < 2:
-                    break
-                
-                base_page_n = copy.deepcopy(reader_loop.pages[1])
-            except Exception:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Error procesando plantilla PDF."
-                )
-            
-            base_wn = float(base_page_n.mediabox.width)
-            base_hn = float(base_page_n.mediabox.height)
+            if template.num_pages < 2:
+                break
             
             alumnos_pag = alumnos_restantes[:10]
             if not alumnos_pag:
                 break
             
-            overlay_reader_n = _draw_page_overlay(
-                alumnos_pag, coords_p2, False, base_wn, base_hn, P2_REF_W, P2_REF_H
+            base_page_n = template.add_page_to(writer, 1)
+            base_wn, base_hn = template.page_sizes[1]
+            
+            layout_pn = get_layout(LAYOUT_INTEGRAL_P2, base_wn, base_hn)
+            overlay_reader_n = _draw_integral_overlay(
+                alumnos_pag, layout_pn, False, base_wn, base_hn
             )
             base_page_n.merge_page(overlay_reader_n.pages[0])
-            writer.add_page(base_page_n)
             
             alumnos_restantes = alumnos_restantes[10:]
         
         output_pdf_stream = io.BytesIO()
         writer.write(output_pdf_stream)
-        output_pdf_stream.seek(0)
         writer.close()
         
-        return output_pdf_stream
+        return output_pdf_stream.getvalue()
     
     except FileNotFoundError:
         raise HTTPException(
@@ -208,9 +303,28 @@ def generate_integral_report_pdf(db: Session, id_tutor: int, periodo: str) -> io
         )
 
 
-def generate_constancia_pdf(db: Session, id_alumno: int) -> io.BytesIO:
+
+def generate_integral_report_pdf(db: Session, id_tutor: int, periodo: str) -> io.BytesIO:
     """
-    Genera el PDF de Constancia de Tutorías para un alumno específico.
+    Genera el PDF del Reporte Integral para un tutor y periodo específicos.
+    """
+    alumnos_data_list = get_integral_report_data(db, id_tutor, periodo)
+    return io.BytesIO(render_integral_report_pdf(alumnos_data_list))
+
+
+def get_constancia_data(db: Session, id_alumno: int) -> Dict[str, Any]:
+    """
+    Obtiene los datos a imprimir en la Constancia de Tutorías de un alumno.
+    
+    Args:
+        db: Sesión de base de datos.
+        id_alumno: ID del alumno.
+    
+    Returns:
+        Diccionario plano listo para `render_constancia_pdf`.
+    
+    Raises:
+        HTTPException: Si el alumno no existe o no ha completado la tutoría requerida.
     """
     alumno = db.get(Alumno, id_alumno)
     if not alumno:
@@ -233,15 +347,25 @@ def generate_constancia_pdf(db: Session, id_alumno: int) -> io.BytesIO:
         )
     
     nombre_completo = f"{alumno.nombre} {alumno.apellido_p} {alumno.apellido_m or ''}".strip().upper()
-    data_to_draw = {"nombre_alumno": nombre_completo}
+    return {"nombre_alumno": nombre_completo}
+
+
+def render_constancia_pdf(data_to_draw: Dict[str, Any]) -> bytes:
+    """
+    Renderiza el PDF de la Constancia de Tutorías a partir de datos ya consultados.
+    
+    Args:
+        data_to_draw: Datos obtenidos con `get_constancia_data`.
     
+    Returns:
+        Contenido del PDF generado.
+    """
     try:
-        reader = PdfReader(TEMPLATE_CONSTANCIA_PATH)
+        template = template_cache.get_template(TEMPLATE_CONSTANCIA_PATH)
         writer = PdfWriter()
         
-        base_page = reader.pages[0]
-        base_w = float(base_page.mediabox.width)
-        base_h = float(base_page.mediabox.height)
+        base_page = template.add_page_to(writer, 0)
+        base_w, base_h = template.page_sizes[0]
         
         packet = io.BytesIO()
         can = canvas.Canvas(packet, pagesize=(base_w, base_h))
@@ -260,18 +384,13 @@ def generate_constancia_pdf(db: Session, id_alumno: int) -> io.BytesIO:
         
         overlay_reader = PdfReader(packet)
         base_page.merge_page(overlay_reader.pages[0])
-        writer.add_page(base_page)
         
         output_pdf_stream = io.BytesIO()
         writer.write(output_pdf_stream)
         writer.close()
         overlay_reader.stream.close()
         
-        if hasattr(reader, 'stream') and not reader.stream.closed:
-            reader.stream.close()
-        
-        output_pdf_stream.seek(0)
-        return output_pdf_stream
+        return output_pdf_stream.getvalue()
     
     except FileNotFoundError:
         raise HTTPException(
@@ -285,6 +404,14 @@ def generate_constancia_pdf(db: Session, id_alumno: int) -> io.BytesIO:
         )
 
 
+def generate_constancia_pdf(db: Session, id_alumno: int) -> io.BytesIO:
+    """
+    Genera el PDF de Constancia de Tutorías para un alumno específico.
+    """
+    data_to_draw = get_constancia_data(db, id_alumno)
+    return io.BytesIO(render_constancia_pdf(data_to_draw))
+
+
 def _dividir_texto_por_ancho(
     can: canvas.Canvas,
     texto: str,
@@ -349,13 +476,12 @@ def _draw_multiline_text(
         y -= line_height_pts
 
 
-def generate_reporte1_pdf(db: Session, reporte_id: int) -> io.BytesIO:
+
+def _get_reporte_proyecto_data(reporte: Union[Reporte1, Reporte2]) -> Dict[str, Any]:
     """
-    Genera el PDF del Reporte1 (Avance de Proyecto) para un reporte específico.
+    Convierte un Reporte1/Reporte2 en el diccionario plano que se imprime en el PDF.
     """
-    reporte = reporte1_service.get_reporte1_por_id(db, reporte_id)
-    
-    datos_pdf = {
+    return {
         "profesor": reporte.nombre_tutor,
         "periodo": reporte.periodo,
         "proyecto": reporte.nombre_proyecto,
@@ -368,15 +494,27 @@ def generate_reporte1_pdf(db: Session, reporte_id: int) -> io.BytesIO:
         "observaciones": reporte.observaciones,
         "firma_profesor": reporte.nombre_tutor,
         "firma_jefe": "",
+        "porcentaje_avance": reporte.porcentaje_avance,
     }
+
+
+def _render_reporte_proyecto_pdf(
+    datos_pdf: Dict[str, Any],
+    template_path: str,
+    nombre_reporte: str
+) -> bytes:
+    """
+    Renderiza un reporte de proyecto (Reporte 1 o Reporte 2) sobre su plantilla.
     
+    Ambos reportes comparten formato institucional y coordenadas; solo cambia
+    la plantilla y el nombre usado en los mensajes de error.
+    """
     try:
-        reader = PdfReader(TEMPLATE_REPORTE1_PATH)
+        template = template_cache.get_template(template_path)
         writer = PdfWriter()
         
-        base_page = reader.pages[0]
-        base_w = float(base_page.mediabox.width)
-        base_h = float(base_page.mediabox.height)
+        base_page = template.add_page_to(writer, 0)
+        base_w, base_h = template.page_sizes[0]
         
         packet = io.BytesIO()
         can = canvas.Canvas(packet, pagesize=(base_w, base_h))
@@ -437,7 +575,7 @@ def generate_reporte1_pdf(db: Session, reporte_id: int) -> io.BytesIO:
             scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
         )
         
-        porcentaje_str = str(int(reporte.porcentaje_avance))
+        porcentaje_str = str(int(datos_pdf["porcentaje_avance"]))
         if porcentaje_str in coords_r1["porcentajes"]:
             x_mm, y_mm = coords_r1["porcentajes"][porcentaje_str]
             can.setFont("Helvetica-Bold", 40)
@@ -448,38 +586,75 @@ def generate_reporte1_pdf(db: Session, reporte_id: int) -> io.BytesIO:
         
         overlay_reader = PdfReader(packet)
         base_page.merge_page(overlay_reader.pages[0])
-        writer.add_page(base_page)
         
         output_pdf_stream = io.BytesIO()
         writer.write(output_pdf_stream)
         writer.close()
         overlay_reader.stream.close()
         
-        if hasattr(reader, 'stream') and not reader.stream.closed:
-            reader.stream.close()
-        
-        output_pdf_stream.seek(0)
-        return output_pdf_stream
+        return output_pdf_stream.getvalue()
     
     except FileNotFoundError:
         raise HTTPException(
             status_code=500,
-            detail=f"No se encontró la plantilla de reporte: {TEMPLATE_REPORTE1_PATH}"
+            detail=f"No se encontró la plantilla de reporte: {template_path}"
         )
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Ocurrió un error al generar el Reporte 1: {str(e)}"
+            detail=f"Ocurrió un error al generar el {nombre_reporte}: {str(e)}"
         )
 
 
+def get_reporte1_data(db: Session, reporte_id: int) -> Dict[str, Any]:
+    """
+    Obtiene los datos a imprimir del Reporte1 (Avance de Proyecto).
+    
+    Raises:
+        HTTPException: Si el reporte no existe.
+    """
+    reporte = reporte1_service.get_reporte1_por_id(db, reporte_id)
+    return _get_reporte_proyecto_data(reporte)
+
+
+def render_reporte1_pdf(datos_pdf: Dict[str, Any]) -> bytes:
+    """
+    Renderiza el PDF del Reporte1 a partir de datos ya consultados.
+    """
+    return _render_reporte_proyecto_pdf(datos_pdf, TEMPLATE_REPORTE1_PATH, "Reporte 1")
+
+
+def generate_reporte1_pdf(db: Session, reporte_id: int) -> io.BytesIO:
+    """
+    Genera el PDF del Reporte1 (Avance de Proyecto) para un reporte específico.
+    """
+    return io.BytesIO(render_reporte1_pdf(get_reporte1_data(db, reporte_id)))
+
+
+def get_reporte2_data(db: Session, reporte_id: int) -> Dict[str, Any]:
+    """
+    Obtiene los datos a imprimir del Reporte2 (Final).
+    
+    Raises:
+        HTTPException: Si el reporte no existe.
+    """
+    reporte = reporte2_service.get_reporte2_por_id(db, reporte_id)
+    return _get_reporte_proyecto_data(reporte)
+
+
+def render_reporte2_pdf(datos_pdf: Dict[str, Any]) -> bytes:
+    """
+    Renderiza el PDF del Reporte2 a partir de datos ya consultados.
+    
+    Utiliza la misma plantilla y coordenadas que el Reporte 1.
+    """
+    return _render_reporte_proyecto_pdf(datos_pdf, TEMPLATE_REPORTE2_PATH, "Reporte 2")
+
+
 def generate_reporte2_pdf(db: Session, reporte_id: int) -> io.BytesIO:
     """
     Genera el PDF del Reporte2 (Final) para un reporte específico.
     
-    Utiliza la misma lógica y plantilla que el Reporte 1, pero
-    obteniendo los datos desde la tabla de Reporte2 (Final).
-    
     Args:
         db: Sesión de base de datos.
         reporte_id: ID del Reporte2 a generar.
@@ -490,129 +665,4 @@ def generate_reporte2_pdf(db: Session, reporte_id: int) -> io.BytesIO:
     Raises:
         HTTPException: Si el reporte no existe o hay error en la generación del PDF.
     """
-    # 1. Obtenemos el Reporte 2 usando su servicio
-    reporte = reporte2_service.get_reporte2_por_id(db, reporte_id)
-    
-    # 2. Preparamos los datos (Misma estructura que Reporte 1)
-    datos_pdf = {
-        "profesor": reporte.nombre_tutor,
-        "periodo": reporte.periodo,
-        "proyecto": reporte.nombre_proyecto,
-        "objetivo": reporte.objetivo,
-        "descripcion": reporte.descripcion,
-        "metas": reporte.metas,
-        "actividades": reporte.actividades,
-        "documentos": reporte.documentos_anexados or "",
-        "conclusiones": reporte.conclusiones,
-        "observaciones": reporte.observaciones,
-        "firma_profesor": reporte.nombre_tutor,
-        "firma_jefe": "",
-    }
-    
-    try:
-        # 3. Reutilizamos la misma plantilla del Reporte 1 (o Reporte 2 si la variable es distinta)
-        reader = PdfReader(TEMPLATE_REPORTE2_PATH)
-        writer = PdfWriter()
-        
-        base_page = reader.pages[0]
-        base_w = float(base_page.mediabox.width)
-        base_h = float(base_page.mediabox.height)
-        
-        packet = io.BytesIO()
-        can = canvas.Canvas(packet, pagesize=(base_w, base_h))
-        
-        scale_x = base_w / R1_REF_W
-        scale_y = base_h / R1_REF_H
-        
-        can.setFont("Helvetica", 10)
-        
-        # 4. Dibujar campos simples (Nombre, Periodo, Firmas)
-        campos_simples = ["profesor", "periodo", "proyecto", "firma_profesor", "firma_jefe"]
-        for campo in campos_simples:
-            if campo in coords_r1["campos"]:
-                x_mm, y_mm = coords_r1["campos"][campo]
-                texto = datos_pdf.get(campo, "")
-                can.drawString(x_mm * scale_x, y_mm * scale_y, texto)
-        
-        line_height_mm = 4 * mm
-        
-        # 5. Dibujar campos multilínea (Objetivos, Metas, Actividades...)
-        
-        _draw_multiline_text(
-            can, coords_r1["campos"]["objetivo"], datos_pdf["objetivo"],
-            max_ancho_mm=55*mm, max_lineas=10, line_height_mm=line_height_mm,
-            scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
-        )
-        
-        _draw_multiline_text(
-            can, coords_r1["campos"]["descripcion"], datos_pdf["descripcion"],
-            max_ancho_mm=55*mm, max_lineas=10, line_height_mm=line_height_mm,
-            scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
-        )
-        
-        _draw_multiline_text(
-            can, coords_r1["campos"]["metas"], datos_pdf["metas"],
-            max_ancho_mm=55*mm, max_lineas=10, line_height_mm=line_height_mm,
-            scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
-        )
-        
-        _draw_multiline_text(
-            can, coords_r1["campos"]["actividades"], datos_pdf["actividades"],
-            max_ancho_mm=170*mm, max_lineas=6, line_height_mm=line_height_mm,
-            scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
-        )
-        
-        _draw_multiline_text(
-            can, coords_r1["campos"]["documentos"], datos_pdf["documentos"],
-            max_ancho_mm=170*mm, max_lineas=3, line_height_mm=line_height_mm,
-            scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
-        )
-        
-        _draw_multiline_text(
-            can, coords_r1["campos"]["conclusiones"], datos_pdf["conclusiones"],
-            max_ancho_mm=170*mm, max_lineas=3, line_height_mm=line_height_mm,
-            scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
-        )
-        
-        _draw_multiline_text(
-            can, coords_r1["campos"]["observaciones"], datos_pdf["observaciones"],
-            max_ancho_mm=170*mm, max_lineas=3, line_height_mm=line_height_mm,
-            scale_x=scale_x, scale_y=scale_y, line_height_scale=scale_y
-        )
-        
-        # 6. Dibujar el círculo de porcentaje
-        porcentaje_str = str(int(reporte.porcentaje_avance))
-        if porcentaje_str in coords_r1["porcentajes"]:
-            x_mm, y_mm = coords_r1["porcentajes"][porcentaje_str]
-            can.setFont("Helvetica-Bold", 40)
-            can.drawCentredString(x_mm * scale_x, y_mm * scale_y, "O")
-        
-        # 7. Finalizar y Guardar PDF
-        can.save()
-        packet.seek(0)
-        
-        overlay_reader = PdfReader(packet)
-        base_page.merge_page(overlay_reader.pages[0])
-        writer.add_page(base_page)
-        
-        output_pdf_stream = io.BytesIO()
-        writer.write(output_pdf_stream)
-        writer.close()
-        overlay_reader.stream.close()
-        
-        if hasattr(reader, 'stream') and not reader.stream.closed:
-            reader.stream.close()
-        
-        output_pdf_stream.seek(0)
-        return output_pdf_stream
-    
-    except FileNotFoundError:
-        raise HTTPException(
-            status_code=500,
-            detail=f"No se encontró la plantilla de reporte: {TEMPLATE_REPORTE2_PATH}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Ocurrió un error al generar el Reporte 2: {str(e)}"
-        )
\ No newline at end of file
+    return io.BytesIO(render_reporte2_pdf(get_reporte2_data(db, reporte_id)))
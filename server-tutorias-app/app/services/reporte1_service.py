@@ -11,6 +11,7 @@ from typing import List
 
 from app.models.reporte1 import Reporte1
 from app.schemas.reporte1 import Reporte1Create, Reporte1Update
+from app.core import pdf_cache
 
 
 def create_reporte1(db: Session, data: Reporte1Create, tutor_id: int) -> Reporte1:
@@ -101,6 +102,8 @@ def update_reporte1(db: Session, reporte_existente: Reporte1, data: Reporte1Upda
     db.commit()
     db.refresh(reporte_existente)
     
+    pdf_cache.invalidate(pdf_cache.tag_reporte1(reporte_existente.id))
+    
     return reporte_existente
 
 
@@ -121,4 +124,6 @@ def delete_reporte1(db: Session, reporte_existente: Reporte1) -> dict:
     db.delete(reporte_existente)
     db.commit()
     
+    pdf_cache.invalidate(pdf_cache.tag_reporte1(reporte_existente.id))
+    
     return {"message": f"Reporte {reporte_existente.id} eliminado exitosamente."}
@@ -10,6 +10,7 @@ from typing import List
 
 from app.models.reporte2 import Reporte2
 from app.schemas.reporte2 import Reporte2Create, Reporte2Update
+from app.core import pdf_cache
 
 
 def create_reporte2(db: Session, data: Reporte2Create, tutor_id: int) -> Reporte2:
@@ -73,6 +74,8 @@ def update_reporte2(db: Session, reporte_existente: Reporte2, data: Reporte2Upda
     db.commit()
     db.refresh(reporte_existente)
     
+    pdf_cache.invalidate(pdf_cache.tag_reporte2(reporte_existente.id))
+    
     return reporte_existente
 
 
@@ -83,4 +86,6 @@ def delete_reporte2(db: Session, reporte_existente: Reporte2) -> dict:
     db.delete(reporte_existente)
     db.commit()
     
+    pdf_cache.invalidate(pdf_cache.tag_reporte2(reporte_existente.id))
+    
     return {"message": f"Reporte final {reporte_existente.id} eliminado exitosamente."}
\ No newline at end of file
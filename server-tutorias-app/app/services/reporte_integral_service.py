@@ -5,14 +5,50 @@ Proporciona funciones para operaciones CRUD con validación dinámica basada
 en la etapa de configuración del sistema (filtrado de campos según etapa 1, 2 o 3).
 """
 
+from datetime import datetime, timezone
+from sqlalchemy import case, func, literal
 from sqlmodel import Session, select
 from fastapi import HTTPException, status
 from typing import Optional
 
+from app.database import dialect_insert
+from app.models.configuracion import ConfiguracionSistema
 from app.models.reporte_integral import ReporteIntegral
 from app.models.tutoria import Tutoria
 from app.schemas.reporte_integral import ReporteIntegralCreate, ReporteIntegralUpdate
-from app.services import configuracion_service
+from app.services import configuracion_service, canalizacion_service
+from app.core import pdf_cache
+
+
+def _invalidar_caches(tutoria: Optional[Tutoria]) -> None:
+    """
+    Descarta lo cacheado que depende del reporte de la tutoría: el PDF integral
+    del tutor y los reportes de canalización del periodo.
+    """
+    if tutoria is not None:
+        pdf_cache.invalidate(pdf_cache.tag_integral(tutoria.tutor_id, tutoria.periodo))
+        canalizacion_service.invalidar_cache_periodo(tutoria.periodo)
+
+
+# Campos que se capturan a partir de cada etapa; en etapas anteriores se ignoran
+CAMPOS_POR_ETAPA = {
+    2: {"seguimiento_2"},
+    3: {
+        "seguimiento_3", "tutoria_grupal", "tutoria_individual",
+        "jefatura_academica", "ciencias_basicas", "psicologia",
+        "materias_aprobadas", "materias_no_aprobadas"
+    },
+}
+
+
+def _etapa_actual():
+    """Subconsulta con la etapa configurada (1 si aún no existe la configuración)."""
+    return func.coalesce(
+        select(ConfiguracionSistema.reporte_integral_etapa)
+        .where(ConfiguracionSistema.id == configuracion_service.CONFIG_ID)
+        .scalar_subquery(),
+        1
+    )
 
 
 def create_or_update_reporte(db: Session, data: ReporteIntegralCreate) -> ReporteIntegral:
@@ -25,8 +61,14 @@ def create_or_update_reporte(db: Session, data: ReporteIntegralCreate) -> Report
     - Etapa 2: seguimiento_1 y seguimiento_2
     - Etapa 3: Todos los campos habilitados
     
+    El guardado es una sola sentencia `INSERT ... ON CONFLICT (id_tutoria) DO
+    UPDATE ... RETURNING` que lee la etapa en la propia BD, así que dos
+    guardados simultáneos de la misma tutoría no crean reportes duplicados.
+    Requiere el índice único `uq_reporteintegral_id_tutoria` (ver
+    `utils/create_query_indexes.py`).
+    
     También actualiza la bandera reporte_integral_guardado en la tutoría cuando
-    se completa el reporte en etapa 3.
+    se completa el reporte en etapa 3, en la misma transacción.
     
     Args:
         db: Sesión de base de datos.
@@ -38,57 +80,61 @@ def create_or_update_reporte(db: Session, data: ReporteIntegralCreate) -> Report
     Raises:
         HTTPException: Si la tutoría asociada no existe.
     """
-    config = configuracion_service.get_configuracion(db)
-    etapa_actual = config.reporte_integral_etapa
-    
-    update_data = data.model_dump()
-    
-    campos_etapa_3 = {
-        "seguimiento_3", "tutoria_grupal", "tutoria_individual",
-        "jefatura_academica", "ciencias_basicas", "psicologia",
-        "materias_aprobadas", "materias_no_aprobadas"
-    }
-    
-    campos_etapa_2 = {"seguimiento_2"}
-    
-    if etapa_actual == 1:
-        for key in list(update_data.keys()):
-            if key in campos_etapa_2 or key in campos_etapa_3:
-                update_data.pop(key, None)
-    
-    elif etapa_actual == 2:
-        for key in list(update_data.keys()):
-            if key in campos_etapa_3:
-                update_data.pop(key, None)
-    
+    # El router ya la cargó para validar permisos: normalmente no hay consulta
     tutoria_asociada = db.get(Tutoria, data.id_tutoria)
     
     if not tutoria_asociada:
         raise HTTPException(status_code=404, detail=f"Tutoría {data.id_tutoria} no encontrada.")
     
-    existing_report = db.exec(
-        select(ReporteIntegral).where(ReporteIntegral.id_tutoria == data.id_tutoria)
-    ).first()
-    
-    reporte_resultante: ReporteIntegral
-    
-    if existing_report:
-        for key, value in update_data.items():
-            if key != 'id_tutoria':
-                setattr(existing_report, key, value)
-        db.add(existing_report)
-        reporte_resultante = existing_report
-    else:
-        new_report = ReporteIntegral.model_validate(update_data)
-        db.add(new_report)
-        reporte_resultante = new_report
+    etapa = _etapa_actual()
+    ahora = datetime.now(timezone.utc)
+    
+    valores = data.model_dump()
+    for etapa_minima, campos in CAMPOS_POR_ETAPA.items():
+        for campo in campos:
+            # Fuera de etapa, un reporte nuevo toma el valor por defecto del modelo
+            valores[campo] = case(
+                (etapa >= etapa_minima, literal(valores[campo], ReporteIntegral.__table__.c[campo].type)), # type: ignore
+                else_=literal(ReporteIntegral.model_fields[campo].default, ReporteIntegral.__table__.c[campo].type) # type: ignore
+            )
+    valores["created_at"] = ahora
+    valores["updated_at"] = ahora
+    
+    stmt = dialect_insert(ReporteIntegral).values(**valores)
+    
+    actualizacion = {}
+    for campo in data.model_dump(exclude={"id_tutoria"}):
+        actualizacion[campo] = stmt.excluded[campo]
+    for etapa_minima, campos in CAMPOS_POR_ETAPA.items():
+        for campo in campos:
+            # Fuera de etapa, un reporte existente conserva su valor
+            actualizacion[campo] = case(
+                (etapa >= etapa_minima, stmt.excluded[campo]),
+                else_=ReporteIntegral.__table__.c[campo] # type: ignore
+            )
+    actualizacion["updated_at"] = stmt.excluded["updated_at"]
+    
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReporteIntegral.id_tutoria],
+        set_=actualizacion
+    ).returning(ReporteIntegral, etapa)
+    
+    reporte_resultante, etapa_actual = db.execute(
+        stmt, execution_options={"populate_existing": True}
+    ).one()
     
     if etapa_actual == 3 and not tutoria_asociada.reporte_integral_guardado:
         tutoria_asociada.reporte_integral_guardado = True
         db.add(tutoria_asociada)
     
+    # La respuesta y la invalidación usan los valores ya cargados: se
+    # desconectan para que el commit no los expire y obligue a releerlos
+    db.flush()
+    db.expunge(reporte_resultante)
+    db.expunge(tutoria_asociada)
     db.commit()
-    db.refresh(reporte_resultante)
+    
+    _invalidar_caches(tutoria_asociada)
     
     return reporte_resultante
 
@@ -172,6 +218,8 @@ def update_reporte(
     db.commit()
     db.refresh(reporte_to_update)
     
+    _invalidar_caches(db.get(Tutoria, reporte_to_update.id_tutoria))
+    
     return reporte_to_update
 
 
@@ -209,4 +257,6 @@ def delete_reporte(db: Session, reporte_id: int) -> dict:
     
     db.commit()
     
+    _invalidar_caches(tutoria_asociada)
+    
     return {"message": f"Reporte Integral {reporte_id} eliminado exitosamente."}
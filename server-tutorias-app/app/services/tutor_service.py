@@ -5,11 +5,14 @@ Proporciona funciones para operaciones CRUD, autenticación, gestión de contras
 y búsqueda de tutores por nombre completo.
 """
 
+from typing import Dict, Iterable, Optional
+
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
 
 from app.core.security import get_password_hash, verify_password
-from app.models.tutor import Tutor
+from app.core import principal_cache
+from app.models.tutor import Tutor, normalize_full_name
 from app.schemas.tutor import TutorCreate, TutorUpdate, TutorSetPassword, TutorUpdatePassword
 
 
@@ -22,24 +25,42 @@ def get_tutor_by_email(db: Session, email: str) -> Tutor | None:
 
 def get_tutor_by_full_name_case_insensitive(db: Session, csv_full_name: str) -> Tutor | None:
     """
-    Busca un tutor comparando su nombre completo de forma no sensible a mayúsculas.
+    Busca un tutor por nombre completo sin importar mayúsculas, acentos ni espacios.
+    
+    Usa la columna indexada `nombre_normalizado` (una sola consulta).
     """
-    normalized_csv_name = ' '.join(csv_full_name.upper().split())
-    all_tutores = db.exec(select(Tutor)).all()
+    return db.exec(
+        select(Tutor)
+        .where(Tutor.nombre_normalizado == normalize_full_name(csv_full_name))
+        .order_by(Tutor.id_tutor) # type: ignore
+    ).first()
+
+
+def get_tutor_ids_by_full_names(db: Session, full_names: Iterable[str]) -> Dict[str, Optional[int]]:
+    """
+    Resuelve varios nombres completos a id de tutor con una sola consulta.
     
-    for tutor in all_tutores:
-        db_name_parts = [tutor.nombre, tutor.apellido_p]
-        
-        if tutor.apellido_m:
-            db_name_parts.append(tutor.apellido_m)
-        
-        db_full_name = " ".join(part for part in db_name_parts if part)
-        normalized_db_name = ' '.join(db_full_name.upper().split())
-        
-        if normalized_db_name == normalized_csv_name:
-            return tutor
+    Pensado para procesos por lote (ej. asignaciones de todo un periodo): el
+    mapa resultante se reutiliza en memoria durante todo el proceso.
+    
+    Returns:
+        Diccionario nombre recibido -> id_tutor (None si no existe). Ante
+        nombres repetidos se usa el tutor con menor id, igual que la búsqueda
+        individual.
+    """
+    buscados = {nombre: normalize_full_name(nombre) for nombre in full_names}
+    por_nombre: Dict[str, int] = {}
+    
+    if buscados:
+        filas = db.exec(
+            select(Tutor.nombre_normalizado, Tutor.id_tutor)
+            .where(Tutor.nombre_normalizado.in_(set(buscados.values()))) # type: ignore
+            .order_by(Tutor.id_tutor) # type: ignore
+        )
+        for nombre_normalizado, id_tutor in filas:
+            por_nombre.setdefault(nombre_normalizado, id_tutor)
     
-    return None
+    return {nombre: por_nombre.get(normalizado) for nombre, normalizado in buscados.items()}
 
 
 def create_tutor(db: Session, data: TutorCreate) -> Tutor:
@@ -96,6 +117,8 @@ def update_tutor(db: Session, tutor: Tutor, data: TutorUpdate) -> Tutor:
     db.commit()
     db.refresh(tutor)
     
+    principal_cache.invalidate(principal_cache.TIPO_TUTOR, tutor.id_tutor)
+    
     return tutor
 
 
@@ -114,24 +137,18 @@ def set_permanent_password(db: Session, data: TutorSetPassword) -> dict:
             detail="Este tutor ya tiene una contraseña permanente."
         )
     
-    # --- VALIDACIÓN ROBUSTA (Igual que en Alumnos) ---
-    is_valid = False
-    # 1. Intento Texto Plano (Carga masiva original)
-    if data.contraseña_actual == tutor.contraseña:
-        is_valid = True
-    # 2. Intento Hash (Si un Admin la cambió pero la bandera seguía activa)
-    elif verify_password(data.contraseña_actual, tutor.contraseña):
-        is_valid = True
-        
-    if not is_valid:
+    # La contraseña temporal (carga masiva o reseteo del Admin) siempre está hasheada
+    if not verify_password(data.contraseña_actual, tutor.contraseña):
         raise HTTPException(status_code=401, detail="La contraseña actual es incorrecta.")
     
     hashed_password = get_password_hash(data.nueva_contraseña)
     tutor.contraseña = hashed_password
     tutor.requires_password_change = False
     
+    tutor_id = tutor.id_tutor
     db.add(tutor)
     db.commit()
+    principal_cache.invalidate(principal_cache.TIPO_TUTOR, tutor_id)
     
     return {"message": "Contraseña actualizada exitosamente."}
 
@@ -152,7 +169,9 @@ def change_password(db: Session, tutor: Tutor, data: TutorUpdatePassword) -> dic
     hashed_password = get_password_hash(data.nueva_contraseña)
     tutor.contraseña = hashed_password
     
+    tutor_id = tutor.id_tutor
     db.add(tutor)
     db.commit()
+    principal_cache.invalidate(principal_cache.TIPO_TUTOR, tutor_id)
     
     return {"message": "Su contraseña ha sido actualizada exitosamente."}
\ No newline at end of file
@@ -6,17 +6,72 @@ desde archivos CSV y validación de reglas de negocio de tutorías.
 """
 
 from fastapi import HTTPException, status, UploadFile
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 from sqlmodel import Session, select
 import pandas as pd
+from datetime import datetime, timezone
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
-from typing import Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from app.core.config import settings
 from app.models.tutoria import Tutoria, EstadoTutoria
 from app.schemas.tutoria import TutoriaCreate, TutoriaUpdate
 from app.models.alumno import Alumno
 from app.models.tutor import Tutor
 from . import tutor_service
-from . import alumno_service
+
+
+# Máximo de valores por consulta IN al procesar archivos de asignación
+_LOTE_CONSULTA = 1000
+
+
+def opciones_detalle(alumno_unido: bool = False) -> List[Any]:
+    """
+    Opciones de carga para serializar tutorías con alumno y tutor
+    (`TutoriaReadWithDetails`) sin consultas perezosas por fila.
+    
+    El alumno se carga en la misma consulta (JOIN) y los tutores con un solo
+    `SELECT ... IN` para todas las filas; los tutores que ya están en la
+    sesión (ej. el tutor autenticado) no se vuelven a consultar.
+    
+    Args:
+        alumno_unido: True si la consulta ya hace JOIN con Alumno (ej. para
+            filtrar); se reutiliza ese JOIN en lugar de agregar otro.
+    
+    Returns:
+        Lista de opciones para `select(Tutoria).options(...)`.
+    """
+    return [
+        contains_eager(Tutoria.alumno) if alumno_unido else joinedload(Tutoria.alumno), # type: ignore
+        selectinload(Tutoria.tutor), # type: ignore
+    ]
+
+
+def get_tutoria_detalle(db: Session, id_tutoria: int) -> Optional[Tutoria]:
+    """Obtiene una tutoría con su alumno y tutor cargados (ver `opciones_detalle`)."""
+    return db.exec(
+        select(Tutoria).where(Tutoria.id_tutoria == id_tutoria).options(*opciones_detalle())
+    ).first()
+
+
+def _commit_tutoria(db: Session, tutoria: Tutoria) -> None:
+    """
+    Confirma la tutoría; el índice único (alumno_id, periodo) rechaza el
+    duplicado si otra petición asignó el mismo periodo al mismo tiempo.
+    """
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El alumno ya tiene una tutoría asignada para el periodo '{tutoria.periodo}'."
+        )
 
 
 def create_tutoria(db: Session, data: TutoriaCreate) -> Tutoria:
@@ -80,7 +135,7 @@ def create_tutoria(db: Session, data: TutoriaCreate) -> Tutoria:
     
     tutoria = Tutoria.model_validate(data.model_dump())
     db.add(tutoria)
-    db.commit()
+    _commit_tutoria(db, tutoria)
     db.refresh(tutoria)
     
     return tutoria
@@ -118,12 +173,183 @@ def update_tutoria(db: Session, tutoria: Tutoria, data: TutoriaUpdate) -> Tutori
         setattr(tutoria, key, value)
     
     db.add(tutoria)
-    db.commit()
+    _commit_tutoria(db, tutoria)
     db.refresh(tutoria)
     
     return tutoria
 
 
+def _leer_asignacion(content_bytes: bytes) -> Tuple[str, str, Optional["pd.Series[str]"]]:
+    """
+    Lee un CSV de asignación.
+    
+    Returns:
+        Tupla (periodo, nombre del tutor, números de control por fila). Los
+        números de control son None si el archivo no trae tabla de alumnos.
+    
+    Raises:
+        HTTPException: 400 si la metadata o la tabla no tienen el formato esperado.
+    """
+    content_str = content_bytes.decode('latin1')
+    file_stream = StringIO(content_str)
+    
+    file_stream.seek(0)
+    metadata_df = pd.read_csv(file_stream, header=None, nrows=9, encoding='latin1')
+    
+    try:
+        periodo_raw = metadata_df.iloc[6, 0]
+        periodo = str(periodo_raw).replace("PERIODO ", "").strip()
+        
+        tutor_name_raw = metadata_df.iloc[7, 0]
+        tutor_full_name = str(tutor_name_raw).replace("DOCENTE ", "").strip()
+    except (IndexError, AttributeError):
+        raise HTTPException(
+            status_code=400,
+            detail="Error al leer la metadata del CSV. Formato inesperado."
+        )
+    
+    file_stream.seek(0)
+    
+    try:
+        students_df = pd.read_csv(
+            file_stream,
+            skiprows=9,
+            encoding='latin1',
+            dtype={'NoControl': str}
+        )
+    except pd.errors.EmptyDataError:
+        return periodo, tutor_full_name, None
+    
+    if 'NoControl' not in students_df.columns:
+        raise HTTPException(
+            status_code=400,
+            detail="Columna 'NoControl' no encontrada en la tabla de alumnos del CSV."
+        )
+    
+    return periodo, tutor_full_name, students_df['NoControl'].astype("string").str.strip()
+
+
+def _claves_validas(num_controls: "pd.Series[str]") -> List[str]:
+    return num_controls[num_controls.notna() & (num_controls != "")].unique().tolist()
+
+
+def _buscar_alumnos(db: Session, claves: List[str]) -> Dict[str, Tuple[int, int]]:
+    """Resuelve números de control a (id_alumno, semestre_actual) con una consulta IN por lote."""
+    alumnos: Dict[str, Tuple[int, int]] = {}
+    for inicio in range(0, len(claves), _LOTE_CONSULTA):
+        filas = db.exec(
+            select(Alumno.num_control, Alumno.id_alumno, Alumno.semestre_actual)
+            .where(Alumno.num_control.in_(claves[inicio:inicio + _LOTE_CONSULTA])) # type: ignore
+        )
+        for num_control, id_alumno, semestre in filas:
+            alumnos[num_control] = (id_alumno, semestre)
+    return alumnos
+
+
+def _alumnos_con_tutoria(db: Session, periodo: str, ids_alumnos: List[int]) -> Set[int]:
+    """Alumnos (de `ids_alumnos`) que ya tienen tutoría en el periodo."""
+    con_tutoria: Set[int] = set()
+    for inicio in range(0, len(ids_alumnos), _LOTE_CONSULTA):
+        con_tutoria.update(db.exec(
+            select(Tutoria.alumno_id).where(
+                Tutoria.periodo == periodo,
+                Tutoria.alumno_id.in_(ids_alumnos[inicio:inicio + _LOTE_CONSULTA]) # type: ignore
+            )
+        ).all())
+    return con_tutoria
+
+
+def _preparar_tutorias(
+    num_controls: "pd.Series[str]",
+    periodo: str,
+    id_tutor: int,
+    alumnos: Dict[str, Tuple[int, int]],
+    con_tutoria: Set[int],
+    ahora: datetime
+) -> Tuple[List[Dict[str, Any]], List[str], int]:
+    """
+    Arma las tutorías nuevas de un archivo, fila por fila.
+    
+    `con_tutoria` se actualiza con los alumnos asignados, de modo que un alumno
+    repetido (en el mismo archivo o en otro del mismo lote) se reporta como
+    que ya tiene tutoría.
+    
+    Returns:
+        Tupla (tutorías a insertar, errores por fila, alumnos no encontrados).
+    """
+    nuevas_tutorias: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    skipped_alumnos_not_found = 0
+    
+    for index, num_control in num_controls.items():
+        current_row_number = int(index) + 11 #type:ignore
+        
+        if pd.isna(num_control) or not num_control:
+            errors.append(f"Fila {current_row_number}: Número de control vacío.")
+            continue
+        
+        alumno = alumnos.get(num_control)
+        
+        if not alumno:
+            skipped_alumnos_not_found += 1
+            errors.append(
+                f"Fila {current_row_number}: Alumno con NoControl '{num_control}' no encontrado."
+            )
+            continue
+        
+        id_alumno, semestre = alumno
+        
+        if id_alumno in con_tutoria:
+            errors.append(
+                f"Fila {current_row_number}: Alumno '{num_control}' ya tiene tutoría "
+                f"para el periodo '{periodo}'."
+            )
+            continue
+        
+        con_tutoria.add(id_alumno)
+        nuevas_tutorias.append({
+            "alumno_id": id_alumno,
+            "tutor_id": id_tutor,
+            "periodo": periodo,
+            "semestre": semestre,
+            "estado": EstadoTutoria.PENDIENTE,
+            "reporte_integral_guardado": False,
+            "created_at": ahora,
+            "updated_at": ahora,
+        })
+    
+    return nuevas_tutorias, errors, skipped_alumnos_not_found
+
+
+def _insertar_tutorias(db: Session, nuevas_tutorias: List[Dict[str, Any]]) -> None:
+    for inicio in range(0, len(nuevas_tutorias), _LOTE_CONSULTA):
+        db.execute(insert(Tutoria), nuevas_tutorias[inicio:inicio + _LOTE_CONSULTA])
+
+
+def _resumen_archivo(
+    filename: Optional[str],
+    tutor_full_name: str,
+    periodo: str,
+    total_filas: int,
+    processed_count: int,
+    skipped_alumnos_not_found: int,
+    errors: List[str]
+) -> dict:
+    summary = {
+        "message": f"Archivo '{filename}' procesado.",
+        "tutor_asignado": tutor_full_name,
+        "periodo": periodo,
+        "nuevas_tutorias_creadas": processed_count,
+        "alumnos_no_encontrados": skipped_alumnos_not_found,
+        "filas_csv_ignoradas": total_filas - processed_count - skipped_alumnos_not_found
+    }
+    
+    if errors:
+        summary["detalles_saltados_o_errores"] = errors
+    
+    return summary
+
+
 def process_assignment_csv(db: Session, file: UploadFile) -> dict:
     """
     Procesa un archivo CSV de asignación de tutorías y crea registros masivos.
@@ -147,138 +373,240 @@ def process_assignment_csv(db: Session, file: UploadFile) -> dict:
     Raises:
         HTTPException: Si hay errores de formato, el tutor no existe o error de procesamiento.
     """
-    processed_count = 0
-    skipped_alumnos_not_found = 0
-    errors = []
-    
     try:
-        content_bytes = file.file.read()
-        content_str = content_bytes.decode('latin1')
-        file_stream = StringIO(content_str)
-        
-        file_stream.seek(0)
-        metadata_df = pd.read_csv(file_stream, header=None, nrows=9, encoding='latin1')
-        
-        try:
-            periodo_raw = metadata_df.iloc[6, 0]
-            periodo = str(periodo_raw).replace("PERIODO ", "").strip()
-            
-            tutor_name_raw = metadata_df.iloc[7, 0]
-            tutor_full_name = str(tutor_name_raw).replace("DOCENTE ", "").strip()
-        except (IndexError, AttributeError):
-            raise HTTPException(
-                status_code=400,
-                detail="Error al leer la metadata del CSV. Formato inesperado."
-            )
+        periodo, tutor_full_name, num_controls = _leer_asignacion(file.file.read())
         
         tutor = tutor_service.get_tutor_by_full_name_case_insensitive(db, tutor_full_name)
         
-        if not tutor:
+        if not tutor or tutor.id_tutor is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Tutor '{tutor_full_name}' no encontrado en la base de datos."
             )
         
-        file_stream.seek(0)
-        
-        try:
-            students_df = pd.read_csv(
-                file_stream,
-                skiprows=9,
-                encoding='latin1',
-                dtype={'NoControl': str}
-            )
-        except pd.errors.EmptyDataError:
+        if num_controls is None:
             return {
                 "message": f"Archivo '{file.filename}' procesado. No se encontraron alumnos.",
                 "nuevas_tutorias_creadas": 0,
                 "alumnos_no_encontrados": 0
             }
-        except KeyError:
-            raise HTTPException(
-                status_code=400,
-                detail="Columna 'NoControl' no encontrada en la tabla de alumnos del CSV."
-            )
         
-        for index, row in students_df.iterrows():
-            current_row_number = int(index) + 11 #type:ignore
-            
-            if pd.isna(row['NoControl']) or not str(row['NoControl']).strip():
-                errors.append(f"Fila {current_row_number}: Número de control vacío.")
+        # Alumnos del archivo y los que ya tienen tutoría en el periodo (una consulta IN por lote)
+        alumnos = _buscar_alumnos(db, _claves_validas(num_controls))
+        con_tutoria = _alumnos_con_tutoria(db, periodo, [id_alumno for id_alumno, _ in alumnos.values()])
+        
+        nuevas_tutorias, errors, skipped_alumnos_not_found = _preparar_tutorias(
+            num_controls, periodo, tutor.id_tutor, alumnos, con_tutoria, datetime.now(timezone.utc)
+        )
+        
+        _insertar_tutorias(db, nuevas_tutorias)
+        db.commit()
+        
+        return _resumen_archivo(
+            file.filename, tutor_full_name, periodo, len(num_controls),
+            len(nuevas_tutorias), skipped_alumnos_not_found, errors
+        )
+    
+    except HTTPException as http_exc:
+        db.rollback()
+        raise http_exc
+    
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error inesperado al procesar el archivo '{file.filename}'."
+        )
+
+
+# Errores de `zipfile` al abrir un ZIP o extraer un miembro: dañado o truncado
+# (BadZipFile, EOFError, zlib.error), cifrado (RuntimeError) o con un método de
+# compresión no soportado (NotImplementedError)
+_ERRORES_ZIP = (zipfile.BadZipFile, RuntimeError, NotImplementedError, EOFError, zlib.error)
+
+
+def _expandir_archivos(files: List[UploadFile]) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Obtiene los CSV de una carga por lote, extrayendo el contenido de los ZIP.
+    
+    Un ZIP ilegible se reporta como un solo archivo omitido; un CSV del ZIP
+    que no se puede extraer (cifrado, dañado o con un método de compresión no
+    soportado) se omite sin afectar a los demás CSV del mismo ZIP.
+    
+    Returns:
+        Lista de (nombre, contenido, error). Si el archivo no se pudo leer, el
+        contenido es None y el error describe el motivo.
+    """
+    archivos: List[Tuple[str, Optional[bytes], Optional[str]]] = []
+    
+    for file in files:
+        nombre = file.filename or "archivo"
+        
+        if nombre.lower().endswith(".csv"):
+            archivos.append((nombre, file.file.read(), None))
+            continue
+        
+        if not nombre.lower().endswith(".zip"):
+            archivos.append((nombre, None, "Se requiere un archivo CSV o ZIP."))
+            continue
+        
+        try:
+            with zipfile.ZipFile(file.file) as archivo_zip:
+                miembros = [
+                    info for info in archivo_zip.infolist()
+                    if not info.is_dir()
+                    and info.filename.lower().endswith(".csv")
+                    and not info.filename.startswith("__MACOSX/")
+                ]
+                
+                if sum(info.file_size for info in miembros) > settings.ASSIGNMENT_ZIP_MAX_BYTES:
+                    archivos.append((nombre, None, "El ZIP excede el tamaño máximo permitido."))
+                    continue
+                
+                for info in sorted(miembros, key=lambda i: i.filename):
+                    nombre_miembro = f"{nombre}/{info.filename}"
+                    try:
+                        archivos.append((nombre_miembro, archivo_zip.read(info), None))
+                    except _ERRORES_ZIP:
+                        archivos.append((
+                            nombre_miembro, None,
+                            "No se pudo extraer el archivo del ZIP (cifrado, dañado o con compresión no soportada)."
+                        ))
+        except _ERRORES_ZIP:
+            archivos.append((nombre, None, "El archivo ZIP está dañado o no es válido."))
+    
+    return archivos
+
+
+def _leer_asignacion_segura(content_bytes: bytes) -> Tuple[Optional[Tuple[str, str, Optional["pd.Series[str]"]]], Optional[str]]:
+    """Versión de `_leer_asignacion` que devuelve el error en lugar de levantarlo."""
+    try:
+        return _leer_asignacion(content_bytes), None
+    except HTTPException as e:
+        return None, str(e.detail)
+    except Exception:
+        return None, "Error inesperado al leer el archivo."
+
+
+def process_assignment_batch(db: Session, files: List[UploadFile]) -> dict:
+    """
+    Procesa en una sola operación varios CSV de asignación (sueltos o dentro de ZIPs).
+    
+    Los archivos se leen en paralelo; tutores, alumnos y tutorías existentes se
+    resuelven con consultas compartidas por todo el lote y las tutorías nuevas
+    se insertan en una sola transacción. Un archivo con formato inválido o
+    tutor inexistente se reporta y se omite sin afectar a los demás.
+    
+    Args:
+        db: Sesión de base de datos.
+        files: Archivos CSV y/o ZIP con CSVs de asignación.
+    
+    Returns:
+        Totales del lote y el resumen de cada archivo (mismo formato que
+        `process_assignment_csv`, o `error` si el archivo se omitió).
+    
+    Raises:
+        HTTPException: 400 si el lote no contiene archivos CSV; 500 ante un
+            error inesperado (no se aplica ningún cambio).
+    """
+    archivos = _expandir_archivos(files)
+    
+    if not archivos:
+        raise HTTPException(status_code=400, detail="El lote no contiene archivos CSV.")
+    
+    por_leer = [(i, contenido) for i, (_, contenido, error) in enumerate(archivos) if error is None]
+    leidos: Dict[int, Tuple[Optional[Tuple[str, str, Optional["pd.Series[str]"]]], Optional[str]]] = {}
+    
+    if por_leer:
+        workers = max(1, min(settings.ASSIGNMENT_PARSE_WORKERS, len(por_leer)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asignacion") as pool:
+            resultados = pool.map(_leer_asignacion_segura, [contenido for _, contenido in por_leer])
+            leidos = {i: resultado for (i, _), resultado in zip(por_leer, resultados)}
+    
+    try:
+        tutores = tutor_service.get_tutor_ids_by_full_names(
+            db, {datos[1] for datos, _ in leidos.values() if datos is not None}
+        )
+        
+        # Alumnos de todo el lote y, por periodo, los que ya tienen tutoría
+        claves: Set[str] = set()
+        claves_por_periodo: Dict[str, Set[str]] = {}
+        for datos, _ in leidos.values():
+            if datos is None or datos[2] is None:
                 continue
+            claves_archivo = _claves_validas(datos[2])
+            claves.update(claves_archivo)
+            claves_por_periodo.setdefault(datos[0], set()).update(claves_archivo)
+        
+        alumnos = _buscar_alumnos(db, sorted(claves))
+        con_tutoria: Dict[str, Set[int]] = {
+            periodo: _alumnos_con_tutoria(
+                db, periodo, [alumnos[c][0] for c in claves_periodo if c in alumnos]
+            )
+            for periodo, claves_periodo in claves_por_periodo.items()
+        }
+        
+        ahora = datetime.now(timezone.utc)
+        nuevas_tutorias: List[Dict[str, Any]] = []
+        resumenes: List[dict] = []
+        
+        for i, (nombre, _, error) in enumerate(archivos):
+            datos, error = leidos.get(i, (None, error))
             
-            num_control = str(row['NoControl']).strip()
-            alumno = alumno_service.get_alumno_by_num_control(db, num_control)
-            
-            if not alumno:
-                skipped_alumnos_not_found += 1
-                errors.append(
-                    f"Fila {current_row_number}: Alumno con NoControl '{num_control}' no encontrado."
-                )
+            if datos is None:
+                resumenes.append({"archivo": nombre, "error": error})
                 continue
             
-            existing_tutoria: Optional[Tutoria] = db.exec(
-                select(Tutoria).where(
-                    Tutoria.alumno_id == alumno.id_alumno,
-                    Tutoria.periodo == periodo
-                )
-            ).first()
+            periodo, tutor_full_name, num_controls = datos
+            id_tutor = tutores.get(tutor_full_name)
             
-            if existing_tutoria:
-                errors.append(
-                    f"Fila {current_row_number}: Alumno '{num_control}' ya tiene tutoría "
-                    f"para el periodo '{periodo}'."
-                )
+            if id_tutor is None:
+                resumenes.append({
+                    "archivo": nombre,
+                    "error": f"Tutor '{tutor_full_name}' no encontrado en la base de datos."
+                })
                 continue
             
-            if tutor.id_tutor is None:
-                errors.append(
-                    f"Error interno: ID del tutor '{tutor_full_name}' no encontrado "
-                    f"después de la búsqueda."
-                )
+            if num_controls is None:
+                resumenes.append({
+                    "archivo": nombre,
+                    "message": f"Archivo '{nombre}' procesado. No se encontraron alumnos.",
+                    "nuevas_tutorias_creadas": 0,
+                    "alumnos_no_encontrados": 0
+                })
                 continue
             
-            if alumno.id_alumno is None:
-                errors.append(
-                    f"Error interno: ID del alumno '{num_control}' no encontrado "
-                    f"después de la búsqueda."
-                )
-                continue
-            
-            nueva_tutoria = Tutoria(
-                alumno_id=alumno.id_alumno,
-                tutor_id=tutor.id_tutor,
-                periodo=periodo,
-                semestre=alumno.semestre_actual,
-                estado=EstadoTutoria.PENDIENTE
+            nuevas, errors, skipped_alumnos_not_found = _preparar_tutorias(
+                num_controls, periodo, id_tutor, alumnos,
+                con_tutoria.setdefault(periodo, set()), ahora
             )
-            
-            db.add(nueva_tutoria)
-            processed_count += 1
+            nuevas_tutorias.extend(nuevas)
+            resumenes.append({
+                "archivo": nombre,
+                **_resumen_archivo(
+                    nombre, tutor_full_name, periodo, len(num_controls),
+                    len(nuevas), skipped_alumnos_not_found, errors
+                )
+            })
         
+        _insertar_tutorias(db, nuevas_tutorias)
         db.commit()
-        
-        summary = {
-            "message": f"Archivo '{file.filename}' procesado.",
-            "tutor_asignado": tutor_full_name,
-            "periodo": periodo,
-            "nuevas_tutorias_creadas": processed_count,
-            "alumnos_no_encontrados": skipped_alumnos_not_found,
-            "filas_csv_ignoradas": len(students_df) - processed_count - skipped_alumnos_not_found
-        }
-        
-        if errors:
-            summary["detalles_saltados_o_errores"] = errors
-        
-        return summary
-    
-    except HTTPException as http_exc:
-        db.rollback()
-        raise http_exc
     
     except Exception as e:
         db.rollback()
+        print(f"❌ Error al procesar el lote de asignaciones: {e}")
         raise HTTPException(
             status_code=500,
-            detail=f"Error inesperado al procesar el archivo '{file.filename}'."
+            detail="Error inesperado al procesar el lote de asignaciones. No se aplicó ningún cambio."
         )
+    
+    omitidos = sum(1 for resumen in resumenes if "error" in resumen)
+    
+    return {
+        "message": f"Lote procesado: {len(resumenes) - omitidos} archivo(s) aplicados, {omitidos} omitido(s).",
+        "archivos_procesados": len(resumenes) - omitidos,
+        "archivos_omitidos": omitidos,
+        "nuevas_tutorias_creadas": len(nuevas_tutorias),
+        "alumnos_no_encontrados": sum(r.get("alumnos_no_encontrados", 0) for r in resumenes),
+        "archivos": resumenes
+    }
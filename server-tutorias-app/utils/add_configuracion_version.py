@@ -0,0 +1,48 @@
+# add_configuracion_version.py
+"""
+Migración: agrega la columna `configuracionsistema.version`.
+
+Cada worker conserva en caché la configuración del sistema y la compara por
+versión (ver `app.services.configuracion_service`). `create_all` no agrega
+columnas a tablas existentes, así que este script debe ejecutarse una vez
+ANTES de desplegar el cambio. Si la columna ya existe no hace nada; se puede
+ejecutar varias veces sin efecto adicional.
+
+Uso:
+    python utils/add_configuracion_version.py
+"""
+import sys
+import os
+from sqlalchemy import inspect, text
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+
+
+def add_configuracion_version():
+    print("--- Agregando versión a la configuración del sistema ---")
+
+    inspector = inspect(engine)
+    if not inspector.has_table("configuracionsistema"):
+        print("✅ La tabla configuracionsistema no existe; se creará completa al iniciar la app.")
+        return
+
+    columnas = {columna["name"] for columna in inspector.get_columns("configuracionsistema")}
+    if "version" in columnas:
+        print("✅ La columna configuracionsistema.version ya existe.")
+        return
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "ALTER TABLE configuracionsistema ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+            ))
+    except Exception as e:
+        print(f"🔴 ERROR al crear la columna: {e}")
+        return
+
+    print("✅ Columna configuracionsistema.version creada.")
+
+
+if __name__ == "__main__":
+    add_configuracion_version()
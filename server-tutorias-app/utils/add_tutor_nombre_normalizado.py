@@ -0,0 +1,83 @@
+# add_tutor_nombre_normalizado.py
+"""
+Migración: agrega y llena la columna indexada `tutor.nombre_normalizado`.
+
+La búsqueda de tutores por nombre (asignaciones desde CSV) usa esta columna en
+lugar de recorrer todos los tutores. `create_all` no agrega columnas a tablas
+existentes, así que este script debe ejecutarse una vez ANTES de desplegar el
+cambio. Crea la columna y el índice si no existen y recalcula el valor de los
+tutores cuyo nombre normalizado falta o está desactualizado; se puede ejecutar
+varias veces sin efecto adicional.
+
+Uso:
+    python utils/add_tutor_nombre_normalizado.py
+"""
+import sys
+import os
+import time
+from sqlalchemy import inspect, text
+from sqlmodel import Session
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+from app.models.tutor import normalize_full_name
+
+
+def _crear_columna() -> None:
+    columnas = {columna["name"] for columna in inspect(engine).get_columns("tutor")}
+
+    with engine.begin() as conn:
+        if "nombre_normalizado" not in columnas:
+            conn.execute(text("ALTER TABLE tutor ADD COLUMN nombre_normalizado VARCHAR(310)"))
+            print("✅ Columna tutor.nombre_normalizado creada.")
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_tutor_nombre_normalizado ON tutor (nombre_normalizado)"
+        ))
+
+
+def _llenar_columna(session: Session) -> int:
+    # Consulta de columnas: el modelo completo no se puede cargar hasta que exista la columna
+    filas = session.execute(text(
+        "SELECT id_tutor, nombre, apellido_p, apellido_m, nombre_normalizado FROM tutor"
+    )).all()
+
+    cambios = []
+    for id_tutor, nombre, apellido_p, apellido_m, actual in filas:
+        nombre_completo = " ".join(part for part in (nombre, apellido_p, apellido_m) if part)
+        normalizado = normalize_full_name(nombre_completo)
+        if normalizado != actual:
+            cambios.append({"id_tutor": id_tutor, "nombre_normalizado": normalizado})
+
+    if cambios:
+        session.execute(
+            text("UPDATE tutor SET nombre_normalizado = :nombre_normalizado WHERE id_tutor = :id_tutor"),
+            cambios
+        )
+    return len(cambios)
+
+
+def add_tutor_nombre_normalizado():
+    print("--- Normalizando nombres de tutores ---")
+    inicio = time.perf_counter()
+
+    try:
+        _crear_columna()
+    except Exception as e:
+        print(f"🔴 ERROR al crear la columna: {e}")
+        return
+
+    with Session(engine) as session:
+        try:
+            actualizados = _llenar_columna(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"🔴 ERROR durante la migración: {e}")
+            return
+
+    print(f"✅ Tutores actualizados: {actualizados}")
+    print(f"⏱️  Tiempo: {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    add_tutor_nombre_normalizado()
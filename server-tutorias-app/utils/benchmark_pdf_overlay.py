@@ -0,0 +1,113 @@
+# benchmark_pdf_overlay.py
+"""
+Micro-benchmark del overlay del Reporte Integral.
+
+Compara, por página, el recorrido original de los diccionarios de coordenadas
+(escalando cada slot en cada página) contra los layouts precompilados, y mide
+también el costo completo de una página (overlay + merge sobre la plantilla).
+
+Uso:
+    python utils/benchmark_pdf_overlay.py [iteraciones]
+"""
+import sys
+import os
+import io
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab.pdfgen import canvas
+from pypdf import PdfReader, PdfWriter
+
+from app.core import template_cache
+from app.core.pdf_coords.coords_pagina1 import coords as coords_p1, REF_W as P1_REF_W, REF_H as P1_REF_H
+from app.core.pdf_coords.coords_pagina2 import coords as coords_p2, REF_W as P2_REF_W, REF_H as P2_REF_H
+from app.core.pdf_coords.compiled import get_layout, LAYOUT_INTEGRAL_P1, LAYOUT_INTEGRAL_P2
+from app.services.pdf_generator_service import TEMPLATE_PDF_PATH, _draw_integral_overlay
+
+
+def _fila_falsa(i: int) -> dict:
+    return {
+        "tutor": "Tutor de Prueba",
+        "departamento": "N/A",
+        "periodo": "22025",
+        "carrera": "Ingeniería en Sistemas Computacionales",
+        "nombre": f"Alumno de Prueba Número {i}",
+        "grupal": 10,
+        "individual": 3,
+        "seguimiento1": "OK",
+        "seguimiento2": "OK",
+        "seguimiento3": "OK",
+        "jefatura": i % 2,
+        "ciencias": 0,
+        "psicologia": 1,
+        "aprobadas": 7,
+        "noaprobadas": "Ninguna",
+    }
+
+
+def _overlay_referencia(data_to_draw, coords_definition, is_first_page, w, h, ref_w, ref_h) -> PdfReader:
+    """Implementación original: escala y recorre los diccionarios en cada página."""
+    scale_x = w / ref_w
+    scale_y = h / ref_h
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet, pagesize=(w, h))
+    can.setFont("Helvetica", 8)
+
+    if is_first_page and "extra" in coords_definition and data_to_draw:
+        for field_key, (x, y) in coords_definition["extra"].items():
+            can.drawString(x * scale_x, y * scale_y, str(data_to_draw[0].get(field_key, '')))
+
+    for i in range(min(len(data_to_draw), len(coords_definition.get("alumnos", [])))):
+        for field_key, (x, y) in coords_definition["alumnos"][i].items():
+            value = data_to_draw[i].get(field_key, '')
+            if field_key in ["jefatura", "ciencias", "psicologia"]:
+                display_value = "✔" if isinstance(value, int) and value > 0 else "✘"
+            else:
+                display_value = str(value)
+            can.drawString(x * scale_x, y * scale_y, display_value)
+
+    can.save()
+    packet.seek(0)
+    return PdfReader(packet)
+
+
+def _medir(nombre: str, iteraciones: int, fn) -> None:
+    fn()  # calentamiento
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        fn()
+    ms_por_pagina = (time.perf_counter() - inicio) * 1000 / iteraciones
+    print(f"{nombre:<45} {ms_por_pagina:8.3f} ms/página")
+
+
+def run(iteraciones: int) -> None:
+    template = template_cache.get_template(TEMPLATE_PDF_PATH)
+    w1, h1 = template.page_sizes[0]
+    wn, hn = template.page_sizes[1]
+    layout_p1 = get_layout(LAYOUT_INTEGRAL_P1, w1, h1)
+    layout_p2 = get_layout(LAYOUT_INTEGRAL_P2, wn, hn)
+
+    filas_p1 = [_fila_falsa(i) for i in range(11)]
+    filas_p2 = [_fila_falsa(i) for i in range(10)]
+
+    print(f"--- Benchmark overlay Reporte Integral ({iteraciones} iteraciones) ---")
+
+    _medir("Página 1 (11 slots) - referencia", iteraciones,
+           lambda: _overlay_referencia(filas_p1, coords_p1, True, w1, h1, P1_REF_W, P1_REF_H))
+    _medir("Página 1 (11 slots) - precompilado", iteraciones,
+           lambda: _draw_integral_overlay(filas_p1, layout_p1, True, w1, h1))
+    _medir("Página N (10 slots) - referencia", iteraciones,
+           lambda: _overlay_referencia(filas_p2, coords_p2, False, wn, hn, P2_REF_W, P2_REF_H))
+    _medir("Página N (10 slots) - precompilado", iteraciones,
+           lambda: _draw_integral_overlay(filas_p2, layout_p2, False, wn, hn))
+
+    def pagina_completa():
+        writer = PdfWriter()
+        base_page = template.add_page_to(writer, 1)
+        base_page.merge_page(_draw_integral_overlay(filas_p2, layout_p2, False, wn, hn).pages[0])
+
+    _medir("Página N completa (overlay + merge)", iteraciones, pagina_completa)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,208 @@
+# benchmark_query_indexes.py
+"""
+Benchmark de los índices de consultas frecuentes (ver `create_query_indexes.py`).
+
+Crea las tablas en una BD de pruebas, la llena con datos sintéticos y, para
+cada consulta frecuente, muestra el plan de ejecución y la latencia promedio
+con el esquema anterior (índices de una sola columna) y con los índices
+compuestos/únicos/parciales que los reemplazan.
+
+La BD debe ser exclusiva para el benchmark: el script se niega a usarla si
+la tabla de tutorías ya tiene registros. Sin argumentos usa un archivo SQLite
+temporal.
+
+Uso:
+    python utils/benchmark_query_indexes.py [url_bd] [alumnos] [iteraciones]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy import create_engine, func, insert, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, select
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.alumno import Alumno
+from app.models.tutor import Tutor
+from app.models.tutoria import Tutoria, EstadoTutoria
+from app.models.reporte_integral import ReporteIntegral
+from app.models.reporte1 import Reporte1
+from app.models.reporte2 import Reporte2  # noqa: F401 (registra la tabla)
+from create_query_indexes import INDICES_REEMPLAZADOS, indices_gestionados
+
+_TUTORES = 200
+_PERIODOS = [f"{semestre}{anio}" for anio in range(2020, 2026) for semestre in (1, 2)]
+_REPORTES1_POR_TUTOR = 20
+_LOTE = 5000
+
+
+def _insertar(session: Session, modelo, filas: List[Dict[str, Any]]) -> None:
+    for inicio in range(0, len(filas), _LOTE):
+        session.execute(insert(modelo), filas[inicio:inicio + _LOTE])
+
+
+def _poblar(engine: Engine, total_alumnos: int) -> None:
+    rnd = random.Random(2025)
+    ahora = datetime.now(timezone.utc)
+
+    with Session(engine) as session:
+        _insertar(session, Tutor, [
+            {
+                "id_tutor": i, "nombre": f"Tutor {i}", "apellido_p": "Prueba", "correo": f"tutor{i}@prueba.mx",
+                "contraseña": "x", "requires_password_change": False, "created_at": ahora, "updated_at": ahora,
+            }
+            for i in range(1, _TUTORES + 1)
+        ])
+        _insertar(session, Alumno, [
+            {
+                "id_alumno": i, "nombre": f"Alumno {i}", "apellido_p": "Prueba", "num_control": f"{20000000 + i}",
+                "contraseña": "x", "carrera": "Sistemas", "semestre_actual": rnd.randint(1, 12), "estado": "A",
+                "correo": f"alumno{i}@prueba.mx", "requires_password_change": False,
+                "created_at": ahora, "updated_at": ahora,
+            }
+            for i in range(1, total_alumnos + 1)
+        ])
+
+        tutorias, reportes = [], []
+        for id_alumno in range(1, total_alumnos + 1):
+            # Hasta 4 tutorías por alumno, en periodos distintos
+            for periodo in rnd.sample(_PERIODOS, rnd.randint(1, 4)):
+                id_tutoria = len(tutorias) + 1
+                tutorias.append({
+                    "id_tutoria": id_tutoria, "alumno_id": id_alumno, "tutor_id": rnd.randint(1, _TUTORES),
+                    "periodo": periodo, "estado": EstadoTutoria.COMPLETADA, "semestre": 1,
+                    "reporte_integral_guardado": True, "created_at": ahora, "updated_at": ahora,
+                })
+                if rnd.random() < 0.8:
+                    reportes.append({
+                        "id_tutoria": id_tutoria, "tutoria_grupal": 5, "tutoria_individual": 2,
+                        "jefatura_academica": int(rnd.random() < 0.03),
+                        "ciencias_basicas": int(rnd.random() < 0.05),
+                        "psicologia": int(rnd.random() < 0.08),
+                        "materias_aprobadas": 6, "created_at": ahora, "updated_at": ahora,
+                    })
+        _insertar(session, Tutoria, tutorias)
+        _insertar(session, ReporteIntegral, reportes)
+
+        _insertar(session, Reporte1, [
+            {
+                "id_tutor": id_tutor, "nombre_tutor": f"Tutor {id_tutor}", "periodo": rnd.choice(_PERIODOS),
+                "nombre_proyecto": "Proyecto", "created_at": ahora - timedelta(days=rnd.randint(0, 2000)),
+                "updated_at": ahora,
+            }
+            for id_tutor in range(1, _TUTORES + 1)
+            for _ in range(_REPORTES1_POR_TUTOR)
+        ])
+        session.commit()
+
+    print(f"Datos: {_TUTORES} tutores, {total_alumnos} alumnos, {len(tutorias)} tutorías, "
+          f"{len(reportes)} reportes integrales, {_TUTORES * _REPORTES1_POR_TUTOR} reportes 1")
+
+
+def _consultas() -> List[Tuple[str, Any]]:
+    """Consultas frecuentes, con la misma forma que en los servicios."""
+    periodo = _PERIODOS[-1]
+    return [
+        ("Tutorías de un tutor por periodo (PDF integral)",
+         select(Tutoria, Alumno, ReporteIntegral)
+         .join(Alumno, Tutoria.alumno_id == Alumno.id_alumno) # type: ignore
+         .outerjoin(ReporteIntegral, Tutoria.id_tutoria == ReporteIntegral.id_tutoria) # type: ignore
+         .where(Tutoria.tutor_id == 17, Tutoria.periodo == periodo)),
+        ("Duplicados de asignación (alumnos con tutoría)",
+         select(Tutoria.alumno_id).where(
+             Tutoria.periodo == periodo,
+             Tutoria.alumno_id.in_(range(1000, 2000)) # type: ignore
+         )),
+        ("Canalización a psicología del periodo",
+         select(Alumno.num_control, ReporteIntegral.psicologia)
+         .select_from(Alumno)
+         .join(Tutoria, Alumno.id_alumno == Tutoria.alumno_id) # type: ignore
+         .join(ReporteIntegral, Tutoria.id_tutoria == ReporteIntegral.id_tutoria) # type: ignore
+         .where(Tutoria.periodo == periodo, ReporteIntegral.psicologia > 0)),
+        ("Reporte integral de una tutoría",
+         select(ReporteIntegral).where(ReporteIntegral.id_tutoria == 4321)),
+        ("Reportes 1 de un tutor por fecha",
+         select(Reporte1).where(Reporte1.id_tutor == 17).order_by(Reporte1.created_at.desc())), # type: ignore
+    ]
+
+
+def _sql(engine: Engine, consulta: Any) -> Tuple[str, Any]:
+    compilada = consulta.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    if compilada.positional:
+        return str(compilada), tuple(compilada.params[nombre] for nombre in compilada.positiontup)
+    return str(compilada), compilada.params
+
+
+def _plan(engine: Engine, consulta: Any) -> List[str]:
+    sql, params = _sql(engine, consulta)
+    prefijo = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        filas = conn.exec_driver_sql(prefijo + sql, params).all()
+    return [str(fila[-1]) for fila in filas]
+
+
+def _medir(engine: Engine, consulta: Any, iteraciones: int) -> float:
+    with Session(engine) as session:
+        session.execute(consulta).all()  # calentamiento
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            session.execute(consulta).all()
+    return (time.perf_counter() - inicio) * 1000 / iteraciones
+
+
+def _ronda(engine: Engine, iteraciones: int) -> Dict[str, Tuple[float, List[str]]]:
+    return {
+        nombre: (_medir(engine, consulta, iteraciones), _plan(engine, consulta))
+        for nombre, consulta in _consultas()
+    }
+
+
+def _con_indices(engine: Engine, accion: Callable, anteriores: str) -> None:
+    with engine.begin() as conn:
+        for indice in indices_gestionados():
+            accion(indice, conn)
+        for nombre, tabla, columna, _ in INDICES_REEMPLAZADOS:
+            conn.execute(text(anteriores.format(nombre=nombre, tabla=tabla, columna=columna)))
+        conn.execute(text("ANALYZE"))
+
+
+def benchmark(url: str, total_alumnos: int, iteraciones: int) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        if session.exec(select(func.count(Tutoria.id_tutoria))).one():
+            print("🔴 La BD ya tiene tutorías; usa una BD exclusiva para el benchmark.")
+            return
+
+    _poblar(engine, total_alumnos)
+
+    _con_indices(engine, lambda indice, conn: indice.drop(conn, checkfirst=True),
+                 "CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columna})")
+    antes = _ronda(engine, iteraciones)
+
+    _con_indices(engine, lambda indice, conn: indice.create(conn, checkfirst=True),
+                 "DROP INDEX IF EXISTS {nombre}")
+    despues = _ronda(engine, iteraciones)
+
+    for nombre, (ms_antes, plan_antes) in antes.items():
+        ms_despues, plan_despues = despues[nombre]
+        print(f"\n=== {nombre} ===")
+        print(f"Esquema anterior: {ms_antes:8.3f} ms")
+        for linea in plan_antes:
+            print(f"    {linea}")
+        print(f"Índices nuevos:   {ms_despues:8.3f} ms  ({ms_antes / ms_despues:.1f}x)")
+        for linea in plan_despues:
+            print(f"    {linea}")
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_indices.db')}"
+    total_alumnos = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    iteraciones = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    benchmark(url, total_alumnos, iteraciones)
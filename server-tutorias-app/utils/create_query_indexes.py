@@ -0,0 +1,154 @@
+# create_query_indexes.py
+"""
+Migración: crea los índices compuestos, únicos y parciales de las consultas
+más frecuentes (declarados en `__table_args__` de los modelos).
+
+- tutoria (tutor_id, periodo): listado del tutor y PDF integral.
+- tutoria (alumno_id, periodo) ÚNICO: un alumno, una tutoría por periodo.
+- reporteintegral (id_tutoria) ÚNICO: un reporte integral por tutoría.
+- reporteintegral (id_tutoria) WHERE psicologia/ciencias_basicas/jefatura_academica > 0:
+  reportes de canalización.
+- reporte1 / reporte2 (id_tutor, created_at): reportes del tutor por fecha.
+
+`create_all` no agrega índices a tablas existentes, así que este script debe
+ejecutarse una vez al desplegar el cambio. Solo crea los índices que faltan;
+se puede ejecutar varias veces sin efecto adicional. En PostgreSQL los
+índices se crean y eliminan con CONCURRENTLY para no bloquear escrituras.
+
+Los índices anteriores de una sola columna (ix_tutoria_alumno_id, etc.) son
+la primera columna de un índice nuevo y solo agregan costo a las escrituras:
+se eliminan una vez que existe el índice que los reemplaza.
+
+Un índice único no se crea si la tabla ya tiene registros duplicados: el
+script los lista para corregirlos a mano y vuelve a ejecutarse después.
+Mientras quede algún índice pendiente el script termina con código 1 (el
+guardado del reporte integral requiere `uq_reporteintegral_id_tutoria`).
+
+Uso:
+    python utils/create_query_indexes.py
+"""
+import sys
+import os
+import time
+from typing import List
+from sqlalchemy import Index, inspect, text
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+from app.models.tutoria import Tutoria
+from app.models.reporte_integral import ReporteIntegral
+from app.models.reporte1 import Reporte1
+from app.models.reporte2 import Reporte2
+
+_MODELOS = (Tutoria, ReporteIntegral, Reporte1, Reporte2)
+
+# Máximo de duplicados que se muestran por índice
+_MAX_DUPLICADOS = 20
+
+# Índices anteriores de una columna: (nombre, tabla, columna, índice que lo reemplaza)
+INDICES_REEMPLAZADOS = (
+    ("ix_tutoria_alumno_id", "tutoria", "alumno_id", "uq_tutoria_alumno_periodo"),
+    ("ix_tutoria_tutor_id", "tutoria", "tutor_id", "ix_tutoria_tutor_periodo"),
+    ("ix_reporteintegral_id_tutoria", "reporteintegral", "id_tutoria", "uq_reporteintegral_id_tutoria"),
+    ("ix_reporte1_id_tutor", "reporte1", "id_tutor", "ix_reporte1_tutor_created"),
+    ("ix_reporte2_id_tutor", "reporte2", "id_tutor", "ix_reporte2_tutor_created"),
+)
+
+
+def indices_gestionados() -> List[Index]:
+    """Índices declarados en `__table_args__` de los modelos."""
+    return [
+        indice
+        for modelo in _MODELOS
+        for indice in modelo.__table_args__ # type: ignore
+        if isinstance(indice, Index)
+    ]
+
+
+def _duplicados(conn, indice: Index) -> list:
+    columnas = ", ".join(columna.name for columna in indice.columns)
+    no_nulos = " AND ".join(f"{columna.name} IS NOT NULL" for columna in indice.columns)
+    return conn.execute(text(
+        f"SELECT {columnas}, COUNT(*) FROM {indice.table.name} " # type: ignore
+        f"WHERE {no_nulos} GROUP BY {columnas} HAVING COUNT(*) > 1 "
+        f"LIMIT {_MAX_DUPLICADOS}"
+    )).all()
+
+
+def create_query_indexes() -> List[str]:
+    """Crea los índices faltantes y devuelve los que quedaron pendientes."""
+    print("--- Creando índices de consultas frecuentes ---")
+    inicio = time.perf_counter()
+    es_postgres = engine.dialect.name == "postgresql"
+
+    inspector = inspect(engine)
+    existentes = {
+        tabla: {indice["name"] for indice in inspector.get_indexes(tabla)}
+        for tabla in {modelo.__tablename__ for modelo in _MODELOS} # type: ignore
+    }
+
+    # Un CREATE INDEX CONCURRENTLY interrumpido deja el índice marcado como inválido
+    invalidos = set()
+    if es_postgres:
+        with engine.connect() as conn:
+            invalidos = set(conn.execute(text(
+                "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE NOT i.indisvalid"
+            )).scalars())
+
+    creados, omitidos, eliminados = [], [], []
+
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for indice in indices_gestionados():
+            tabla = indice.table.name # type: ignore
+            if indice.name in invalidos:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {indice.name}"))
+                print(f"⚠️  Índice inválido {indice.name} eliminado, se vuelve a crear.")
+            elif indice.name in existentes[tabla]:
+                continue
+
+            if indice.unique:
+                duplicados = _duplicados(conn, indice)
+                if duplicados:
+                    omitidos.append(indice.name)
+                    print(f"⚠️  {indice.name}: {tabla} tiene registros duplicados, no se creó el índice.")
+                    for fila in duplicados:
+                        print(f"    {tuple(fila[:-1])} -> {fila[-1]} registros")
+                    continue
+
+            try:
+                if es_postgres:
+                    indice.dialect_options["postgresql"]["concurrently"] = True
+                indice.create(conn)
+                creados.append(indice.name)
+                print(f"✅ Índice {indice.name} creado.")
+            except Exception as e:
+                omitidos.append(indice.name)
+                print(f"🔴 ERROR al crear {indice.name}: {e}")
+
+        for anterior, tabla, _, reemplazo in INDICES_REEMPLAZADOS:
+            if anterior not in existentes[tabla]:
+                continue
+            if reemplazo in omitidos or reemplazo not in existentes[tabla] | set(creados):
+                print(f"⚠️  {anterior} se conserva hasta que exista {reemplazo}.")
+                continue
+            concurrently = "CONCURRENTLY " if es_postgres else ""
+            conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {anterior}"))
+            eliminados.append(anterior)
+            print(f"🗑️  Índice {anterior} eliminado (lo cubre {reemplazo}).")
+
+        if creados:
+            # Estadísticas actualizadas para que el planificador considere los índices nuevos
+            conn.execute(text("ANALYZE"))
+
+    print(f"✅ Índices creados: {len(creados)}, eliminados: {len(eliminados)}")
+    if omitidos:
+        print(f"🔴 Índices pendientes: {', '.join(omitidos)}")
+    print(f"⏱️  Tiempo: {time.perf_counter() - inicio:.1f} s")
+    return omitidos
+
+
+if __name__ == "__main__":
+    if create_query_indexes():
+        sys.exit(1)
@@ -0,0 +1,69 @@
+# hash_plaintext_passwords.py
+"""
+Migración única: hashea las contraseñas temporales guardadas en texto plano.
+
+Las cargas masivas anteriores guardaban la contraseña temporal de alumnos y
+tutores sin hashear, y el login las aceptaba comparando el texto plano. El
+login ya no hace esa comparación, así que este script debe ejecutarse como
+parte del despliegue, antes de que el nuevo código de login atienda
+peticiones: quien aún tenga una contraseña temporal en texto plano no podrá
+entrar hasta que se hashee. Solo modifica los registros cuyo valor no es un
+hash bcrypt; se puede ejecutar varias veces sin efecto adicional.
+
+Si la migración falla termina con código 1, para que el despliegue se detenga.
+
+Uso:
+    python utils/hash_plaintext_passwords.py
+"""
+import sys
+import os
+import time
+from sqlmodel import Session, select
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+from app.core.security import pwd_context, hash_temp_passwords
+from app.models.alumno import Alumno
+from app.models.tutor import Tutor
+from app.models.tutoria import Tutoria
+
+
+def _hashear_tabla(session: Session, model) -> int:
+    registros = [
+        registro for registro in session.exec(select(model)).all()
+        if pwd_context.identify(registro.contraseña) is None
+    ]
+    if not registros:
+        return 0
+
+    hashes = hash_temp_passwords([registro.contraseña for registro in registros])
+    for registro, hashed in zip(registros, hashes):
+        registro.contraseña = hashed
+        session.add(registro)
+    return len(registros)
+
+
+def hash_plaintext_passwords() -> bool:
+    """Hashea las contraseñas en texto plano; devuelve False si la migración falló."""
+    print("--- Hasheando contraseñas en texto plano ---")
+    inicio = time.perf_counter()
+
+    with Session(engine) as session:
+        try:
+            alumnos = _hashear_tabla(session, Alumno)
+            tutores = _hashear_tabla(session, Tutor)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"🔴 ERROR durante la migración: {e}")
+            return False
+
+    print(f"✅ Alumnos actualizados: {alumnos}")
+    print(f"✅ Tutores actualizados: {tutores}")
+    print(f"⏱️  Tiempo: {time.perf_counter() - inicio:.1f} s")
+    return True
+
+
+if __name__ == "__main__":
+    if not hash_plaintext_passwords():
+        sys.exit(1)
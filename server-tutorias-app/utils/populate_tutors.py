@@ -15,6 +15,7 @@ from sqlmodel import Session, select
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.database import engine
 from app.models.tutor import Tutor
+from app.core.security import get_temp_password_hash
 from sqlalchemy.exc import IntegrityError
 from app.models.alumno import Alumno
 from app.models.tutoria import Tutoria
@@ -275,7 +276,7 @@ def populate_tutors():
     Carga los tutores predefinidos en la base de datos.
     
     Genera contraseñas temporales basadas en el usuario del correo
-    (parte antes del @) más el sufijo 'itsf'. Marca todos los tutores
+    (parte antes del @) más el sufijo 'itsf' (guardadas como hash). Marca todos los tutores
     para requerir cambio de contraseña en su primer acceso.
     
     Omite tutores que ya existen en la base de datos basándose en
@@ -306,7 +307,7 @@ def populate_tutors():
                     apellido_p=data["apellido_p"].title(),
                     apellido_m=data["apellido_m"].title(),
                     correo=data["correo"],
-                    contraseña=temp_password,
+                    contraseña=get_temp_password_hash(temp_password),
                     requires_password_change=True
                 )
                 
@@ -0,0 +1,95 @@
+# setup_search_index.py
+"""
+Migración: agrega y llena la columna `busqueda` de alumnos y tutores, y crea
+sus índices de búsqueda (pg_trgm en PostgreSQL, FTS5 en SQLite).
+
+Los listados buscan sobre esta columna (ver `app.core.search`). `create_all`
+no agrega columnas a tablas existentes, así que este script debe ejecutarse
+una vez ANTES de desplegar el cambio. Solo recalcula los registros cuyo valor
+falta o está desactualizado; se puede ejecutar varias veces sin efecto
+adicional.
+
+Uso:
+    python utils/setup_search_index.py
+"""
+import sys
+import os
+import time
+from sqlalchemy import inspect, text
+from sqlmodel import Session
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+from app.core import search
+
+# tabla -> (llave primaria, campos buscables en orden, longitud de la columna)
+_TABLAS = {
+    "alumno": ("id_alumno", ("nombre", "apellido_p", "apellido_m", "num_control"), 400),
+    "tutor": ("id_tutor", ("nombre", "apellido_p", "apellido_m", "correo"), 600),
+}
+
+
+def _crear_columnas() -> None:
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        for tabla, (_, _, longitud) in _TABLAS.items():
+            columnas = {columna["name"] for columna in inspector.get_columns(tabla)}
+            if "busqueda" not in columnas:
+                conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN busqueda VARCHAR({longitud})"))
+                print(f"✅ Columna {tabla}.busqueda creada.")
+
+
+def _llenar_columna(session: Session, tabla: str) -> int:
+    llave, campos, _ = _TABLAS[tabla]
+    # Consulta de columnas: el modelo completo no se puede cargar hasta que exista la columna
+    filas = session.execute(text(
+        f"SELECT {llave}, busqueda, {', '.join(campos)} FROM {tabla}"
+    )).all()
+
+    cambios = []
+    for id_registro, actual, *valores in filas:
+        valor = search.search_text(*valores)
+        if valor != actual:
+            cambios.append({"id": id_registro, "busqueda": valor})
+
+    if cambios:
+        session.execute(
+            text(f"UPDATE {tabla} SET busqueda = :busqueda WHERE {llave} = :id"),
+            cambios
+        )
+    return len(cambios)
+
+
+def setup_search_index():
+    print("--- Preparando la búsqueda de alumnos y tutores ---")
+    inicio = time.perf_counter()
+
+    try:
+        _crear_columnas()
+    except Exception as e:
+        print(f"🔴 ERROR al crear las columnas: {e}")
+        return
+
+    with Session(engine) as session:
+        try:
+            actualizados = {tabla: _llenar_columna(session, tabla) for tabla in _TABLAS}
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"🔴 ERROR durante la migración: {e}")
+            return
+
+    try:
+        search.ensure_indexes(engine, rebuild=True)
+    except Exception as e:
+        print(f"🔴 ERROR al crear los índices: {e}")
+        return
+
+    for tabla, total in actualizados.items():
+        print(f"✅ {tabla}: {total} registros actualizados")
+    print(f"⏱️  Tiempo: {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    setup_search_index()